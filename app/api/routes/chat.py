@@ -4,18 +4,29 @@ Chat API Routes
 Endpoints for natural language querying and conversation
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
-import uuid
+import asyncio
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
+from typing import Dict, Iterator, Optional, Tuple, Union
+import secrets
 import time
 from app.api.schemas import (
     ChatRequest,
     ChatResponse,
     QueryResult,
     AmbiguityResponse,
-    ErrorResponse
+    ErrorResponse,
+    CHAT_RESPONSE_ADAPTER,
+    AMBIGUITY_ADAPTER
 )
-from app.query.text_to_sql import get_text_to_sql_engine
+from app.cache import query_cache
+from app.config import settings
+from app.llm.gemini_client import GeminiClient, get_gemini_client
+from app.query import plan_cache
+from app.query.text_to_sql import TextToSQLEngine, get_text_to_sql_engine
 from app.utils.logger import get_logger
 from app.utils.exceptions import (
     AmbiguousQueryError,
@@ -28,6 +39,146 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["chat"])
 
+# Conversation roles forwarded to the engine (messages with other roles are dropped)
+_ROLE_KEY = {'user': 'user', 'assistant': 'assistant'}
+
+# Exception class -> (log event, HTTP status, user-facing message).
+# A message of None surfaces the exception text itself.
+_ERROR_MAP: Dict[type, Tuple[str, int, Optional[str]]] = {
+    AmbiguousQueryError: ('ambiguous_query', status.HTTP_400_BAD_REQUEST, None),
+    SQLGenerationError: ('sql_error', status.HTTP_500_INTERNAL_SERVER_ERROR, None),
+    SQLValidationError: ('sql_error', status.HTTP_500_INTERNAL_SERVER_ERROR, None),
+    SQLExecutionError: (
+        'sql_execution_error',
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "Failed to execute query. Please try rephrasing your question."
+    ),
+    asyncio.TimeoutError: ('llm_request_timeout', status.HTTP_504_GATEWAY_TIMEOUT, "LLM timeout"),
+}
+
+_NDJSON = "application/x-ndjson"
+
+_UNEXPECTED_ERROR = (
+    'unexpected_error',
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+    "An unexpected error occurred. Please try again."
+)
+
+
+def _get_engine(http_request: Request) -> TextToSQLEngine:
+    """
+    Get the Text-to-SQL engine built during application startup
+
+    Falls back to the singleton accessor when the lifespan has not run
+    (e.g. when the router is mounted without the application lifespan).
+    """
+    engine = getattr(http_request.app.state, 'engine', None)
+    return engine or get_text_to_sql_engine()
+
+
+def _get_llm(http_request: Request) -> GeminiClient:
+    """
+    Get the Gemini client built during application startup
+
+    Falls back to the singleton accessor when the lifespan has not run.
+    """
+    llm_client = getattr(http_request.app.state, 'llm', None)
+    return llm_client or get_gemini_client()
+
+
+async def _load_cached_result(cache_key: str) -> Optional[QueryResult]:
+    """
+    Load a cached query result, treating entries that no longer validate as misses
+
+    Entries written under an older QueryResult schema are deleted so the
+    fresh result can replace them.
+    """
+    cached = await query_cache.get(cache_key)
+    if cached is None:
+        return None
+    try:
+        return QueryResult(**cached)
+    except (TypeError, ValidationError) as e:
+        logger.warning("chat_cache_entry_invalid", error=str(e))
+        await query_cache.delete(cache_key)
+        return None
+
+
+def _lookup_error(exc: Exception) -> Tuple[str, int, Optional[str]]:
+    """
+    Resolve the error map entry for an exception
+
+    Walks the exception's MRO so subclasses of a mapped exception are
+    handled like their parent; anything unmapped is an unexpected error.
+    """
+    for cls in type(exc).__mro__:
+        entry = _ERROR_MAP.get(cls)
+        if entry is not None:
+            return entry
+    return _UNEXPECTED_ERROR
+
+
+def _error_response(exc: Exception, entry: Tuple[str, int, Optional[str]]) -> ErrorResponse:
+    """
+    Build the ErrorResponse body for a failed chat request
+
+    Args:
+        exc: Exception raised while processing the request
+        entry: Error map entry returned by _lookup_error() for the exception
+    """
+    message = entry[2]
+    if entry is _UNEXPECTED_ERROR:
+        return ErrorResponse(
+            error=message,
+            error_type="InternalError",
+            details={"error": str(exc)}
+        )
+    if message is None:
+        return ErrorResponse(error=str(exc), error_type=type(exc).__name__)
+    if isinstance(exc, asyncio.TimeoutError):
+        return ErrorResponse(
+            error=message,
+            error_type="Timeout",
+            details={"timeout_seconds": settings.LLM_REQUEST_TIMEOUT}
+        )
+    return ErrorResponse(
+        error=message,
+        error_type=type(exc).__name__,
+        details={"original_error": str(exc)}
+    )
+
+
+def _iter_ndjson(response: ChatResponse) -> Iterator[bytes]:
+    """
+    Yield a chat response as NDJSON
+
+    The first line is the response envelope with an empty `results` list;
+    each following line is one result row.
+    """
+    rows = response.result.results
+    envelope = response.model_copy(
+        update={'result': response.result.model_copy(update={'results': []})}
+    )
+    yield CHAT_RESPONSE_ADAPTER.dump_json(envelope) + b"\n"
+    for row in rows:
+        yield to_json(row) + b"\n"
+
+
+def _render_response(
+    response: ChatResponse,
+    http_request: Request
+) -> Union[ORJSONResponse, StreamingResponse]:
+    """
+    Serialize a successful chat response
+
+    The body is a single JSON document unless the client opts in to
+    streaming by sending `Accept: application/x-ndjson`, in which case the
+    response is streamed as NDJSON (see _iter_ndjson).
+    """
+    if _NDJSON in http_request.headers.get('accept', ''):
+        return StreamingResponse(_iter_ndjson(response), media_type=_NDJSON)
+    return ORJSONResponse(CHAT_RESPONSE_ADAPTER.dump_python(response, mode='json'))
+
 
 @router.post(
     "/chat",
@@ -35,28 +186,33 @@ router = APIRouter(prefix="/api/v1", tags=["chat"])
     responses={
         200: {"model": ChatResponse},
         400: {"model": AmbiguityResponse},
-        500: {"model": ErrorResponse}
+        500: {"model": ErrorResponse},
+        504: {"model": ErrorResponse}
     },
     summary="Process natural language query",
     description="Convert natural language to SQL, execute, and return results"
 )
-async def chat(request: ChatRequest) -> Dict[str, Any]:
+async def chat(
+    request: ChatRequest,
+    http_request: Request
+) -> Union[ORJSONResponse, StreamingResponse]:
     """
     Process a natural language query and return results
 
     Args:
         request: Chat request with query and optional conversation history
+        http_request: Incoming HTTP request (provides shared app state)
 
     Returns:
-        ChatResponse with query results or error
+        ChatResponse with query results, streamed as NDJSON when the client accepts it
 
     Raises:
         HTTPException: For various error conditions
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     # Generate conversation ID if not provided
-    conversation_id = request.conversation_id or str(uuid.uuid4())
+    conversation_id = request.conversation_id or secrets.token_hex(16)
 
     logger.info(
         "chat_request_received",
@@ -66,18 +222,16 @@ async def chat(request: ChatRequest) -> Dict[str, Any]:
     )
 
     try:
-        # Get Text-to-SQL engine
-        engine = get_text_to_sql_engine()
+        # Get Text-to-SQL engine (built once at startup)
+        engine = _get_engine(http_request)
 
-        # Convert conversation history to simple dict format
+        # Convert conversation history to single-key {role: content} turns
         conversation_history = None
         if request.conversation_history:
             conversation_history = [
-                {
-                    'user': msg.content if msg.role == 'user' else '',
-                    'assistant': msg.content if msg.role == 'assistant' else ''
-                }
+                {_ROLE_KEY[msg.role]: msg.content}
                 for msg in request.conversation_history
+                if msg.role in _ROLE_KEY
             ]
 
         # NEW: Augment query with clarifications if provided
@@ -91,9 +245,8 @@ async def chat(request: ChatRequest) -> Dict[str, Any]:
                 clarification_count=len(request.clarifications)
             )
 
-            # Get LLM client for query augmentation
-            from app.llm.gemini_client import get_gemini_client
-            llm_client = get_gemini_client()
+            # Get LLM client for query augmentation (shared gRPC channel)
+            llm_client = _get_llm(http_request)
 
             # Convert Pydantic models to dicts
             clarification_dicts = [
@@ -113,29 +266,82 @@ async def chat(request: ChatRequest) -> Dict[str, Any]:
             # Skip ambiguity check for clarified queries
             should_check_ambiguity = False
 
-        # Process query
-        result = await engine.process_query(
-            natural_language_query=query_to_process,
-            conversation_history=conversation_history,
-            check_ambiguity=should_check_ambiguity
+        # Serve repeated queries straight from the cache
+        cache_key = query_cache.make_cache_key(
+            query_to_process,
+            conversation_history,
+            should_check_ambiguity
+        )
+        cached_result = await _load_cached_result(cache_key)
+
+        if cached_result is not None:
+            processing_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+
+            logger.info(
+                "chat_cache_hit",
+                conversation_id=conversation_id,
+                processing_time_ms=processing_time_ms
+            )
+
+            response = ChatResponse(
+                success=True,
+                query=request.query,
+                conversation_id=conversation_id,
+                result=cached_result,
+                processing_time_ms=processing_time_ms
+            )
+            return _render_response(response, http_request)
+
+        # Reuse a previously generated plan so only the SQL is re-executed
+        plan_key = plan_cache.make_plan_key(
+            query_to_process,
+            conversation_history,
+            should_check_ambiguity,
+            engine.context_loader.schema_version
+        )
+        plan = plan_cache.get_plan(plan_key)
+
+        if plan is not None:
+            logger.info("chat_plan_cache_hit", conversation_id=conversation_id)
+            result = await engine.execute_plan(plan)
+        else:
+            # Process query, bounded so a slow LLM call cannot hold the request
+            result = await asyncio.wait_for(
+                engine.process_query(
+                    natural_language_query=query_to_process,
+                    conversation_history=conversation_history,
+                    check_ambiguity=should_check_ambiguity
+                ),
+                timeout=settings.LLM_REQUEST_TIMEOUT
+            )
+            plan_cache.store_plan(plan_key, result)
+
+        query_result = QueryResult(
+            sql=result['sql'],
+            explanation=result['explanation'],
+            results=result['results'],
+            metrics_used=result['metrics_used'],
+            visualization_hint=result['visualization_hint'],
+            row_count=len(result['results']),
+            truncated=result.get('truncated', False)
+        )
+
+        # Only successful results reach this point, so ambiguity responses are never cached
+        await query_cache.set(
+            cache_key,
+            jsonable_encoder(query_result),
+            ttl=settings.QUERY_CACHE_TTL_SECONDS
         )
 
         # Calculate processing time
-        processing_time_ms = (time.time() - start_time) * 1000
+        processing_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
         # Build response
         response = ChatResponse(
             success=True,
             query=request.query,
             conversation_id=conversation_id,
-            result=QueryResult(
-                sql=result['sql'],
-                explanation=result['explanation'],
-                results=result['results'],
-                metrics_used=result['metrics_used'],
-                visualization_hint=result['visualization_hint'],
-                row_count=len(result['results'])
-            ),
+            result=query_result,
             processing_time_ms=processing_time_ms
         )
 
@@ -146,78 +352,40 @@ async def chat(request: ChatRequest) -> Dict[str, Any]:
             processing_time_ms=processing_time_ms
         )
 
-        return response.model_dump()
+        return _render_response(response, http_request)
 
-    except AmbiguousQueryError as e:
-        logger.warning(
-            "ambiguous_query",
-            conversation_id=conversation_id,
-            suggestions=e.options,
-            questions_count=len(e.questions)
-        )
+    except Exception as e:
+        entry = _lookup_error(e)
+        event, status_code, _ = entry
 
-        response = AmbiguityResponse(
-            query=request.query,
-            reasons=[str(e)],
-            suggestions=e.options or [],
-            questions=e.questions or []
-        )
+        if isinstance(e, AmbiguousQueryError):
+            logger.warning(
+                event,
+                conversation_id=conversation_id,
+                suggestions=e.options,
+                questions_count=len(e.questions)
+            )
 
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=response.model_dump(mode='json')
-        )
+            response = AmbiguityResponse(
+                query=request.query,
+                reasons=[str(e)],
+                suggestions=e.options or [],
+                questions=e.questions or []
+            )
+
+            raise HTTPException(
+                status_code=status_code,
+                detail=AMBIGUITY_ADAPTER.dump_python(response, mode='json')
+            )
 
-    except (SQLGenerationError, SQLValidationError) as e:
         logger.error(
-            "sql_error",
+            event,
             conversation_id=conversation_id,
             error=str(e),
             error_type=type(e).__name__
         )
 
-        response = ErrorResponse(
-            error=str(e),
-            error_type=type(e).__name__
-        )
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=response.model_dump(mode='json')
-        )
-
-    except SQLExecutionError as e:
-        logger.error(
-            "sql_execution_error",
-            conversation_id=conversation_id,
-            error=str(e)
-        )
-
-        response = ErrorResponse(
-            error="Failed to execute query. Please try rephrasing your question.",
-            error_type="SQLExecutionError",
-            details={"original_error": str(e)}
-        )
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=response.model_dump(mode='json')
-        )
-
-    except Exception as e:
-        logger.error(
-            "unexpected_error",
-            conversation_id=conversation_id,
-            error=str(e)
-        )
-
-        response = ErrorResponse(
-            error="An unexpected error occurred. Please try again.",
-            error_type="InternalError",
-            details={"error": str(e)}
-        )
-
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=response.model_dump(mode='json')
+            status_code=status_code,
+            detail=_error_response(e, entry).model_dump(mode='json')
         )
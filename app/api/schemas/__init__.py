@@ -9,7 +9,9 @@ from app.api.schemas.chat import (
     ErrorResponse,
     HealthResponse,
     ClarificationQuestion,
-    Clarification
+    Clarification,
+    CHAT_RESPONSE_ADAPTER,
+    AMBIGUITY_ADAPTER
 )
 
 __all__ = [
@@ -21,5 +23,7 @@ __all__ = [
     'ErrorResponse',
     'HealthResponse',
     'ClarificationQuestion',
-    'Clarification'
+    'Clarification',
+    'CHAT_RESPONSE_ADAPTER',
+    'AMBIGUITY_ADAPTER'
 ]
@@ -4,17 +4,38 @@ API Schemas for Chat Endpoints
 Request and response models for the chat interface
 """
 
-from pydantic import BaseModel, Field, ConfigDict
+import re
+import time
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 
-class ClarificationQuestion(BaseModel):
+def _now_ms() -> int:
+    """Current time as Unix epoch milliseconds"""
+    return time.time_ns() // 1_000_000
+
+
+# Question IDs are lowercase snake_case identifiers
+_QID_RE = re.compile(r'[a-z_]+')
+
+
+class _QuestionIdModel(BaseModel):
+    """Base for models carrying a clarification question_id"""
+
+    @field_validator('question_id', check_fields=False)
+    @classmethod
+    def _validate_question_id(cls, value: str) -> str:
+        if not _QID_RE.fullmatch(value):
+            raise ValueError("question_id must contain only lowercase letters and underscores")
+        return value
+
+
+class ClarificationQuestion(_QuestionIdModel):
     """A single clarification question with multiple choice options"""
     question_id: str = Field(
         ...,
-        description="Unique identifier for this question (e.g., 'charge_off_type')",
-        pattern=r'^[a-z_]+$'
+        description="Unique identifier for this question (e.g., 'charge_off_type')"
     )
     question_text: str = Field(
         ...,
@@ -30,12 +51,11 @@ class ClarificationQuestion(BaseModel):
     )
 
 
-class Clarification(BaseModel):
+class Clarification(_QuestionIdModel):
     """User's answer to a clarification question"""
     question_id: str = Field(
         ...,
-        description="ID of the question being answered",
-        pattern=r'^[a-z_]+$'
+        description="ID of the question being answered"
     )
     selected_option: str = Field(
         ...,
@@ -92,12 +112,14 @@ class QueryResult(BaseModel):
         description="Suggested visualization type (bar, line, table, etc.)"
     )
     row_count: int = Field(..., description="Number of rows returned")
+    truncated: bool = Field(
+        False,
+        description="Whether the query matched more than MAX_ROWS rows, so the rest were dropped"
+    )
 
 
 class ChatResponse(BaseModel):
     """Response model for chat endpoint"""
-    model_config = ConfigDict(json_encoders={datetime: lambda v: v.isoformat()})
-
     success: bool = Field(..., description="Whether the request was successful")
     query: str = Field(..., description="Original user query")
     conversation_id: str = Field(..., description="Conversation ID")
@@ -107,9 +129,9 @@ class ChatResponse(BaseModel):
         None,
         description="Suggestions for ambiguous queries"
     )
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
-        description="Response timestamp"
+    timestamp_ms: int = Field(
+        default_factory=_now_ms,
+        description="Response timestamp (Unix epoch milliseconds)"
     )
     processing_time_ms: Optional[float] = Field(
         None,
@@ -119,8 +141,6 @@ class ChatResponse(BaseModel):
 
 class AmbiguityResponse(BaseModel):
     """Response for ambiguous queries"""
-    model_config = ConfigDict(json_encoders={datetime: lambda v: v.isoformat()})
-
     success: bool = Field(False, description="Always false for ambiguous queries")
     query: str = Field(..., description="Original user query")
     is_ambiguous: bool = Field(True, description="Always true for this response type")
@@ -130,37 +150,39 @@ class AmbiguityResponse(BaseModel):
         default_factory=list,
         description="Structured clarification questions with options"
     )
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
-        description="Response timestamp"
+    timestamp_ms: int = Field(
+        default_factory=_now_ms,
+        description="Response timestamp (Unix epoch milliseconds)"
     )
 
 
 class ErrorResponse(BaseModel):
     """Error response model"""
-    model_config = ConfigDict(json_encoders={datetime: lambda v: v.isoformat()})
-
     success: bool = Field(False, description="Always false for errors")
     error: str = Field(..., description="Error message")
     error_type: str = Field(..., description="Type of error")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
-        description="Error timestamp"
+    timestamp_ms: int = Field(
+        default_factory=_now_ms,
+        description="Error timestamp (Unix epoch milliseconds)"
     )
 
 
 class HealthResponse(BaseModel):
     """Health check response"""
-    model_config = ConfigDict(json_encoders={datetime: lambda v: v.isoformat()})
-
     status: str = Field(..., description="Service status (healthy/unhealthy)")
     version: str = Field(..., description="Application version")
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
-        description="Health check timestamp"
+    timestamp_ms: int = Field(
+        default_factory=_now_ms,
+        description="Health check timestamp (Unix epoch milliseconds)"
     )
     components: Dict[str, str] = Field(
         ...,
         description="Component health status"
     )
+
+
+# Prebuilt serializers for the hot response paths (response timestamps are
+# integer timestamp_ms fields, so they serialize without datetime formatting)
+CHAT_RESPONSE_ADAPTER = TypeAdapter(ChatResponse)
+AMBIGUITY_ADAPTER = TypeAdapter(AmbiguityResponse)
@@ -0,0 +1,9 @@
+"""Response caching module for CR360"""
+
+from app.cache.query_cache import (
+    get_redis_client,
+    make_cache_key,
+    close_query_cache
+)
+
+__all__ = ['get_redis_client', 'make_cache_key', 'close_query_cache']
@@ -0,0 +1,135 @@
+"""
+Query Result Cache for CR360
+
+Caches successful Text-to-SQL results in Redis so that repeated questions
+skip the LLM and SQL execution entirely. Caching is disabled when
+REDIS_URL is not configured, and Redis failures never fail a request.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+import orjson
+from redis.asyncio import Redis
+from app.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "cr360:query:"
+
+
+# Global Redis client (created lazily, shared by all requests)
+_redis_client: Optional[Redis] = None
+
+
+def get_redis_client() -> Optional[Redis]:
+    """
+    Get the global Redis client
+
+    Returns:
+        Redis client, or None if REDIS_URL is not configured
+    """
+    global _redis_client
+    if not settings.REDIS_URL:
+        return None
+    if _redis_client is None:
+        _redis_client = Redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+def _normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r'\s+', ' ', query).strip().rstrip('?.!').lower()
+
+
+def make_cache_key(
+    query: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    check_ambiguity: bool
+) -> str:
+    """
+    Build the cache key for a query
+
+    Args:
+        query: Query text sent to the engine (after clarification augmentation)
+        conversation_history: Conversation history sent with the query
+        check_ambiguity: Whether the ambiguity check was requested
+
+    Returns:
+        Namespaced SHA-256 cache key
+    """
+    conv_hash = hashlib.sha256(
+        orjson.dumps(conversation_history or [], option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+    digest = hashlib.sha256(
+        f"{_normalize_query(query)}|{conv_hash}|{check_ambiguity}".encode()
+    ).hexdigest()
+    return f"{KEY_PREFIX}{digest}"
+
+
+async def get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached query result
+
+    Args:
+        key: Cache key from make_cache_key()
+
+    Returns:
+        Cached result dict, or None on miss, when disabled, or on error
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    try:
+        raw = await client.get(key)
+        return None if raw is None else orjson.loads(raw)
+    except Exception as e:
+        logger.warning("query_cache_get_failed", error=str(e))
+        return None
+
+
+async def set(key: str, value: Dict[str, Any], ttl: int = 3600) -> None:
+    """
+    Store a query result
+
+    Args:
+        key: Cache key from make_cache_key()
+        value: JSON-serializable result dict
+        ttl: Expiry in seconds
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        await client.set(key, orjson.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning("query_cache_set_failed", error=str(e))
+
+
+async def delete(key: str) -> None:
+    """
+    Remove a cached query result (e.g. an entry that no longer validates)
+
+    Args:
+        key: Cache key from make_cache_key()
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        await client.delete(key)
+    except Exception as e:
+        logger.warning("query_cache_delete_failed", error=str(e))
+
+
+async def close_query_cache() -> None:
+    """Close the global Redis client if it was created"""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+        logger.info("query_cache_closed")
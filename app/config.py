@@ -1,12 +1,18 @@
 """
 Configuration management using Pydantic Settings
 """
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional, Tuple
 
 
 class Settings(BaseSettings):
-    """Application settings loaded from environment variables"""
+    """Application settings loaded from environment variables (immutable after load)"""
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        frozen=True
+    )
 
     # Application
     APP_NAME: str = "CR360"
@@ -14,27 +20,51 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
 
+    # Operational endpoints under /debug (off unless explicitly enabled)
+    ENABLE_DEBUG_ENDPOINTS: bool = False
+
     # Supabase
     SUPABASE_URL: str
     SUPABASE_KEY: str
     DATABASE_URL: str
 
+    # Database Pool
+    DB_POOL_MIN_SIZE: int = 10
+    DB_POOL_MAX_SIZE: int = 50
+    DB_POOL_MAX_INACTIVE_LIFETIME: float = 300.0
+    DB_COMMAND_TIMEOUT: float = 60.0
+
+    # Result Limits & Streaming
+    MAX_ROWS: int = 10000
+    STREAM_FETCH_SIZE: int = 1000
+
     # Gemini API
     GOOGLE_API_KEY: str
 
     # Context
     CONTEXT_FILE_PATH: str = "./context/semantic_model_prod.yaml"
+    DISABLE_YAML_CACHE: bool = False
 
     # LLM Settings
     LLM_MODEL: str = "gemini-2.5-flash"
     LLM_TEMPERATURE: float = 0.1
     LLM_MAX_TOKENS: int = 8192
+    LLM_REQUEST_TIMEOUT: float = 15.0
+    EMBEDDING_MODEL: str = "models/text-embedding-004"
+    # Check ambiguity and generate SQL in one LLM call instead of two
+    LLM_SINGLE_CALL_ANALYSIS: bool = False
 
     # Memory
     MAX_CONVERSATION_TURNS: int = 5
 
     # Redis (optional)
     REDIS_URL: Optional[str] = None
+    QUERY_CACHE_TTL_SECONDS: int = 3600
+
+    # Semantic Cache (pgvector, optional)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_MAX_DISTANCE: float = 0.02
+    SEMANTIC_CACHE_TTL_DAYS: int = 7
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -42,10 +72,18 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+
+def split_origins(value: str) -> Tuple[str, ...]:
+    """Split a comma-separated CORS origin list, dropping blanks and whitespace"""
+    return tuple(origin.strip() for origin in value.split(",") if origin.strip())
 
 
 # Global settings instance
 settings = Settings()
+
+# Values read on every request or at app construction, captured once at import time
+APP_NAME = settings.APP_NAME
+APP_VERSION = settings.APP_VERSION
+GOOGLE_API_KEY = settings.GOOGLE_API_KEY
+LOG_LEVEL = settings.LOG_LEVEL
+CORS_ORIGINS = split_origins(settings.CORS_ORIGINS)
@@ -1,5 +1,6 @@
 """Database module for CR360"""
 
 from app.database.client import DatabaseClient, get_database_client
+from app.database.pool import get_db_pool, close_db_pool
 
-__all__ = ['DatabaseClient', 'get_database_client']
+__all__ = ['DatabaseClient', 'get_database_client', 'get_db_pool', 'close_db_pool']
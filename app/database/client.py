@@ -1,19 +1,57 @@
 """
 Database Client for CR360
 
-Handles all database operations with connection pooling and error handling
+Handles all database operations with asyncpg connection pooling and error handling
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterable
 from supabase import create_client, Client
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import asyncpg
 from app.config import settings
+from app.database.pool import get_db_pool, close_db_pool
 from app.utils.logger import get_logger
 from app.utils.exceptions import DatabaseError, SQLExecutionError
 
 logger = get_logger(__name__)
 
+_LEADING_CHARS = frozenset(' \t\r\n(')
+
+
+def _is_select(sql: str) -> bool:
+    """
+    Check whether a statement returns rows (SELECT or WITH ... SELECT)
+
+    Scans past leading whitespace and parentheses and compares only the
+    first keyword, instead of stripping and upper-casing the whole string.
+    """
+    i = 0
+    n = len(sql)
+    while i < n and sql[i] in _LEADING_CHARS:
+        i += 1
+    keyword = sql[i:i + 6].lower()
+    return keyword == 'select' or keyword[:4] == 'with'
+
+
+def _apply_row_cap(sql: str, max_rows: int) -> str:
+    """
+    Wrap a query so it returns at most max_rows + 1 rows
+
+    The extra row is a sentinel: if it arrives, the result was cut short.
+    Every SELECT is wrapped, whatever LIMIT it carries itself. The original
+    text is placed on its own lines so a trailing `--` comment cannot
+    swallow the closing parenthesis.
+    """
+    inner = sql.rstrip().rstrip(';')
+    return f"SELECT * FROM (\n{inner}\n) AS _cap LIMIT {max_rows + 1}"
+
+
+class RowList(List[Dict[str, Any]]):
+    """Result rows of execute_query(), flagged when the MAX_ROWS cap dropped some"""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), truncated: bool = False):
+        super().__init__(rows)
+        self.truncated = truncated
+
 
 class DatabaseClient:
     """Database client for Supabase/PostgreSQL operations"""
@@ -37,7 +75,6 @@ class DatabaseClient:
         self.database_url = database_url or settings.DATABASE_URL
 
         self._supabase_client: Optional[Client] = None
-        self._pg_connection = None
 
         logger.info("database_client_initialized")
 
@@ -49,61 +86,57 @@ class DatabaseClient:
             logger.info("supabase_client_created")
         return self._supabase_client
 
-    def get_pg_connection(self):
-        """Get PostgreSQL connection (lazy initialization)"""
-        if self._pg_connection is None or self._pg_connection.closed:
-            try:
-                self._pg_connection = psycopg2.connect(
-                    self.database_url,
-                    cursor_factory=RealDictCursor
-                )
-                logger.info("postgresql_connection_established")
-            except Exception as e:
-                logger.error("postgresql_connection_error", error=str(e))
-                raise DatabaseError(f"Failed to connect to PostgreSQL: {e}")
-        return self._pg_connection
+    async def get_pool(self) -> asyncpg.Pool:
+        """Get the shared asyncpg connection pool (created on first use)"""
+        return await get_db_pool(self.database_url)
 
     async def execute_query(
         self,
         sql: str,
         params: Optional[tuple] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> RowList:
         """
         Execute a SQL query and return results
 
         Args:
             sql: SQL query string
             params: Optional query parameters for safe parameterization
+                    (asyncpg style: $1, $2, ...)
 
         Returns:
-            List of result rows as dictionaries
+            RowList of result rows as dictionaries. SELECTs are capped at
+            settings.MAX_ROWS rows; `truncated` is set when more existed.
 
         Raises:
             SQLExecutionError: If query execution fails
         """
         try:
-            logger.info(
+            # SQL text is logged at DEBUG only; it is already returned in the
+            # response and the filtering logger skips disabled levels entirely
+            logger.debug(
                 "executing_sql_query",
                 sql_preview=sql[:200]
             )
 
-            conn = self.get_pg_connection()
-            cursor = conn.cursor()
-
-            # Execute query
-            cursor.execute(sql, params)
-
-            # Fetch results if it's a SELECT query
-            if sql.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                # Convert to list of dicts
-                results_list = [dict(row) for row in results]
-            else:
-                # For non-SELECT queries, commit and return empty list
-                conn.commit()
-                results_list = []
-
-            cursor.close()
+            pool = await self.get_pool()
+            args = params or ()
+
+            async with pool.acquire() as conn:
+                # Fetch results if it's a SELECT query
+                if _is_select(sql):
+                    capped_sql = _apply_row_cap(sql, settings.MAX_ROWS)
+                    rows = await conn.fetch(capped_sql, *args)
+                    truncated = len(rows) > settings.MAX_ROWS
+                    results_list = RowList(
+                        (dict(row) for row in rows[:settings.MAX_ROWS]),
+                        truncated=truncated
+                    )
+                    if truncated:
+                        logger.warning("sql_row_cap_reached", max_rows=settings.MAX_ROWS)
+                else:
+                    # Non-SELECT statements autocommit and return no rows
+                    await conn.execute(sql, *args)
+                    results_list = RowList()
 
             logger.info(
                 "sql_query_executed",
@@ -112,16 +145,74 @@ class DatabaseClient:
 
             return results_list
 
-        except psycopg2.Error as e:
+        except asyncpg.PostgresError as e:
             logger.error("sql_execution_error", error=str(e), sql=sql[:200])
-            # Rollback on error
-            if self._pg_connection and not self._pg_connection.closed:
-                self._pg_connection.rollback()
             raise SQLExecutionError(f"SQL execution failed: {e}")
         except Exception as e:
             logger.error("unexpected_database_error", error=str(e))
             raise DatabaseError(f"Database operation failed: {e}")
 
+    async def execute_query_stream(
+        self,
+        sql: str,
+        params: Optional[tuple] = None,
+        prefetch: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a read-only query and yield rows through a server-side cursor
+
+        Rows are pulled from PostgreSQL in chunks of `prefetch`, so large
+        result sets never have to be held in memory at once. Iteration stops
+        after settings.MAX_ROWS rows.
+
+        Args:
+            sql: SQL query string
+            params: Optional query parameters (asyncpg style: $1, $2, ...)
+            prefetch: Rows fetched per round-trip (defaults to settings.STREAM_FETCH_SIZE)
+
+        Yields:
+            Result rows as dictionaries
+
+        Raises:
+            SQLExecutionError: If query execution fails
+        """
+        logger.debug(
+            "streaming_sql_query",
+            sql_preview=sql[:200]
+        )
+
+        rows_streamed = 0
+        try:
+            pool = await self.get_pool()
+            args = params or ()
+
+            async with pool.acquire() as conn:
+                # Cursors only exist inside a transaction
+                async with conn.transaction():
+                    async for record in conn.cursor(
+                        sql,
+                        *args,
+                        prefetch=prefetch or settings.STREAM_FETCH_SIZE
+                    ):
+                        # Only a row beyond the cap means rows are being dropped
+                        if rows_streamed >= settings.MAX_ROWS:
+                            logger.warning("sql_stream_row_cap_reached", max_rows=settings.MAX_ROWS)
+                            break
+                        yield dict(record)
+                        rows_streamed += 1
+
+        except asyncpg.PostgresError as e:
+            logger.error("sql_execution_error", error=str(e), sql=sql[:200])
+            raise SQLExecutionError(f"SQL execution failed: {e}")
+        except Exception as e:
+            logger.error("unexpected_database_error", error=str(e))
+            raise DatabaseError(f"Database operation failed: {e}")
+
+        logger.info(
+            "sql_query_streamed",
+            rows_returned=rows_streamed
+        )
+
     async def query_table(
         self,
         table_name: str,
@@ -199,11 +290,9 @@ class DatabaseClient:
             logger.error("connection_test_failed", error=str(e))
             raise DatabaseError(f"Database connection test failed: {e}")
 
-    def close(self):
+    async def close(self):
         """Close database connections"""
-        if self._pg_connection and not self._pg_connection.closed:
-            self._pg_connection.close()
-            logger.info("postgresql_connection_closed")
+        await close_db_pool()
 
 
 # Global singleton instance
@@ -0,0 +1,82 @@
+"""
+PostgreSQL Connection Pool for CR360
+
+Provides a process-wide asyncpg pool shared by all database clients
+"""
+
+from typing import Any, Dict, Optional
+import asyncpg
+from app.config import settings
+from app.utils.logger import get_logger
+from app.utils.exceptions import DatabaseError
+
+logger = get_logger(__name__)
+
+
+# Global pool instance (created once per process)
+_db_pool: Optional[asyncpg.Pool] = None
+
+
+async def get_db_pool(database_url: Optional[str] = None) -> asyncpg.Pool:
+    """
+    Get the global asyncpg connection pool, creating it on first use
+
+    The pool is normally created eagerly in the application lifespan so
+    that requests never pay the connection handshake.
+
+    Args:
+        database_url: PostgreSQL connection URL (defaults to settings.DATABASE_URL)
+
+    Returns:
+        asyncpg Pool instance
+
+    Raises:
+        DatabaseError: If the pool cannot be created
+    """
+    global _db_pool
+    if _db_pool is None:
+        try:
+            _db_pool = await asyncpg.create_pool(
+                database_url or settings.DATABASE_URL,
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_LIFETIME,
+                command_timeout=settings.DB_COMMAND_TIMEOUT
+            )
+            logger.info(
+                "postgresql_pool_created",
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE
+            )
+        except Exception as e:
+            logger.error("postgresql_pool_error", error=str(e))
+            raise DatabaseError(f"Failed to connect to PostgreSQL: {e}")
+    return _db_pool
+
+
+async def close_db_pool() -> None:
+    """Close the global connection pool if it was created"""
+    global _db_pool
+    if _db_pool is not None:
+        await _db_pool.close()
+        _db_pool = None
+        logger.info("postgresql_pool_closed")
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Report the current sizing of the global pool
+
+    Returns:
+        Dict with created flag and, once the pool exists, its current size,
+        idle connections, and configured min/max size
+    """
+    if _db_pool is None:
+        return {'created': False}
+    return {
+        'created': True,
+        'size': _db_pool.get_size(),
+        'idle': _db_pool.get_idle_size(),
+        'min_size': _db_pool.get_min_size(),
+        'max_size': _db_pool.get_max_size()
+    }
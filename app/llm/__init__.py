@@ -1,11 +1,15 @@
 """LLM integration module for CR360"""
 
-from app.llm.context_loader import ContextLoader, get_context_loader
+from app.llm.context_loader import ContextLoader, MetricView, get_context_loader
 from app.llm.gemini_client import GeminiClient, get_gemini_client
+from app.llm.embedding_cache import embed_query_cached, clear_embedding_cache
 
 __all__ = [
     'ContextLoader',
+    'MetricView',
     'get_context_loader',
     'GeminiClient',
-    'get_gemini_client'
+    'get_gemini_client',
+    'embed_query_cached',
+    'clear_embedding_cache'
 ]
@@ -8,15 +8,76 @@ Loads and manages the YAML-based semantic model containing:
 - Synonyms for NLP matching
 """
 
+import contextlib
+import io
+import mmap
+import os
+import pickle
+import tempfile
+from collections.abc import Mapping
+from functools import lru_cache
+import ahocorasick
 import yaml
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from app.config import settings
 from app.utils.logger import get_logger
 from app.utils.exceptions import ContextLoadError
 
 logger = get_logger(__name__)
 
+# Semantic models at least this large are parsed from a read-only mmap
+_MMAP_THRESHOLD_BYTES = 256 * 1024
+
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+
+class MetricView(Mapping):
+    """
+    Read-only view of a metric definition plus its name and category
+
+    Behaves like the merged dict {**definition, 'name': ..., 'category': ...}
+    without copying the definition. Use as_dict() when a real dict is needed.
+    """
+
+    __slots__ = ('name', 'category', 'definition')
+
+    _OVERLAY_KEYS = ('name', 'category')
+
+    def __init__(self, name: str, category: str, definition: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.definition = definition
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'name':
+            return self.name
+        if key == 'category':
+            return self.category
+        return self.definition[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.definition:
+            if key not in self._OVERLAY_KEYS:
+                yield key
+        yield from self._OVERLAY_KEYS
+
+    def __len__(self) -> int:
+        return len(self.definition) + sum(
+            1 for key in self._OVERLAY_KEYS if key not in self.definition
+        )
+
+    def __repr__(self) -> str:
+        return f"MetricView(name={self.name!r}, category={self.category!r})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the merged definition as a new dict"""
+        return {**self.definition, 'name': self.name, 'category': self.category}
+
 
 class ContextLoader:
     """Loads and manages the semantic model context"""
@@ -32,6 +93,19 @@ class ContextLoader:
         self.context_file_path = context_file_path or settings.CONTEXT_FILE_PATH
         self.context: Dict[str, Any] = {}
         self._loaded = False
+        # Incremented on every successful load; used to invalidate derived caches
+        self.schema_version = 0
+        # Lookup indexes built once per load (keys are lowercased)
+        self._metric_by_lower_name: Dict[str, MetricView] = {}
+        self._dim_by_lower_name: Dict[str, Dict[str, Any]] = {}
+        # Metric search columns (parallel lists, one row per metric)
+        self._metric_haystacks: List[str] = []
+        self._metric_views: List[MetricView] = []
+        # Aho-Corasick automaton over metric names/synonyms/descriptions (None when empty)
+        self._matcher: Optional[ahocorasick.Automaton] = None
+        # Rendered prompt strings, memoized until the next (re)load
+        self._rendered_full: Optional[str] = None
+        self._rendered_compact: Optional[str] = None
 
     def load(self) -> Dict[str, Any]:
         """
@@ -53,13 +127,27 @@ class ContextLoader:
                     f"Context file not found: {self.context_file_path}"
                 )
 
-            with open(context_path, 'r', encoding='utf-8') as f:
-                self.context = yaml.safe_load(f)
+            use_cache = not settings.DISABLE_YAML_CACHE
+            stat = context_path.stat()
+            cache_key = (stat.st_mtime_ns, stat.st_size)
+            cache_path = self._sidecar_path(context_path)
+
+            cached = self._read_sidecar(cache_path, cache_key) if use_cache else None
+            if cached is not None:
+                self.context = cached
+            else:
+                self.context = self._parse_yaml(context_path, stat.st_size)
 
             # Validate required sections
             self._validate_structure()
 
+            if use_cache and cached is None:
+                self._write_sidecar(cache_path, cache_key)
+
+            self._build_indexes()
+
             self._loaded = True
+            self.schema_version += 1
 
             logger.info(
                 "context_loaded_successfully",
@@ -76,6 +164,80 @@ class ContextLoader:
             logger.error("context_load_error", error=str(e))
             raise ContextLoadError(f"Failed to load context: {e}")
 
+    @staticmethod
+    def _parse_yaml(context_path: Path, size: int) -> Any:
+        """
+        Parse the YAML semantic model
+
+        Large files are parsed straight from a read-only memory map instead
+        of being read into an intermediate Python buffer first.
+
+        Args:
+            context_path: YAML file path
+            size: File size in bytes
+
+        Returns:
+            Parsed YAML document
+        """
+        if size >= _MMAP_THRESHOLD_BYTES:
+            with open(context_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return yaml.load(mm, Loader=_Loader)
+
+        with open(context_path, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=_Loader)
+
+    @staticmethod
+    def _sidecar_path(context_path: Path) -> Path:
+        """Path of the pickled copy of a YAML file (e.g. model.yaml -> model.yaml.pkl)"""
+        return context_path.with_suffix(context_path.suffix + '.pkl')
+
+    @staticmethod
+    def _read_sidecar(cache_path: Path, cache_key: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """
+        Read the pickled context if it was written for the current YAML file
+
+        Args:
+            cache_path: Sidecar file path
+            cache_key: (mtime_ns, size) of the YAML file
+
+        Returns:
+            Cached context, or None if the sidecar is missing, stale or unreadable
+        """
+        if not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                stored_key, context = pickle.load(f)
+        except Exception as e:
+            logger.warning("context_cache_read_error", path=str(cache_path), error=str(e))
+            return None
+        if tuple(stored_key) != cache_key:
+            return None
+        logger.debug("context_cache_hit", path=str(cache_path))
+        return context
+
+    def _write_sidecar(self, cache_path: Path, cache_key: Tuple[int, int]) -> None:
+        """
+        Write the parsed context next to the YAML file (failures are non-fatal)
+
+        The pickle goes to a temp file in the same directory and is renamed
+        into place, so workers starting together never read a partial sidecar.
+        """
+        tmp_name = None
+        try:
+            fd, tmp_name = tempfile.mkstemp(
+                dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((cache_key, self.context), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, cache_path)
+        except OSError as e:
+            logger.warning("context_cache_write_error", path=str(cache_path), error=str(e))
+            if tmp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
+
     def _validate_structure(self) -> None:
         """
         Validate that required sections exist in the semantic model
@@ -115,7 +277,75 @@ class ContextLoader:
             self.load()
         return self.context.get('business_rules', [])
 
-    def get_metric_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+    def _iter_metric_defs(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (category, metric_name, metric_def) for every nested metric definition"""
+        for category, category_metrics in self.context.get('metrics', {}).items():
+            if isinstance(category_metrics, dict):
+                for metric_name, metric_def in category_metrics.items():
+                    if isinstance(metric_def, dict):
+                        yield category, metric_name, metric_def
+
+    def _build_indexes(self) -> None:
+        """
+        Build lowercase lookup indexes for metrics and dimensions
+
+        Entries are built once per load and shared between callers, so the
+        lookup methods below are a dict hit or a scan over pre-lowered strings.
+        Metrics are stored column-wise: row i of _metric_haystacks holds the
+        lowered name, synonyms and description of _metric_views[i], joined with
+        NUL separators, so a search is a single substring test per row.
+        """
+        metric_by_name: Dict[str, MetricView] = {}
+        haystacks: List[str] = []
+        views: List[MetricView] = []
+        metric_terms: List[Tuple[str, ...]] = []
+
+        for category, metric_name, metric_def in self._iter_metric_defs():
+            entry = MetricView(metric_name, category, metric_def)
+            name_lower = metric_name.lower()
+            # First definition wins, as with the original category scan
+            metric_by_name.setdefault(name_lower, entry)
+
+            terms = (
+                name_lower,
+                *(syn.lower() for syn in metric_def.get('synonyms') or ()),
+                (metric_def.get('description') or '').lower()
+            )
+            metric_terms.append(terms)
+            haystacks.append('\x00'.join(terms))
+            views.append(entry)
+
+        dim_by_name: Dict[str, Dict[str, Any]] = {}
+        for dim_name, dim_def in (self.context.get('dimensions') or {}).items():
+            if isinstance(dim_def, dict):
+                dim_by_name.setdefault(dim_name.lower(), {**dim_def, 'name': dim_name})
+
+        # Map every lowered term to the metric rows it belongs to, so a
+        # synonym shared by several metrics reports all of them
+        term_rows: Dict[str, List[int]] = {}
+        for row, terms in enumerate(metric_terms):
+            for term in terms:
+                if term:
+                    rows = term_rows.setdefault(term, [])
+                    if not rows or rows[-1] != row:
+                        rows.append(row)
+
+        matcher = None
+        if term_rows:
+            matcher = ahocorasick.Automaton()
+            for term, rows in term_rows.items():
+                matcher.add_word(term, tuple(rows))
+            matcher.make_automaton()
+
+        self._metric_by_lower_name = metric_by_name
+        self._dim_by_lower_name = dim_by_name
+        self._metric_haystacks = haystacks
+        self._metric_views = views
+        self._matcher = matcher
+        self._rendered_full = None
+        self._rendered_compact = None
+
+    def get_metric_by_name(self, name: str) -> Optional[MetricView]:
         """
         Get a specific metric by name
 
@@ -125,16 +355,9 @@ class ContextLoader:
         Returns:
             Metric definition or None if not found
         """
-        metrics = self.get_metrics()
-
-        # Search in all metric categories
-        for category, category_metrics in metrics.items():
-            if isinstance(category_metrics, dict):
-                for metric_name, metric_def in category_metrics.items():
-                    if metric_name.lower() == name.lower():
-                        return {**metric_def, 'name': metric_name, 'category': category}
-
-        return None
+        if not self._loaded:
+            self.load()
+        return self._metric_by_lower_name.get(name.lower())
 
     def get_dimension_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """
@@ -146,15 +369,11 @@ class ContextLoader:
         Returns:
             Dimension definition or None if not found
         """
-        dimensions = self.get_dimensions()
-
-        for dim_name, dim_def in dimensions.items():
-            if dim_name.lower() == name.lower():
-                return {**dim_def, 'name': dim_name}
-
-        return None
+        if not self._loaded:
+            self.load()
+        return self._dim_by_lower_name.get(name.lower())
 
-    def search_metrics_by_synonym(self, query: str) -> List[Dict[str, Any]]:
+    def search_metrics_by_synonym(self, query: str) -> List[MetricView]:
         """
         Search for metrics by synonym or description
 
@@ -164,30 +383,38 @@ class ContextLoader:
         Returns:
             List of matching metric definitions
         """
+        if not self._loaded:
+            self.load()
+
         query_lower = query.lower()
-        matches = []
-        metrics = self.get_metrics()
+        return [
+            view
+            for haystack, view in zip(self._metric_haystacks, self._metric_views)
+            if query_lower in haystack
+        ]
 
-        for category, category_metrics in metrics.items():
-            if isinstance(category_metrics, dict):
-                for metric_name, metric_def in category_metrics.items():
-                    # Check name
-                    if query_lower in metric_name.lower():
-                        matches.append({**metric_def, 'name': metric_name, 'category': category})
-                        continue
+    def match_metrics_in_text(self, text: str) -> List[MetricView]:
+        """
+        Find metrics whose name, synonym or description occurs in a text
 
-                    # Check synonyms
-                    synonyms = metric_def.get('synonyms', [])
-                    if any(query_lower in syn.lower() for syn in synonyms):
-                        matches.append({**metric_def, 'name': metric_name, 'category': category})
-                        continue
+        This is the reverse of search_metrics_by_synonym: every known term is
+        matched against the text in a single pass, so the cost depends on the
+        length of the text rather than the number of synonyms.
 
-                    # Check description
-                    description = metric_def.get('description', '')
-                    if query_lower in description.lower():
-                        matches.append({**metric_def, 'name': metric_name, 'category': category})
+        Args:
+            text: Free text, e.g. a user question
 
-        return matches
+        Returns:
+            Unique matching metric definitions, in semantic model order
+        """
+        if not self._loaded:
+            self.load()
+        if self._matcher is None:
+            return []
+
+        rows = {row for _, hit_rows in self._matcher.iter(text.lower()) for row in hit_rows}
+        views = self._metric_views
+        return [views[row] for row in sorted(rows)]
 
     def get_context_for_llm(self) -> str:
         """
@@ -199,8 +426,15 @@ class ContextLoader:
         if not self._loaded:
             self.load()
 
-        # Convert YAML back to string for LLM consumption
-        return yaml.dump(self.context, default_flow_style=False, sort_keys=False)
+        if self._rendered_full is None:
+            # Convert YAML back to string for LLM consumption
+            self._rendered_full = yaml.dump(
+                self.context,
+                Dumper=_Dumper,
+                default_flow_style=False,
+                sort_keys=False
+            )
+        return self._rendered_full
 
     def get_compact_context(self) -> str:
         """
@@ -213,21 +447,23 @@ class ContextLoader:
         if not self._loaded:
             self.load()
 
-        output = ["# Available Metrics\n"]
-        metrics = self.get_metrics()
-        for category, category_metrics in metrics.items():
-            output.append(f"\n## {category}")
-            if isinstance(category_metrics, dict):
-                for metric_name in category_metrics.keys():
-                    output.append(f"  - {metric_name}")
+        if self._rendered_compact is None:
+            buf = io.StringIO()
+            write = buf.write
 
-        output.append("\n\n# Available Dimensions\n")
-        dimensions = self.get_dimensions()
-        for dim_name, dim_def in dimensions.items():
-            levels = dim_def.get('levels', [])
-            output.append(f"  - {dim_name}: {', '.join(levels)}")
+            write("# Available Metrics\n")
+            for category, category_metrics in self.get_metrics().items():
+                write(f"\n\n## {category}")
+                if isinstance(category_metrics, dict):
+                    for metric_name in category_metrics:
+                        write(f"\n  - {metric_name}")
 
-        return '\n'.join(output)
+            write("\n\n\n# Available Dimensions\n")
+            for dim_name, dim_def in self.get_dimensions().items():
+                write(f"\n  - {dim_name}: {', '.join(dim_def.get('levels', []))}")
+
+            self._rendered_compact = buf.getvalue()
+        return self._rendered_compact
 
     def reload(self) -> Dict[str, Any]:
         """
@@ -238,21 +474,21 @@ class ContextLoader:
         """
         self._loaded = False
         self.context = {}
+        self._rendered_full = None
+        self._rendered_compact = None
+        self._sidecar_path(Path(self.context_file_path)).unlink(missing_ok=True)
         return self.load()
 
 
-# Global singleton instance
-_context_loader: Optional[ContextLoader] = None
-
-
+@lru_cache(maxsize=1)
 def get_context_loader() -> ContextLoader:
     """
     Get the global context loader instance (singleton pattern)
 
+    The instance is memoized by lru_cache; call get_context_loader.cache_clear()
+    to drop it.
+
     Returns:
         ContextLoader instance
     """
-    global _context_loader
-    if _context_loader is None:
-        _context_loader = ContextLoader()
-    return _context_loader
+    return ContextLoader()
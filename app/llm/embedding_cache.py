@@ -0,0 +1,57 @@
+"""
+Embedding Cache for CR360
+
+Process-local LRU of query embeddings, so retries and repeated questions
+within a process do not pay another Gemini round-trip. Keys are SHA-256
+digests of the exact text, which bounds key memory regardless of query
+length.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional
+from app.llm.gemini_client import GeminiClient, get_gemini_client
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_CACHE_MAXSIZE = 2048
+
+# Process-local embedding cache shared by every caller (LRU eviction)
+EMBEDDING_CACHE: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+async def embed_query_cached(
+    text: str,
+    llm_client: Optional[GeminiClient] = None
+) -> List[float]:
+    """
+    Embed text, reusing a previous embedding of the same text
+
+    Args:
+        text: Text to embed
+        llm_client: Client used on a miss (defaults to the shared client)
+
+    Returns:
+        Embedding vector
+
+    Raises:
+        LLMError: If the embedding call fails (failures are not cached)
+    """
+    key = hashlib.sha256(text.encode()).hexdigest()
+    embedding = EMBEDDING_CACHE.get(key)
+    if embedding is not None:
+        EMBEDDING_CACHE.move_to_end(key)
+        return embedding
+
+    embedding = await (llm_client or get_gemini_client()).embed(text)
+    EMBEDDING_CACHE[key] = embedding
+    if len(EMBEDDING_CACHE) > EMBEDDING_CACHE_MAXSIZE:
+        EMBEDDING_CACHE.popitem(last=False)
+    return embedding
+
+
+def clear_embedding_cache() -> None:
+    """Drop all cached embeddings"""
+    EMBEDDING_CACHE.clear()
+    logger.info("embedding_cache_cleared")
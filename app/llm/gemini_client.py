@@ -8,14 +8,296 @@ Handles all interactions with Google Gemini API for:
 - Investigation hypothesis generation
 """
 
-import google.generativeai as genai
-from typing import Optional, Dict, Any, List
+import asyncio
+import inspect
+import re
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+import orjson
 from app.config import settings
 from app.utils.logger import get_logger
 from app.utils.exceptions import LLMError
 
 logger = get_logger(__name__)
 
+# SQL generation response sections, each searched on its own so the LLM may
+# emit them in any order. A fence left open by a truncated reply runs to the
+# end of the text; prose sections end at the next section header or fence.
+_SQL_BLOCK_RE = re.compile(r"```sql(?P<sql>.*?)(?:```|\Z)", re.DOTALL)
+# Fallback for responses that fence the SQL without a language tag
+_CODE_BLOCK_RE = re.compile(r"```(?P<sql>.*?)(?:```|\Z)", re.DOTALL)
+_EXPLANATION_RE = re.compile(r"Explanation:(?P<text>.*?)(?=Metrics used:|```|\Z)", re.DOTALL)
+_METRICS_RE = re.compile(r"Metrics used:(?P<text>.*?)(?=Explanation:|```|\Z)", re.DOTALL)
+_METRICS_SPLIT_RE = re.compile(r"[,\n]")
+# Section headers of an ambiguity detection response (split keeps the names)
+_AMBIGUITY_SECTION_RE = re.compile(r"(Reasons|Suggestions|Questions):")
+# Clarification questions: the JSON array inside the "Questions:" section
+_JSON_ARRAY_RE = re.compile(r"\[[\s\S]*\]")
+
+
+# google.generativeai pulls in grpc, protobuf and google-auth, so it is only
+# imported when the first GeminiClient is built (see _import_genai)
+genai = None
+
+# Prompt templates for generate_with_context / generate_sql
+_CONTEXT_PROMPT_TMPL = "Context:\n{context}\n\n---\n\nUser Query:\n{prompt}\n"
+_HISTORY_PROMPT_TMPL = "Previous conversation:\n{history}\n\nCurrent query: {query}"
+_QUERY_PROMPT_TMPL = "Current query: {query}"
+
+# Upper bound on GenerativeModel instances kept per client
+_MODEL_CACHE_MAXSIZE = 32
+# Upper bound on augmented clarification queries kept per client
+_AUGMENT_CACHE_MAXSIZE = 128
+
+
+def _import_genai():
+    """Import google.generativeai on first use and return the module"""
+    global genai
+    if genai is None:
+        import google.generativeai as genai_module
+        genai = genai_module
+    return genai
+
+
+@lru_cache(maxsize=256)
+def _parse_sql_text(response: str) -> Tuple[str, str, Tuple[str, ...]]:
+    """
+    Parse a SQL generation response (memoized on the response text)
+
+    Args:
+        response: Raw LLM response
+
+    Returns:
+        Tuple of (sql, explanation, metrics_used)
+    """
+    code_block = _SQL_BLOCK_RE.search(response) or _CODE_BLOCK_RE.search(response)
+    sql = code_block.group('sql').strip() if code_block else ""
+
+    explanation_match = _EXPLANATION_RE.search(response)
+    explanation = explanation_match.group('text').strip() if explanation_match else ""
+
+    # Parse comma or newline separated list, handle bullet points (-, *)
+    metrics_match = _METRICS_RE.search(response)
+    metrics = tuple(
+        m.strip().lstrip('-*').strip()
+        for m in _METRICS_SPLIT_RE.split(metrics_match.group('text') if metrics_match else "")
+        if m.strip()
+    )
+
+    return sql, explanation, metrics
+
+
+def _build_query_prompt(
+    query: str,
+    conversation_history: Optional[List[Dict[str, str]]]
+) -> str:
+    """Build the user prompt, prefixed by the last 3 conversation turns"""
+    if not conversation_history:
+        return _QUERY_PROMPT_TMPL.format(query=query)
+    history = "\n".join(
+        f"{role.capitalize()}: {content}"
+        for turn in conversation_history[-3:]
+        for role, content in turn.items()
+    )
+    return _HISTORY_PROMPT_TMPL.format(history=history, query=query)
+
+
+def _parse_bullets(text: str) -> List[str]:
+    """Split a response section into its non-empty lines, without bullet markers"""
+    return [line.strip('- ').strip() for line in text.splitlines() if line.strip()]
+
+
+def _validate_questions(questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return the clarification questions, or [] if any is malformed"""
+    for q in questions:
+        if not all(key in q for key in ['question_id', 'question_text', 'options']):
+            logger.warning(
+                "invalid_question_structure",
+                question=q
+            )
+            return []
+        if not isinstance(q['options'], list) or len(q['options']) < 2:
+            logger.warning(
+                "invalid_question_options",
+                question_id=q.get('question_id')
+            )
+            return []
+    return questions
+
+
+# System instructions are module constants so every call (and the model
+# cache key) shares one interned string object
+_SQL_SYSTEM_INSTRUCTION = sys.intern("""You are a SQL expert for credit risk analytics with TWO-TIER query routing capability.
+
+DATABASE SCHEMA (Two Tables):
+
+1. `accounts` table - Account-level granular data (1,141 rows)
+   - Use for: Breakdowns, GROUP BY queries, account filters, drill-downs
+   - Primary key: (account_id, as_of_date)
+   - Key columns: product_code, region_code, customer_segment, adjusted_eop_balance, days_past_due
+
+2. `computed_metrics` table - Pre-aggregated portfolio metrics (8 rows, one per quarter)
+   - Use for: Portfolio totals, complex ratios, pre-calculated metrics
+   - Primary key: as_of_date
+   - Key columns: total_outstanding_balance, delinquency_rate_30_plus, net_charge_off_rate, ecl_coverage_ratio
+
+CRITICAL ROUTING RULES:
+
+✅ Use `computed_metrics` when:
+  - Query asks for "total", "overall", "portfolio-level" metric
+  - Complex calculations like NCO rate, ECL coverage (annualization is error-prone)
+  - No breakdown by product/region/segment needed
+  - Example: "What is the total delinquency rate?"
+
+✅ Use `accounts` when:
+  - Query needs GROUP BY (by product, region, segment, vintage)
+  - Account-level filters (credit score ranges, customer_id, DPD buckets)
+  - Drill-downs and breakdowns
+  - Example: "What is the delinquency rate BY PRODUCT?"
+
+IMPORTANT SQL PATTERNS:
+
+Pattern 1 - Portfolio Total (use computed_metrics):
+```sql
+SELECT delinquency_rate_30_plus
+FROM computed_metrics
+WHERE as_of_date = (SELECT MAX(as_of_date) FROM computed_metrics)
+```
+
+Pattern 2 - Breakdown by Dimension (use accounts):
+```sql
+SELECT
+  product_code,
+  SUM(CASE WHEN days_past_due >= 30 THEN adjusted_eop_balance ELSE 0 END) /
+  NULLIF(SUM(adjusted_eop_balance), 0) * 100 as delinquency_rate
+FROM accounts
+WHERE as_of_date = (SELECT MAX(as_of_date) FROM accounts)
+GROUP BY product_code
+ORDER BY delinquency_rate DESC
+```
+
+Pattern 3 - Account-Level Query (use accounts):
+```sql
+SELECT account_id, customer_id, current_credit_score, adjusted_eop_balance
+FROM accounts
+WHERE product_code = 'AUTO' AND current_credit_score < 650
+  AND as_of_date = (SELECT MAX(as_of_date) FROM accounts)
+ORDER BY adjusted_eop_balance DESC
+LIMIT 100
+```
+
+CRITICAL PostgreSQL constraints:
+- If using GROUP BY, every non-aggregated column in SELECT/ORDER BY MUST be in GROUP BY
+- For simple portfolio totals with no dimensions, use computed_metrics (no GROUP BY needed)
+- For "latest" date filtering, use WHERE with MAX() subquery, NOT ORDER BY + LIMIT
+- Always use NULLIF(SUM(denominator), 0) for rate calculations to avoid division by zero
+
+NEVER calculate complex ratios from accounts table if available in computed_metrics.
+ALWAYS validate which table to use before generating SQL.
+
+Output format:
+```sql
+[Your SQL query here]
+```
+
+Explanation: [Brief explanation including which table you chose and why]
+
+Metrics used: [List of metrics from semantic model]
+""")
+
+_AMBIGUITY_SYSTEM_INSTRUCTION = sys.intern("""You are an expert at detecting ambiguous queries in credit risk analytics.
+
+Analyze the user's query and determine if it's ambiguous based on:
+1. Multiple possible metric interpretations
+2. Missing time period
+3. Missing aggregation level (product, region, etc.)
+4. Unclear comparison dimensions
+
+Output format (IMPORTANT: Include BOTH old format for backward compatibility AND new structured questions):
+
+Ambiguous: [Yes/No]
+
+Reasons:
+- [Reason 1]
+- [Reason 2]
+
+Suggestions:
+- [Suggestion 1]
+- [Suggestion 2]
+
+Questions:
+[
+  {
+    "question_id": "unique_id_1",
+    "question_text": "What type of charge-off do you mean?",
+    "options": ["Gross charge-off", "Net charge-off"]
+  },
+  {
+    "question_id": "unique_id_2",
+    "question_text": "Which time period?",
+    "options": ["Latest quarter", "Q4 2024", "Q3 2024", "All quarters"]
+  }
+]
+
+CRITICAL RULES FOR QUESTIONS:
+1. question_id should be short, snake_case identifier (e.g., "charge_off_type", "time_period", "balance_type", "metric_type")
+2. question_text should be a clear question ending with "?"
+3. options should be 2-5 concrete choices the user can select
+4. Each question should resolve ONE ambiguity
+5. If query has multiple ambiguities, create multiple questions
+6. Options should be mutually exclusive within each question
+7. Use JSON array format exactly as shown above
+8. Common question IDs to use:
+   - charge_off_type: for gross vs net charge-off
+   - balance_type: for outstanding vs original balance
+   - time_period: for missing quarters/dates
+   - metric_type: for unclear metric selection
+   - aggregation_level: for product, region, account level
+""")
+
+
+# Single-call analysis: the SQL routing rules followed by the ambiguity
+# criteria, answered as one JSON object
+_ANALYZE_SYSTEM_INSTRUCTION = sys.intern(
+    _SQL_SYSTEM_INSTRUCTION.partition("Output format:")[0]
+    + """AMBIGUITY CHECK (do this before writing SQL):
+
+A query is ambiguous when it has:
+1. Multiple possible metric interpretations
+2. Missing time period
+3. Missing aggregation level (product, region, etc.)
+4. Unclear comparison dimensions
+
+Output format: respond with ONE JSON object and nothing else:
+{
+  "is_ambiguous": false,
+  "reasons": ["Reason 1"],
+  "suggestions": ["Suggestion 1"],
+  "questions": [
+    {
+      "question_id": "charge_off_type",
+      "question_text": "What type of charge-off do you mean?",
+      "options": ["Gross charge-off", "Net charge-off"]
+    }
+  ],
+  "sql": "SELECT ...",
+  "explanation": "Brief explanation including which table you chose and why",
+  "metrics_used": ["metric_name"]
+}
+
+RULES:
+- If the query is ambiguous, set "is_ambiguous" to true, fill "reasons",
+  "suggestions" and "questions", and leave "sql" empty.
+- Otherwise set "is_ambiguous" to false, leave "reasons", "suggestions" and
+  "questions" empty, and fill "sql", "explanation" and "metrics_used".
+- question_id is a short snake_case identifier (charge_off_type, balance_type,
+  time_period, metric_type, aggregation_level); question_text ends with "?";
+  options are 2-5 mutually exclusive concrete choices; one question per ambiguity.
+"""
+)
+
 
 class GeminiClient:
     """Client for Google Gemini API interactions"""
@@ -41,11 +323,13 @@ class GeminiClient:
         self.temperature = temperature if temperature is not None else settings.LLM_TEMPERATURE
         self.max_tokens = max_tokens or settings.LLM_MAX_TOKENS
 
+        self._genai = _import_genai()
+
         # Configure the API
-        genai.configure(api_key=self.api_key)
+        self._genai.configure(api_key=self.api_key)
 
         # Initialize the model
-        self.model = genai.GenerativeModel(
+        self.model = self._genai.GenerativeModel(
             model_name=self.model_name,
             generation_config={
                 'temperature': self.temperature,
@@ -53,6 +337,13 @@ class GeminiClient:
             }
         )
 
+        # Models built for other (system_instruction, generation_config)
+        # combinations, least recently used first
+        self._model_cache: OrderedDict = OrderedDict()
+
+        # Augmented queries keyed by (query, ((question_id, selected_option), ...))
+        self._augment_cache: OrderedDict = OrderedDict()
+
         logger.info(
             "gemini_client_initialized",
             model=self.model_name,
@@ -60,6 +351,57 @@ class GeminiClient:
             max_tokens=self.max_tokens
         )
 
+    def _get_model(
+        self,
+        system_instruction: Optional[str],
+        generation_config: Dict[str, Any]
+    ) -> Any:
+        """
+        Get a model for the given system instruction and generation config
+
+        The default configuration resolves to the model built in __init__;
+        other combinations are built once and kept in a bounded LRU cache.
+
+        Args:
+            system_instruction: Optional system instruction
+            generation_config: Full generation config
+
+        Returns:
+            GenerativeModel instance
+        """
+        default_config = {
+            'temperature': self.temperature,
+            'max_output_tokens': self.max_tokens,
+        }
+        if not system_instruction and generation_config == default_config:
+            return self.model
+
+        key = (system_instruction or '', tuple(sorted(generation_config.items())))
+        try:
+            model = self._model_cache.get(key)
+        except TypeError:
+            # Unhashable config values (e.g. stop sequence lists) are not cached
+            key, model = None, None
+
+        if model is not None:
+            self._model_cache.move_to_end(key)
+            return model
+
+        model_kwargs = {
+            'model_name': self.model_name,
+            'generation_config': generation_config,
+        }
+        if system_instruction:
+            model_kwargs['system_instruction'] = system_instruction
+        model = self._genai.GenerativeModel(**model_kwargs)
+
+        if key is not None:
+            self._model_cache[key] = model
+            if len(self._model_cache) > _MODEL_CACHE_MAXSIZE:
+                self._model_cache.popitem(last=False)
+
+        return model
+
     async def generate(
         self,
         prompt: str,
@@ -94,21 +436,15 @@ class GeminiClient:
                 **kwargs
             }
 
-            # Create model with system instruction if provided
-            if system_instruction:
-                model = genai.GenerativeModel(
-                    model_name=self.model_name,
-                    generation_config=generation_config,
-                    system_instruction=system_instruction
-                )
-            else:
-                model = genai.GenerativeModel(
-                    model_name=self.model_name,
-                    generation_config=generation_config
-                )
+            model = self._get_model(system_instruction, generation_config)
 
-            # Generate response
-            response = model.generate_content(prompt)
+            # Prefer the library's native async call; otherwise run the
+            # blocking call off the event loop so request timeouts can fire
+            generate_async = getattr(model, 'generate_content_async', None)
+            if inspect.iscoroutinefunction(generate_async):
+                response = await generate_async(prompt)
+            else:
+                response = await asyncio.to_thread(model.generate_content, prompt)
 
             if not response or not response.text:
                 raise LLMError("Empty response from Gemini API")
@@ -124,6 +460,50 @@ class GeminiClient:
             logger.error("llm_generation_error", error=str(e))
             raise LLMError(f"Failed to generate response: {e}")
 
+    async def warmup(self) -> None:
+        """
+        Open the Gemini connection ahead of the first real request
+
+        Issues a count_tokens call, which is not billed, on the shared
+        generative service client (also used by embed_content), so the
+        first generation skips DNS, TLS and auth setup. Failures are
+        logged, not raised.
+        """
+        try:
+            count_async = getattr(self.model, 'count_tokens_async', None)
+            if inspect.iscoroutinefunction(count_async):
+                await count_async("warmup")
+            else:
+                await asyncio.to_thread(self.model.count_tokens, "warmup")
+            logger.info("gemini_client_warmed_up")
+        except Exception as e:
+            logger.warning("gemini_client_warmup_failed", error=str(e))
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed text with the Gemini embedding model
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+
+        Raises:
+            LLMError: If the embedding call fails
+        """
+        try:
+            result = await asyncio.to_thread(
+                self._genai.embed_content,
+                model=settings.EMBEDDING_MODEL,
+                content=text,
+                task_type="retrieval_query"
+            )
+            return result['embedding']
+        except Exception as e:
+            logger.error("embedding_error", error=str(e))
+            raise LLMError(f"Failed to embed text: {e}")
+
     async def generate_with_context(
         self,
         prompt: str,
@@ -147,14 +527,7 @@ class GeminiClient:
             LLMError: If generation fails
         """
         # Combine context and prompt
-        full_prompt = f"""Context:
-{context}
-
----
-
-User Query:
-{prompt}
-"""
+        full_prompt = _CONTEXT_PROMPT_TMPL.format(context=context, prompt=prompt)
 
         return await self.generate(
             prompt=full_prompt,
@@ -174,7 +547,8 @@ User Query:
         Args:
             natural_language_query: User's natural language query
             semantic_context: YAML semantic model context
-            conversation_history: Optional conversation history
+            conversation_history: Optional conversation history; each turn maps
+                                  role ('user' / 'assistant') to message content
 
         Returns:
             Dict with 'sql', 'explanation', and 'metrics_used'
@@ -184,97 +558,10 @@ User Query:
         """
         try:
             # Build system instruction with two-tier routing
-            system_instruction = """You are a SQL expert for credit risk analytics with TWO-TIER query routing capability.
-
-DATABASE SCHEMA (Two Tables):
-
-1. `accounts` table - Account-level granular data (1,141 rows)
-   - Use for: Breakdowns, GROUP BY queries, account filters, drill-downs
-   - Primary key: (account_id, as_of_date)
-   - Key columns: product_code, region_code, customer_segment, adjusted_eop_balance, days_past_due
-
-2. `computed_metrics` table - Pre-aggregated portfolio metrics (8 rows, one per quarter)
-   - Use for: Portfolio totals, complex ratios, pre-calculated metrics
-   - Primary key: as_of_date
-   - Key columns: total_outstanding_balance, delinquency_rate_30_plus, net_charge_off_rate, ecl_coverage_ratio
-
-CRITICAL ROUTING RULES:
-
-✅ Use `computed_metrics` when:
-  - Query asks for "total", "overall", "portfolio-level" metric
-  - Complex calculations like NCO rate, ECL coverage (annualization is error-prone)
-  - No breakdown by product/region/segment needed
-  - Example: "What is the total delinquency rate?"
-
-✅ Use `accounts` when:
-  - Query needs GROUP BY (by product, region, segment, vintage)
-  - Account-level filters (credit score ranges, customer_id, DPD buckets)
-  - Drill-downs and breakdowns
-  - Example: "What is the delinquency rate BY PRODUCT?"
+            system_instruction = _SQL_SYSTEM_INSTRUCTION
 
-IMPORTANT SQL PATTERNS:
-
-Pattern 1 - Portfolio Total (use computed_metrics):
-```sql
-SELECT delinquency_rate_30_plus
-FROM computed_metrics
-WHERE as_of_date = (SELECT MAX(as_of_date) FROM computed_metrics)
-```
-
-Pattern 2 - Breakdown by Dimension (use accounts):
-```sql
-SELECT
-  product_code,
-  SUM(CASE WHEN days_past_due >= 30 THEN adjusted_eop_balance ELSE 0 END) /
-  NULLIF(SUM(adjusted_eop_balance), 0) * 100 as delinquency_rate
-FROM accounts
-WHERE as_of_date = (SELECT MAX(as_of_date) FROM accounts)
-GROUP BY product_code
-ORDER BY delinquency_rate DESC
-```
-
-Pattern 3 - Account-Level Query (use accounts):
-```sql
-SELECT account_id, customer_id, current_credit_score, adjusted_eop_balance
-FROM accounts
-WHERE product_code = 'AUTO' AND current_credit_score < 650
-  AND as_of_date = (SELECT MAX(as_of_date) FROM accounts)
-ORDER BY adjusted_eop_balance DESC
-LIMIT 100
-```
-
-CRITICAL PostgreSQL constraints:
-- If using GROUP BY, every non-aggregated column in SELECT/ORDER BY MUST be in GROUP BY
-- For simple portfolio totals with no dimensions, use computed_metrics (no GROUP BY needed)
-- For "latest" date filtering, use WHERE with MAX() subquery, NOT ORDER BY + LIMIT
-- Always use NULLIF(SUM(denominator), 0) for rate calculations to avoid division by zero
-
-NEVER calculate complex ratios from accounts table if available in computed_metrics.
-ALWAYS validate which table to use before generating SQL.
-
-Output format:
-```sql
-[Your SQL query here]
-```
-
-Explanation: [Brief explanation including which table you chose and why]
-
-Metrics used: [List of metrics from semantic model]
-"""
-
-            # Build prompt with conversation history
-            prompt_parts = []
-
-            if conversation_history:
-                prompt_parts.append("Previous conversation:")
-                for turn in conversation_history[-3:]:  # Last 3 turns
-                    prompt_parts.append(f"User: {turn.get('user', '')}")
-                    prompt_parts.append(f"Assistant: {turn.get('assistant', '')}")
-                prompt_parts.append("")
-
-            prompt_parts.append(f"Current query: {natural_language_query}")
-
-            prompt = "\n".join(prompt_parts)
+            # Build prompt with conversation history (last 3 turns)
+            prompt = _build_query_prompt(natural_language_query, conversation_history)
 
             # Generate SQL
             response = await self.generate_with_context(
@@ -314,101 +601,105 @@ Metrics used: [List of metrics from semantic model]
         Returns:
             Tuple of (sql, explanation, metrics_used)
         """
-        sql = ""
-        explanation = ""
-        metrics = []
-
-        # Extract SQL from code blocks
-        if "```sql" in response:
-            sql_start = response.find("```sql") + 6
-            sql_end = response.find("```", sql_start)
-            sql = response[sql_start:sql_end].strip()
-        elif "```" in response:
-            sql_start = response.find("```") + 3
-            sql_end = response.find("```", sql_start)
-            sql = response[sql_start:sql_end].strip()
-
-        # Extract explanation
-        if "Explanation:" in response:
-            exp_start = response.find("Explanation:") + 12
-            exp_end = response.find("Metrics used:", exp_start)
-            if exp_end == -1:
-                exp_end = len(response)
-            explanation = response[exp_start:exp_end].strip()
-
-        # Extract metrics
-        if "Metrics used:" in response:
-            metrics_start = response.find("Metrics used:") + 13
-            metrics_text = response[metrics_start:].strip()
-            # Parse comma or newline separated list, handle bullet points (-, *)
-            metrics = [m.strip().lstrip('-*').strip() for m in metrics_text.replace('\n', ',').split(',') if m.strip()]
-
-        return sql, explanation, metrics
+        sql, explanation, metrics = _parse_sql_text(response)
+        return sql, explanation, list(metrics)
 
-    async def detect_ambiguity(
+    async def analyze_and_generate(
         self,
         natural_language_query: str,
-        semantic_context: str
+        semantic_context: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
         """
-        Detect if a query is ambiguous and suggest clarifications
+        Check ambiguity and generate SQL in a single LLM call
 
         Args:
-            natural_language_query: User's query
-            semantic_context: Semantic model context
+            natural_language_query: User's natural language query
+            semantic_context: YAML semantic model context
+            conversation_history: Optional conversation history; each turn maps
+                                  role ('user' / 'assistant') to message content
 
         Returns:
-            Dict with 'is_ambiguous', 'reasons', 'suggestions', and 'questions'
+            Dict with the detect_ambiguity() keys ('is_ambiguous', 'reasons',
+            'suggestions', 'questions') and the generate_sql() keys ('sql',
+            'explanation', 'metrics_used'); 'sql' is empty when ambiguous
+
+        Raises:
+            LLMError: If generation or parsing fails
         """
-        system_instruction = """You are an expert at detecting ambiguous queries in credit risk analytics.
+        try:
+            prompt = _build_query_prompt(natural_language_query, conversation_history)
 
-Analyze the user's query and determine if it's ambiguous based on:
-1. Multiple possible metric interpretations
-2. Missing time period
-3. Missing aggregation level (product, region, etc.)
-4. Unclear comparison dimensions
+            response = await self.generate_with_context(
+                prompt=prompt,
+                context=semantic_context,
+                system_instruction=_ANALYZE_SYSTEM_INSTRUCTION,
+                temperature=0.1  # Low temperature for SQL generation
+            )
 
-Output format (IMPORTANT: Include BOTH old format for backward compatibility AND new structured questions):
+            result = self._parse_analysis_response(response)
 
-Ambiguous: [Yes/No]
+            logger.info(
+                "query_analyzed_and_sql_generated",
+                is_ambiguous=result['is_ambiguous'],
+                sql_length=len(result['sql']),
+                metrics_count=len(result['metrics_used'])
+            )
 
-Reasons:
-- [Reason 1]
-- [Reason 2]
+            return result
 
-Suggestions:
-- [Suggestion 1]
-- [Suggestion 2]
+        except Exception as e:
+            logger.error("analyze_and_generate_error", error=str(e))
+            raise LLMError(f"Failed to analyze query: {e}")
 
-Questions:
-[
-  {
-    "question_id": "unique_id_1",
-    "question_text": "What type of charge-off do you mean?",
-    "options": ["Gross charge-off", "Net charge-off"]
-  },
-  {
-    "question_id": "unique_id_2",
-    "question_text": "Which time period?",
-    "options": ["Latest quarter", "Q4 2024", "Q3 2024", "All quarters"]
-  }
-]
+    def _parse_analysis_response(self, response: str) -> Dict[str, Any]:
+        """
+        Parse a single-call analysis response
 
-CRITICAL RULES FOR QUESTIONS:
-1. question_id should be short, snake_case identifier (e.g., "charge_off_type", "time_period", "balance_type", "metric_type")
-2. question_text should be a clear question ending with "?"
-3. options should be 2-5 concrete choices the user can select
-4. Each question should resolve ONE ambiguity
-5. If query has multiple ambiguities, create multiple questions
-6. Options should be mutually exclusive within each question
-7. Use JSON array format exactly as shown above
-8. Common question IDs to use:
-   - charge_off_type: for gross vs net charge-off
-   - balance_type: for outstanding vs original balance
-   - time_period: for missing quarters/dates
-   - metric_type: for unclear metric selection
-   - aggregation_level: for product, region, account level
-"""
+        Args:
+            response: Raw LLM response (a JSON object, optionally fenced)
+
+        Returns:
+            Dict in the shape returned by analyze_and_generate()
+
+        Raises:
+            ValueError: If the response holds no JSON object
+        """
+        start = response.find('{')
+        end = response.rfind('}')
+        if start == -1 or end < start:
+            raise ValueError("No JSON object in analysis response")
+
+        data = orjson.loads(response[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("Analysis response is not a JSON object")
+
+        return {
+            'is_ambiguous': bool(data.get('is_ambiguous')),
+            'reasons': list(data.get('reasons') or []),
+            'suggestions': list(data.get('suggestions') or []),
+            'questions': _validate_questions(data.get('questions') or []),
+            'sql': (data.get('sql') or '').strip(),
+            'explanation': (data.get('explanation') or '').strip(),
+            'metrics_used': [str(m) for m in data.get('metrics_used') or []]
+        }
+
+    async def detect_ambiguity(
+        self,
+        natural_language_query: str,
+        semantic_context: str
+    ) -> Dict[str, Any]:
+        """
+        Detect if a query is ambiguous and suggest clarifications
+
+        Args:
+            natural_language_query: User's query
+            semantic_context: Semantic model context
+
+        Returns:
+            Dict with 'is_ambiguous', 'reasons', 'suggestions', and 'questions'
+        """
+        system_instruction = _AMBIGUITY_SYSTEM_INSTRUCTION
 
         prompt = f"User query: {natural_language_query}"
 
@@ -432,69 +723,40 @@ CRITICAL RULES FOR QUESTIONS:
         Returns:
             Dict with 'is_ambiguous', 'reasons', 'suggestions', and 'questions'
         """
-        import json
-        import re
-
         is_ambiguous = "Ambiguous: Yes" in response
         reasons = []
         suggestions = []
         questions = []
 
-        # Parse reasons (existing logic)
-        if "Reasons:" in response:
-            reasons_start = response.find("Reasons:") + 8
-            # Find next section (Suggestions or Questions)
-            reasons_end = response.find("Suggestions:", reasons_start)
-            if reasons_end == -1:
-                reasons_end = response.find("Questions:", reasons_start)
-            if reasons_end == -1:
-                reasons_end = len(response)
-            reasons_text = response[reasons_start:reasons_end].strip()
-            reasons = [r.strip('- ').strip() for r in reasons_text.split('\n') if r.strip()]
-
-        # Parse suggestions (existing logic)
-        if "Suggestions:" in response:
-            suggestions_start = response.find("Suggestions:") + 12
-            # Find next section (Questions)
-            suggestions_end = response.find("Questions:", suggestions_start)
-            if suggestions_end == -1:
-                suggestions_end = len(response)
-            suggestions_text = response[suggestions_start:suggestions_end].strip()
-            suggestions = [s.strip('- ').strip() for s in suggestions_text.split('\n') if s.strip()]
+        # Slice the Reasons / Suggestions / Questions sections in one pass;
+        # each runs to the next header, whatever order the LLM used
+        sections: Dict[str, str] = {}
+        parts = _AMBIGUITY_SECTION_RE.split(response)
+        for header, text in zip(parts[1::2], parts[2::2]):
+            sections.setdefault(header, text)
+
+        if 'Reasons' in sections:
+            reasons = _parse_bullets(sections['Reasons'])
+
+        if 'Suggestions' in sections:
+            suggestions = _parse_bullets(sections['Suggestions'])
 
         # Parse questions (NEW - robust JSON extraction)
-        if "Questions:" in response:
+        questions_text = sections.get('Questions')
+        if questions_text is not None:
             try:
-                questions_start = response.find("Questions:") + 10
-                questions_text = response[questions_start:].strip()
+                questions_text = questions_text.strip()
 
                 # Extract JSON array (handle markdown code blocks)
-                json_match = re.search(r'\[[\s\S]*\]', questions_text)
+                json_match = _JSON_ARRAY_RE.search(questions_text)
                 if json_match:
                     json_str = json_match.group(0)
-                    questions = json.loads(json_str)
-
-                    # Validate question structure
-                    for q in questions:
-                        if not all(key in q for key in ['question_id', 'question_text', 'options']):
-                            logger.warning(
-                                "invalid_question_structure",
-                                question=q
-                            )
-                            questions = []  # Fallback to empty if invalid
-                            break
-                        if not isinstance(q['options'], list) or len(q['options']) < 2:
-                            logger.warning(
-                                "invalid_question_options",
-                                question_id=q.get('question_id')
-                            )
-                            questions = []
-                            break
-            except (json.JSONDecodeError, Exception) as e:
+                    questions = _validate_questions(orjson.loads(json_str))
+            except (orjson.JSONDecodeError, Exception) as e:
                 logger.warning(
                     "failed_to_parse_questions",
                     error=str(e),
-                    questions_text=questions_text[:200] if 'questions_text' in locals() else ''
+                    questions_text=questions_text[:200]
                 )
                 questions = []  # Graceful fallback
 
@@ -531,18 +793,31 @@ CRITICAL RULES FOR QUESTIONS:
         if not clarifications:
             return original_query
 
-        # Build clarification context
-        clarification_text = "\n".join([
-            f"- For '{c['question_id']}': User selected '{c['selected_option']}'"
-            for c in clarifications
-        ])
+        key = (
+            original_query,
+            tuple((c['question_id'], c['selected_option']) for c in clarifications)
+        )
+        augmented = self._augment_cache.get(key)
 
-        augmented = f"""{original_query}
+        if augmented is not None:
+            self._augment_cache.move_to_end(key)
+        else:
+            # Build clarification context
+            clarification_text = "\n".join([
+                f"- For '{question_id}': User selected '{selected_option}'"
+                for question_id, selected_option in key[1]
+            ])
+
+            augmented = f"""{original_query}
 
 [Clarifications provided by user:
 {clarification_text}
 ]"""
 
+            self._augment_cache[key] = augmented
+            if len(self._augment_cache) > _AUGMENT_CACHE_MAXSIZE:
+                self._augment_cache.popitem(last=False)
+
         logger.info(
             "query_augmented_with_clarifications",
             original_query=original_query,
@@ -553,18 +828,15 @@ CRITICAL RULES FOR QUESTIONS:
         return augmented
 
 
-# Global singleton instance
-_gemini_client: Optional[GeminiClient] = None
-
-
+@lru_cache(maxsize=1)
 def get_gemini_client() -> GeminiClient:
     """
     Get the global Gemini client instance (singleton pattern)
 
+    The instance is memoized by lru_cache; call get_gemini_client.cache_clear()
+    to drop it.
+
     Returns:
         GeminiClient instance
     """
-    global _gemini_client
-    if _gemini_client is None:
-        _gemini_client = GeminiClient()
-    return _gemini_client
+    return GeminiClient()
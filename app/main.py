@@ -1,15 +1,17 @@
 """
 CR360 Backend - FastAPI Application Entry Point
 """
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.config import settings
+from app.config import APP_NAME, APP_VERSION, CORS_ORIGINS, LOG_LEVEL
 from app.utils.logger import configure_logging, get_logger
 
 # Configure logging
-configure_logging(settings.LOG_LEVEL)
+configure_logging(LOG_LEVEL)
 logger = get_logger(__name__)
 
 
@@ -20,21 +22,44 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events
     """
     # Startup
-    logger.info("Starting CR360 Backend", version=settings.APP_VERSION)
+    logger.info("Starting CR360 Backend", version=APP_VERSION)
 
-    # Load YAML context at startup
+    # Load the YAML context (in a worker thread) while the database pool connects
+    from app.database.pool import get_db_pool
+    from app.llm.context_loader import get_context_loader
+    context_loader = get_context_loader()
+    context_result, pool_result = await asyncio.gather(
+        asyncio.to_thread(context_loader.load),
+        get_db_pool(),
+        return_exceptions=True
+    )
+
+    if isinstance(pool_result, Exception):
+        # Not fatal: the pool is retried lazily and /health reports the outage
+        logger.error("Failed to create database pool", error=str(pool_result))
+
+    if isinstance(context_result, Exception):
+        logger.error("Failed to load semantic model", error=str(context_result))
+        raise context_result
+
+    dimensions = context_loader.get_dimensions()
+    logger.info(
+        "Loaded semantic model",
+        metrics_count=len(context_loader.get_metrics()),
+        dimensions_count=len(dimensions) if dimensions else 0
+    )
+
+    # Build shared clients once so request handlers never construct them
     try:
-        from app.llm.context_loader import get_context_loader
-        context_loader = get_context_loader()
-        context_loader.load()
-        dimensions = context_loader.get_dimensions()
-        logger.info(
-            "Loaded semantic model",
-            metrics_count=len(context_loader.get_metrics()),
-            dimensions_count=len(dimensions) if dimensions else 0
-        )
+        from app.database.client import get_database_client
+        from app.llm.gemini_client import get_gemini_client
+        from app.query.text_to_sql import get_text_to_sql_engine
+        app.state.db = get_database_client()
+        app.state.llm = get_gemini_client()
+        app.state.engine = get_text_to_sql_engine()
+        await app.state.engine.warmup()
     except Exception as e:
-        logger.error("Failed to load semantic model", error=str(e))
+        logger.error("Failed to initialize query engine", error=str(e))
         raise
 
     yield
@@ -44,25 +69,32 @@ async def lifespan(app: FastAPI):
 
     # Close database connections
     try:
-        from app.database.client import get_database_client
-        db_client = get_database_client()
-        db_client.close()
+        from app.database.pool import close_db_pool
+        await close_db_pool()
     except Exception as e:
         logger.error("Error closing database connection", error=str(e))
 
+    # Close the query cache client
+    try:
+        from app.cache.query_cache import close_query_cache
+        await close_query_cache()
+    except Exception as e:
+        logger.error("Error closing query cache", error=str(e))
+
 
 # Initialize FastAPI application
 app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
+    title=APP_NAME,
+    version=APP_VERSION,
     description="CR360 GenAI-powered Credit Risk Analytics Backend",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS.split(","),
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -1,5 +1,16 @@
 """Query processing module for CR360"""
 
 from app.query.text_to_sql import TextToSQLEngine, get_text_to_sql_engine
+from app.query.plan_cache import make_plan_key, get_plan, store_plan, clear_plan_cache
+from app.query.semantic_cache import SemanticCache, get_semantic_cache
 
-__all__ = ['TextToSQLEngine', 'get_text_to_sql_engine']
+__all__ = [
+    'TextToSQLEngine',
+    'get_text_to_sql_engine',
+    'make_plan_key',
+    'get_plan',
+    'store_plan',
+    'clear_plan_cache',
+    'SemanticCache',
+    'get_semantic_cache'
+]
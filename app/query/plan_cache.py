@@ -0,0 +1,81 @@
+"""
+Query Plan Cache for CR360
+
+Caches the LLM-derived part of a query (SQL, explanation, metrics used) so
+that repeated questions only pay for SQL execution against fresh data.
+Keys include the semantic model version, so reloading the context
+invalidates every existing plan.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional
+import orjson
+from cachetools import TTLCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PLAN_CACHE_MAXSIZE = 10_000
+PLAN_CACHE_TTL_SECONDS = 900
+
+# Process-local plan cache (LRU eviction with per-entry expiry)
+PLAN_CACHE: TTLCache = TTLCache(maxsize=PLAN_CACHE_MAXSIZE, ttl=PLAN_CACHE_TTL_SECONDS)
+
+
+def make_plan_key(
+    query: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    check_ambiguity: bool,
+    schema_version: int
+) -> str:
+    """
+    Build the plan cache key for a query
+
+    Args:
+        query: Query text sent to the engine
+        conversation_history: Conversation history sent with the query
+        check_ambiguity: Whether the ambiguity check was requested
+        schema_version: Load counter of the semantic model the plan was built from
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = orjson.dumps(
+        [query.strip(), conversation_history or [], check_ambiguity],
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha256(payload + f"|{schema_version}".encode()).hexdigest()
+
+
+def get_plan(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached plan
+
+    Args:
+        key: Key from make_plan_key()
+
+    Returns:
+        Plan dict with sql, explanation and metrics_used, or None on miss
+    """
+    return PLAN_CACHE.get(key)
+
+
+def store_plan(key: str, result: Dict[str, Any]) -> None:
+    """
+    Store the plan portion of an engine result
+
+    Args:
+        key: Key from make_plan_key()
+        result: Result dict returned by TextToSQLEngine.process_query()
+    """
+    PLAN_CACHE[key] = {
+        'sql': result['sql'],
+        'explanation': result['explanation'],
+        'metrics_used': result['metrics_used']
+    }
+
+
+def clear_plan_cache() -> None:
+    """Drop all cached plans"""
+    PLAN_CACHE.clear()
+    logger.info("plan_cache_cleared")
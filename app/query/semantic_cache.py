@@ -0,0 +1,215 @@
+"""
+Semantic Query Cache for CR360
+
+Caches complete Text-to-SQL results in PostgreSQL (pgvector) keyed by the
+embedding of the user's question, so that paraphrases of a question that
+was already answered skip both LLM calls and SQL execution. Disabled unless
+SEMANTIC_CACHE_ENABLED is set; lookup and store failures are logged and
+never fail a request.
+
+Embeddings of questions that differ only in a filter value ("Q3 2024" vs
+"Q4 2024") are close, so a hit also requires the literal values in both
+questions (numbers, dates, periods, months, quoted values and codes) to
+match exactly, and entries are only served to requests made with the same
+check_ambiguity setting.
+
+Requires the `nl_query_cache` table from cr360_supabase_setup.sql.
+"""
+
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from app.config import settings
+from app.database.pool import get_db_pool
+from app.llm.embedding_cache import embed_query_cached
+from app.llm.gemini_client import GeminiClient, get_gemini_client
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_LOOKUP_SQL = """
+SELECT query_text, sql, explanation, metrics_used, visualization_hint, results,
+       query_embedding <=> $1::vector AS distance
+FROM nl_query_cache
+WHERE created_at > now() - make_interval(days => $2)
+  AND check_ambiguity = $3
+ORDER BY query_embedding <=> $1::vector
+LIMIT 1
+"""
+
+_STORE_SQL = """
+INSERT INTO nl_query_cache
+    (query_text, query_embedding, sql, explanation, metrics_used, visualization_hint, results,
+     check_ambiguity)
+VALUES ($1, $2::vector, $3, $4, $5::jsonb, $6, $7::jsonb, $8)
+"""
+
+_PURGE_SQL = "DELETE FROM nl_query_cache WHERE created_at <= now() - make_interval(days => $1)"
+
+
+# Filter values that change a query's answer without moving its embedding much
+_LITERAL_RE = re.compile(
+    r"'[^']*'|\"[^\"]*\""                                    # quoted values
+    r"|\b\d+(?:[./-]\d+)*\b"                                  # numbers, years, dates
+    r"|(?i:\b[qh][1-4]\b|\bfy\d{2,4}\b)"                       # quarters, halves, fiscal years
+    r"|(?i:\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b)"  # months
+    r"|\b[A-Z][A-Z0-9_]+\b"                                   # product / region codes
+)
+
+
+def _query_literals(query: str) -> Tuple[str, ...]:
+    """Extract the (case-folded, sorted) literal values of a query"""
+    return tuple(sorted(m.lower() for m in _LITERAL_RE.findall(query)))
+
+
+def _vector_literal(embedding: List[float]) -> str:
+    """Format an embedding as a pgvector text literal"""
+    return '[' + ','.join(map(repr, embedding)) + ']'
+
+
+def _json_default(value: Any) -> Any:
+    """orjson fallback for values returned by asyncpg (NUMERIC -> float)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a value for a jsonb parameter"""
+    return orjson.dumps(value, default=_json_default).decode()
+
+
+class SemanticCache:
+    """Embedding-similarity cache of Text-to-SQL results"""
+
+    def __init__(
+        self,
+        llm_client: Optional[GeminiClient] = None,
+        max_distance: Optional[float] = None,
+        ttl_days: Optional[int] = None
+    ):
+        """
+        Initialize the semantic cache
+
+        Args:
+            llm_client: Client used to embed queries (defaults to the shared client)
+            max_distance: Maximum cosine distance for a hit
+                          (defaults to settings.SEMANTIC_CACHE_MAX_DISTANCE)
+            ttl_days: Entry lifetime in days (defaults to settings.SEMANTIC_CACHE_TTL_DAYS)
+        """
+        self.llm_client = llm_client or get_gemini_client()
+        self.max_distance = (
+            max_distance if max_distance is not None else settings.SEMANTIC_CACHE_MAX_DISTANCE
+        )
+        self.ttl_days = ttl_days or settings.SEMANTIC_CACHE_TTL_DAYS
+        self.hits = 0
+        self.misses = 0
+
+    async def _embed(self, query: str) -> List[float]:
+        """Embed a query for similarity search (shared LRU across lookup and store)"""
+        return await embed_query_cached(query, self.llm_client)
+
+    async def lookup(self, query: str, check_ambiguity: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached result for a semantically equivalent query
+
+        Args:
+            query: Natural language query
+            check_ambiguity: Whether the request asked for the ambiguity check;
+                             only entries stored under the same setting match
+
+        Returns:
+            Result dict in the shape of TextToSQLEngine.process_query(), or
+            None on a miss or error
+        """
+        try:
+            embedding = await self._embed(query)
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow(
+                    _LOOKUP_SQL, _vector_literal(embedding), self.ttl_days, check_ambiguity
+                )
+        except Exception as e:
+            logger.warning("semantic_cache_lookup_error", error=str(e))
+            return None
+
+        if (
+            row is None
+            or row['distance'] > self.max_distance
+            or _query_literals(row['query_text']) != _query_literals(query)
+        ):
+            self.misses += 1
+            logger.info("semantic_cache_miss", hits=self.hits, misses=self.misses)
+            return None
+
+        self.hits += 1
+        logger.info(
+            "semantic_cache_hit",
+            distance=row['distance'],
+            hits=self.hits,
+            misses=self.misses
+        )
+        return {
+            'sql': row['sql'],
+            'explanation': row['explanation'],
+            'results': orjson.loads(row['results']),
+            'metrics_used': orjson.loads(row['metrics_used']),
+            'visualization_hint': row['visualization_hint'],
+            # Truncated results are never stored
+            'truncated': False
+        }
+
+    async def store(
+        self,
+        query: str,
+        result: Dict[str, Any],
+        check_ambiguity: bool = True
+    ) -> None:
+        """
+        Store a successful result under the query's embedding
+
+        Args:
+            query: Natural language query
+            result: Result dict returned by TextToSQLEngine.process_query()
+            check_ambiguity: Whether the request that produced it ran the ambiguity check
+        """
+        try:
+            embedding = await self._embed(query)
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    _STORE_SQL,
+                    query,
+                    _vector_literal(embedding),
+                    result['sql'],
+                    result['explanation'],
+                    _dumps(result['metrics_used']),
+                    result['visualization_hint'],
+                    _dumps(result['results']),
+                    check_ambiguity
+                )
+        except Exception as e:
+            logger.warning("semantic_cache_store_error", error=str(e))
+
+    async def purge_expired(self) -> None:
+        """Delete entries older than the TTL (failures are logged, not raised)"""
+        try:
+            pool = await get_db_pool()
+            async with pool.acquire() as conn:
+                status = await conn.execute(_PURGE_SQL, self.ttl_days)
+            logger.info("semantic_cache_purged", status=status)
+        except Exception as e:
+            logger.warning("semantic_cache_purge_error", error=str(e))
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    """
+    Get the global semantic cache instance (singleton pattern)
+
+    Returns:
+        SemanticCache instance
+    """
+    return SemanticCache()
@@ -8,12 +8,19 @@ Implements 4-step process:
 4. Validation & Execution - Validate and execute SQL
 """
 
-import sqlparse
-from typing import Dict, Any, List, Optional
+import asyncio
+import hashlib
+import logging
+import re
+from functools import partial
+from typing import Collection, Dict, Any, List, Optional, Tuple
+import orjson
+from app.config import settings
 from app.llm.context_loader import get_context_loader
 from app.llm.gemini_client import get_gemini_client
 from app.database.client import get_database_client
-from app.utils.logger import get_logger
+from app.query.semantic_cache import get_semantic_cache
+from app.utils.logger import get_logger, is_enabled_for
 from app.utils.exceptions import (
     SQLGenerationError,
     SQLValidationError,
@@ -23,6 +30,20 @@ from app.utils.exceptions import (
 
 logger = get_logger(__name__)
 
+# Defense in depth only: the database role's permissions are the security
+# boundary for generated SQL
+_DANGEROUS_KEYWORDS = frozenset({
+    'DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE',
+    'INSERT', 'UPDATE', 'GRANT', 'REVOKE'
+})
+_DANGEROUS_KEYWORD_RE = re.compile(r"\b(" + "|".join(sorted(_DANGEROUS_KEYWORDS)) + r")\b")
+_READ_STATEMENT_RE = re.compile(r"(SELECT|WITH)\b")
+
+# Visualization heuristics: substrings of the lower-cased result column names
+_TIME_TOKENS = frozenset({'date', 'month', 'year', 'quarter'})
+_COMPARISON_TOKENS = frozenset({'region', 'product', 'segment'})
+_VIZ_TOKEN_RE = re.compile('|'.join(sorted(_TIME_TOKENS | _COMPARISON_TOKENS)))
+
 
 class TextToSQLEngine:
     """Converts natural language queries to SQL and executes them"""
@@ -32,12 +53,46 @@ class TextToSQLEngine:
         self.context_loader = get_context_loader()
         self.llm_client = get_gemini_client()
         self.db_client = get_database_client()
+        self.semantic_cache = get_semantic_cache() if settings.SEMANTIC_CACHE_ENABLED else None
+
+        # Pipeline runs in progress, keyed by request; identical concurrent
+        # queries await the same task instead of repeating LLM and SQL work
+        self._in_flight: Dict[str, asyncio.Task] = {}
 
-        # Load semantic model
-        self.semantic_context = self.context_loader.get_context_for_llm()
+        # Render the semantic model once up front; the string is held by the
+        # shared context loader, not copied onto each engine
+        self.context_loader.get_context_for_llm()
 
         logger.info("text_to_sql_engine_initialized")
 
+    @property
+    def semantic_context(self) -> str:
+        """Semantic model rendered for LLM prompts (memoized by the context loader)"""
+        return self.context_loader.get_context_for_llm()
+
+    async def warmup(self) -> None:
+        """
+        Prime the engine ahead of the first real query
+
+        The semantic context is already rendered during construction, and
+        the asyncpg pool opens its min_size connections when it is created.
+        This round-trips a pooled database connection and opens the Gemini
+        connection concurrently, then purges expired semantic cache entries
+        when that cache is enabled. Failures are logged, not raised.
+        """
+        await asyncio.gather(self._warmup_database(), self.llm_client.warmup())
+
+        if self.semantic_cache is not None:
+            await self.semantic_cache.purge_expired()
+
+    async def _warmup_database(self) -> None:
+        """Round-trip a pooled database connection (failures are logged)"""
+        try:
+            await self.db_client.test_connection()
+            logger.info("text_to_sql_engine_warmed_up")
+        except Exception as e:
+            logger.warning("text_to_sql_engine_warmup_failed", error=str(e))
+
     async def process_query(
         self,
         natural_language_query: str,
@@ -47,6 +102,10 @@ class TextToSQLEngine:
         """
         Process a natural language query through the full pipeline
 
+        Identical concurrent requests share a single pipeline run and all
+        receive its result (or error). Cancelling one caller, e.g. on a
+        request timeout, does not cancel the run for the others.
+
         Args:
             natural_language_query: User's natural language query
             conversation_history: Optional conversation history
@@ -59,6 +118,7 @@ class TextToSQLEngine:
                 - results: Query results
                 - metrics_used: List of metrics used
                 - visualization_hint: Suggested chart type
+                - truncated: Whether the MAX_ROWS cap dropped rows
 
         Raises:
             AmbiguousQueryError: If query is ambiguous
@@ -66,33 +126,79 @@ class TextToSQLEngine:
             SQLValidationError: If SQL validation fails
             SQLExecutionError: If SQL execution fails
         """
+        key = self._in_flight_key(natural_language_query, conversation_history, check_ambiguity)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._process_query(
+                natural_language_query,
+                conversation_history,
+                check_ambiguity
+            ))
+            self._in_flight[key] = task
+            task.add_done_callback(partial(self._release_in_flight, key))
+        else:
+            logger.info("nl_query_coalesced", query=natural_language_query)
+
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _in_flight_key(
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        check_ambiguity: bool
+    ) -> str:
+        """Hash the inputs that determine a pipeline result"""
+        return hashlib.sha256(
+            orjson.dumps([query, conversation_history or [], check_ambiguity])
+        ).hexdigest()
+
+    def _release_in_flight(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished run; marks its error retrieved if every caller left"""
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _process_query(
+        self,
+        natural_language_query: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        check_ambiguity: bool
+    ) -> Dict[str, Any]:
+        """
+        Run the full pipeline for one query
+
+        Args:
+            natural_language_query: User's natural language query
+            conversation_history: Optional conversation history
+            check_ambiguity: Whether to check for ambiguity first
+
+        Returns:
+            Result dict as documented on process_query()
+        """
         try:
-            logger.info(
-                "processing_nl_query",
-                query=natural_language_query,
-                has_history=conversation_history is not None
-            )
+            if is_enabled_for(logging.INFO):
+                logger.info(
+                    "processing_nl_query",
+                    query=natural_language_query,
+                    has_history=conversation_history is not None
+                )
 
-            # Step 1: Natural Language Understanding & Ambiguity Detection
-            if check_ambiguity:
-                ambiguity_result = await self._check_ambiguity(natural_language_query)
-                if ambiguity_result['is_ambiguous']:
-                    logger.warning(
-                        "ambiguous_query_detected",
-                        reasons=ambiguity_result['reasons'],
-                        questions_count=len(ambiguity_result.get('questions', []))
-                    )
-                    raise AmbiguousQueryError(
-                        message="Your query is ambiguous. Please clarify.",
-                        options=ambiguity_result['suggestions'],
-                        questions=ambiguity_result.get('questions', [])
-                    )
-
-            # Step 2 & 3: Semantic Mapping + Query Generation
-            sql_result = await self._generate_sql(
-                natural_language_query,
-                conversation_history
-            )
+            # Follow-up turns depend on history, so only standalone queries
+            # are served from (and written to) the semantic cache
+            use_semantic_cache = self.semantic_cache is not None and not conversation_history
+            if use_semantic_cache:
+                cached, sql_result = await self._plan_with_semantic_cache(
+                    natural_language_query,
+                    check_ambiguity
+                )
+                if cached is not None:
+                    return cached
+            else:
+                sql_result = await self._plan_query(
+                    natural_language_query,
+                    conversation_history,
+                    check_ambiguity
+                )
 
             # Step 4: Validation
             validation_result = self._validate_sql(sql_result['sql'])
@@ -110,24 +216,32 @@ class TextToSQLEngine:
 
             # Step 6: Post-processing
             visualization_hint = self._suggest_visualization(
-                sql_result['sql'],
-                results
+                len(results),
+                results[0].keys() if results else ()
             )
 
-            logger.info(
-                "nl_query_processed_successfully",
-                rows_returned=len(results),
-                visualization=visualization_hint
-            )
+            if is_enabled_for(logging.INFO):
+                logger.info(
+                    "nl_query_processed_successfully",
+                    rows_returned=len(results),
+                    visualization=visualization_hint
+                )
 
-            return {
+            result = {
                 'sql': sql_result['sql'],
                 'explanation': sql_result['explanation'],
                 'results': results,
                 'metrics_used': sql_result['metrics_used'],
-                'visualization_hint': visualization_hint
+                'visualization_hint': visualization_hint,
+                'truncated': getattr(results, 'truncated', False)
             }
 
+            # A capped result is not worth replaying for another phrasing
+            if use_semantic_cache and not result['truncated']:
+                await self.semantic_cache.store(natural_language_query, result, check_ambiguity)
+
+            return result
+
         except (AmbiguousQueryError, SQLGenerationError, SQLValidationError, SQLExecutionError):
             # Re-raise expected errors
             raise
@@ -135,6 +249,133 @@ class TextToSQLEngine:
             logger.error("unexpected_error_in_query_processing", error=str(e))
             raise SQLGenerationError(f"Failed to process query: {e}")
 
+    async def _plan_query(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        check_ambiguity: bool
+    ) -> Dict[str, Any]:
+        """
+        Steps 1-3: ambiguity check, semantic mapping and SQL generation
+
+        Args:
+            query: Natural language query
+            conversation_history: Optional conversation history
+            check_ambiguity: Whether to check for ambiguity first
+
+        Returns:
+            Dict with sql, explanation, metrics_used
+
+        Raises:
+            AmbiguousQueryError: If query is ambiguous
+        """
+        if check_ambiguity and settings.LLM_SINGLE_CALL_ANALYSIS:
+            # Steps 1-3 in a single LLM call
+            sql_result = await self._analyze_and_generate(query, conversation_history)
+            self._raise_if_ambiguous(sql_result)
+            return sql_result
+
+        # Step 1: Natural Language Understanding & Ambiguity Detection
+        if check_ambiguity:
+            ambiguity_result = await self._check_ambiguity(query)
+            self._raise_if_ambiguous(ambiguity_result)
+
+        # Step 2 & 3: Semantic Mapping + Query Generation
+        return await self._generate_sql(query, conversation_history)
+
+    async def _plan_with_semantic_cache(
+        self,
+        query: str,
+        check_ambiguity: bool
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Steps 1-3 raced against a semantic cache lookup (standalone queries only)
+
+        The LLM steps start speculatively so a miss costs max(lookup, LLM)
+        rather than their sum. A cached answer for a paraphrase says nothing
+        about whether this wording is ambiguous, so the ambiguity check always
+        runs to completion and only SQL generation is cancelled on a hit. With
+        LLM_SINGLE_CALL_ANALYSIS both come from one call, which then always
+        completes and a hit only saves SQL execution.
+
+        Args:
+            query: Natural language query
+            check_ambiguity: Whether to check for ambiguity first
+
+        Returns:
+            (cached result, None) on a hit, (None, generated SQL dict) on a miss
+
+        Raises:
+            AmbiguousQueryError: If query is ambiguous (hit or miss)
+        """
+        if check_ambiguity and settings.LLM_SINGLE_CALL_ANALYSIS:
+            plan_task = asyncio.create_task(self._plan_query(query, None, check_ambiguity))
+            tasks = [plan_task]
+            try:
+                cached = await self.semantic_cache.lookup(query, check_ambiguity)
+                sql_result = await plan_task
+            except BaseException:
+                await self._cancel_tasks(tasks)
+                raise
+            return (cached, None) if cached is not None else (None, sql_result)
+
+        ambiguity_task = (
+            asyncio.create_task(self._check_ambiguity(query)) if check_ambiguity else None
+        )
+        sql_task = asyncio.create_task(self._generate_sql(query, None))
+        tasks = [t for t in (ambiguity_task, sql_task) if t is not None]
+        try:
+            cached = await self.semantic_cache.lookup(query, check_ambiguity)
+            if ambiguity_task is not None:
+                self._raise_if_ambiguous(await ambiguity_task)
+            if cached is not None:
+                await self._cancel_tasks([sql_task])
+                return cached, None
+            return None, await sql_task
+        except BaseException:
+            await self._cancel_tasks(tasks)
+            raise
+
+    @staticmethod
+    async def _cancel_tasks(tasks: List[asyncio.Task]) -> None:
+        """Cancel speculative tasks and wait for them so no error goes unretrieved"""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def execute_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Re-run a previously generated plan against current data
+
+        Skips ambiguity detection, SQL generation and validation; the plan's
+        SQL already passed validation when it was first produced.
+
+        Args:
+            plan: Dict with sql, explanation and metrics_used
+
+        Returns:
+            Dict in the same shape as process_query()
+
+        Raises:
+            SQLExecutionError: If SQL execution fails
+        """
+        logger.info("executing_cached_plan")
+
+        results = await self._execute_sql(plan['sql'])
+        visualization_hint = self._suggest_visualization(
+            len(results),
+            results[0].keys() if results else ()
+        )
+
+        return {
+            'sql': plan['sql'],
+            'explanation': plan['explanation'],
+            'results': results,
+            'metrics_used': plan['metrics_used'],
+            'visualization_hint': visualization_hint,
+            'truncated': getattr(results, 'truncated', False)
+        }
+
     async def _check_ambiguity(self, query: str) -> Dict[str, Any]:
         """
         Step 1: Check if query is ambiguous
@@ -151,6 +392,52 @@ class TextToSQLEngine:
             self.semantic_context
         )
 
+    async def _analyze_and_generate(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Steps 1-3 in one LLM call: ambiguity check, semantic mapping and SQL generation
+
+        Args:
+            query: Natural language query
+            conversation_history: Optional conversation history
+
+        Returns:
+            Dict with is_ambiguous, reasons, suggestions, questions, sql,
+            explanation, metrics_used
+        """
+        logger.info("analyzing_query_and_generating_sql")
+        return await self.llm_client.analyze_and_generate(
+            query,
+            self.semantic_context,
+            conversation_history
+        )
+
+    @staticmethod
+    def _raise_if_ambiguous(ambiguity_result: Dict[str, Any]) -> None:
+        """
+        Raise AmbiguousQueryError when the ambiguity check flagged the query
+
+        Args:
+            ambiguity_result: Dict with is_ambiguous, reasons, suggestions, questions
+
+        Raises:
+            AmbiguousQueryError: If the query is ambiguous
+        """
+        if ambiguity_result['is_ambiguous']:
+            logger.warning(
+                "ambiguous_query_detected",
+                reasons=ambiguity_result['reasons'],
+                questions_count=len(ambiguity_result.get('questions', []))
+            )
+            raise AmbiguousQueryError(
+                message="Your query is ambiguous. Please clarify.",
+                options=ambiguity_result['suggestions'],
+                questions=ambiguity_result.get('questions', [])
+            )
+
     async def _generate_sql(
         self,
         query: str,
@@ -184,55 +471,34 @@ class TextToSQLEngine:
             Dict with is_valid and errors list
         """
         logger.info("validating_sql")
-        errors = []
-
-        try:
-            # Parse SQL
-            parsed = sqlparse.parse(sql)
-
-            if not parsed:
-                errors.append("Failed to parse SQL")
-                return {'is_valid': False, 'errors': errors}
 
-            # Check for basic SQL injection patterns (safety check)
-            dangerous_keywords = [
-                'DROP', 'DELETE', 'TRUNCATE', 'ALTER', 'CREATE',
-                'INSERT', 'UPDATE', 'GRANT', 'REVOKE'
-            ]
+        sql_upper = sql.strip().upper()
+        if not sql_upper:
+            return {'is_valid': False, 'errors': ["Failed to parse SQL"]}
 
-            sql_upper = sql.upper()
-            for keyword in dangerous_keywords:
-                if keyword in sql_upper:
-                    errors.append(f"Dangerous keyword detected: {keyword}")
+        # Check for basic SQL injection patterns (safety check)
+        errors = [
+            f"Dangerous keyword detected: {keyword}"
+            for keyword in dict.fromkeys(_DANGEROUS_KEYWORD_RE.findall(sql_upper))
+        ]
 
-            # Check for required SELECT
-            if not sql_upper.strip().startswith('SELECT'):
-                errors.append("Query must be a SELECT statement")
+        # Check for required SELECT (or a CTE leading into one)
+        if not _READ_STATEMENT_RE.match(sql_upper):
+            errors.append("Query must be a SELECT statement")
 
-            # Basic syntax validation using sqlparse
-            formatted = sqlparse.format(sql, reindent=True, keyword_case='upper')
-            if not formatted:
-                errors.append("SQL formatting failed - likely syntax error")
-
-            is_valid = len(errors) == 0
+        is_valid = len(errors) == 0
 
+        if is_enabled_for(logging.INFO):
             logger.info(
                 "sql_validation_complete",
                 is_valid=is_valid,
                 errors_count=len(errors)
             )
 
-            return {
-                'is_valid': is_valid,
-                'errors': errors
-            }
-
-        except Exception as e:
-            logger.error("sql_validation_error", error=str(e))
-            return {
-                'is_valid': False,
-                'errors': [f"Validation error: {str(e)}"]
-            }
+        return {
+            'is_valid': is_valid,
+            'errors': errors
+        }
 
     async def _execute_sql(self, sql: str) -> List[Dict[str, Any]]:
         """
@@ -242,53 +508,51 @@ class TextToSQLEngine:
             sql: Validated SQL query
 
         Returns:
-            Query results as list of dicts
+            Query results as list of dicts; a RowList from the database
+            client also carries the `truncated` flag
         """
         logger.info("executing_sql")
         return await self.db_client.execute_query(sql)
 
     def _suggest_visualization(
         self,
-        sql: str,
-        results: List[Dict[str, Any]]
+        num_rows: int,
+        columns: Collection[str]
     ) -> str:
         """
-        Suggest visualization type based on query and results
+        Suggest visualization type based on the result schema and shape
+
+        Classifies the result columns rather than the SQL text, so filters
+        such as `WHERE as_of_date = (SELECT MAX(as_of_date) ...)` no longer
+        make a single-period breakdown look like a time series. Only the
+        shape of the results is needed, so callers that stream rows do not
+        have to materialize them.
 
         Args:
-            sql: SQL query
-            results: Query results
+            num_rows: Number of result rows
+            columns: Result column names
 
         Returns:
             Suggested visualization type (bar, line, table, etc.)
         """
-        if not results:
+        if not num_rows:
             return 'table'
 
-        # Count columns
-        num_columns = len(results[0].keys()) if results else 0
-        num_rows = len(results)
+        num_columns = len(columns)
+        tokens = set(_VIZ_TOKEN_RE.findall('\n'.join(columns).lower()))
 
-        # Simple heuristics for visualization
-        sql_lower = sql.lower()
-
-        # Time series detection
-        if any(time_word in sql_lower for time_word in ['date', 'month', 'year', 'quarter']):
+        # Time series: a date-like column with more than one period
+        if tokens & _TIME_TOKENS:
             if num_rows > 1:
                 return 'line'
 
-        # Comparison detection
-        if any(comp_word in sql_lower for comp_word in ['region', 'product', 'segment']):
+        # Comparison: broken down by a business dimension
+        if tokens & _COMPARISON_TOKENS:
             if num_rows <= 10:
                 return 'bar'
             elif num_rows <= 50:
                 return 'horizontal_bar'
 
-        # Aggregation detection
-        if any(agg in sql_lower for agg in ['sum(', 'avg(', 'count(']):
-            if num_rows <= 10:
-                return 'bar'
-
         # Default to table for large result sets or many columns
         if num_rows > 50 or num_columns > 5:
             return 'table'
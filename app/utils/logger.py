@@ -3,9 +3,31 @@ Structured logging setup using structlog
 """
 import logging
 import sys
+import orjson
 import structlog
 from typing import Any
 
+# Minimum level emitted, set by configure_logging(); everything is enabled
+# until logging is configured
+_log_level: int = logging.NOTSET
+
+
+def is_enabled_for(level: int) -> bool:
+    """
+    Check whether events at a level will be emitted
+
+    The filtering bound logger already turns disabled levels into no-ops,
+    but Python still evaluates the keyword arguments of the call; guard
+    calls whose arguments are costly to build with this check.
+
+    Args:
+        level: Standard logging level (e.g. logging.INFO)
+
+    Returns:
+        True if the configured level lets the event through
+    """
+    return level >= _log_level
+
 
 def get_logger(name: str = __name__) -> Any:
     """
@@ -27,14 +49,26 @@ def configure_logging(log_level: str = "INFO") -> None:
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    global _log_level
+    _log_level = getattr(logging, log_level.upper())
+
     # Configure standard logging
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, log_level.upper()),
+        level=_log_level,
     )
 
-    # Configure structlog
+    # Configure structlog. Outside a terminal, events are rendered straight
+    # to bytes with orjson and written to stdout's buffer, skipping both the
+    # stdlib json encoder and the str round-trip.
+    if sys.stdout.isatty():
+        renderer = structlog.dev.ConsoleRenderer()
+        logger_factory = structlog.PrintLoggerFactory()
+    else:
+        renderer = structlog.processors.JSONRenderer(serializer=orjson.dumps)
+        logger_factory = structlog.BytesLoggerFactory()
+
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
@@ -42,14 +76,10 @@ def configure_logging(log_level: str = "INFO") -> None:
             structlog.processors.StackInfoRenderer(),
             structlog.dev.set_exc_info,
             structlog.processors.TimeStamper(fmt="iso"),
-            structlog.dev.ConsoleRenderer()
-            if sys.stdout.isatty()
-            else structlog.processors.JSONRenderer(),
+            renderer,
         ],
-        wrapper_class=structlog.make_filtering_bound_logger(
-            getattr(logging, log_level.upper())
-        ),
+        wrapper_class=structlog.make_filtering_bound_logger(_log_level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
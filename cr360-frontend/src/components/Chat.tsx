@@ -107,7 +107,7 @@ export function Chat() {
           success: false,
           error: error instanceof Error ? error.message : 'Unknown error',
           error_type: 'NetworkError',
-          timestamp: new Date().toISOString(),
+          timestamp_ms: Date.now(),
         },
         timestamp: new Date(),
       };
@@ -181,7 +181,7 @@ export function Chat() {
           success: false,
           error: error instanceof Error ? error.message : 'Unknown error',
           error_type: 'NetworkError',
-          timestamp: new Date().toISOString(),
+          timestamp_ms: Date.now(),
         },
         timestamp: new Date(),
       };
@@ -32,6 +32,7 @@ export interface QueryResult {
   metrics_used: string[];
   visualization_hint: 'bar' | 'line' | 'table' | 'horizontal_bar' | 'pie' | 'scatter';
   row_count: number;
+  truncated?: boolean;
 }
 
 export interface ChatSuccessResponse {
@@ -40,6 +41,7 @@ export interface ChatSuccessResponse {
   conversation_id: string;
   result: QueryResult;
   processing_time_ms: number;
+  timestamp_ms: number;
 }
 
 export interface AmbiguityResponse {
@@ -49,7 +51,7 @@ export interface AmbiguityResponse {
   reasons: string[];
   suggestions: string[];
   questions: ClarificationQuestion[];
-  timestamp: string;
+  timestamp_ms: number;
 }
 
 export interface ErrorResponse {
@@ -57,7 +59,7 @@ export interface ErrorResponse {
   error: string;
   error_type: string;
   details?: any;
-  timestamp: string;
+  timestamp_ms: number;
 }
 
 export type ChatResponse = ChatSuccessResponse | AmbiguityResponse | ErrorResponse;
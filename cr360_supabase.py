@@ -18,16 +18,19 @@ Usage:
     
     db = CR360Database()
     
-    # Execute a query
-    result = db.execute_query("SELECT * FROM dim_region")
+    # Execute a query (asyncpg pool, $1-style parameters)
+    result = await db.execute_query("SELECT * FROM dim_region")
     
     # Or use the Supabase client directly
     data = db.client.table('agg_monthly_summary').select('*').execute()
 """
 
+import asyncio
+import functools
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Mapping, AsyncIterator
 from dataclasses import dataclass
+from cachetools import TTLCache
 
 # =============================================================================
 # CONFIGURATION
@@ -42,6 +45,16 @@ class SupabaseConfig:
     # Alternative: Direct PostgreSQL connection
     # Get from Supabase Dashboard > Settings > Database > Connection string
     postgres_url: str = os.getenv('DATABASE_URL', '')
+    
+    # asyncpg pool sizing
+    pool_min_size: int = 10
+    pool_max_size: int = 50
+    pool_max_inactive_lifetime: float = 300.0
+    command_timeout: float = 60.0
+    
+    # Prepared statements kept per connection, so repeated dashboard
+    # queries skip server-side parse/plan
+    statement_cache_size: int = 256
 
 
 # =============================================================================
@@ -54,13 +67,13 @@ class CR360Database:
     
     Supports both:
     1. Supabase Python client (simpler, good for basic queries)
-    2. Direct PostgreSQL via psycopg2 (full SQL support)
+    2. Direct PostgreSQL via an asyncpg connection pool (full SQL support)
     """
     
     def __init__(self, config: Optional[SupabaseConfig] = None):
         self.config = config or SupabaseConfig()
         self._supabase_client = None
-        self._pg_connection = None
+        self._pg_pool = None
     
     # -------------------------------------------------------------------------
     # Supabase Client (REST API)
@@ -108,59 +121,89 @@ class CR360Database:
     # Direct PostgreSQL (Full SQL Support)
     # -------------------------------------------------------------------------
     
-    @property
-    def pg_connection(self):
-        """Get PostgreSQL connection (lazy initialization)"""
-        if self._pg_connection is None:
+    async def get_pool(self):
+        """Get asyncpg connection pool (lazy initialization)"""
+        if self._pg_pool is None:
             try:
-                import psycopg2
-                self._pg_connection = psycopg2.connect(self.config.postgres_url)
+                import asyncpg
             except ImportError:
-                raise ImportError("Install psycopg2: pip install psycopg2-binary")
-        return self._pg_connection
+                raise ImportError("Install asyncpg: pip install asyncpg")
+            self._pg_pool = await asyncpg.create_pool(
+                self.config.postgres_url,
+                min_size=self.config.pool_min_size,
+                max_size=self.config.pool_max_size,
+                max_inactive_connection_lifetime=self.config.pool_max_inactive_lifetime,
+                command_timeout=self.config.command_timeout,
+                statement_cache_size=self.config.statement_cache_size
+            )
+        return self._pg_pool
     
-    def execute_query(self, sql: str, params: tuple = None) -> List[Dict]:
+    async def execute_query(self, sql: str, params: tuple = None) -> List[Mapping[str, Any]]:
         """
-        Execute raw SQL query
+        Execute raw SQL query on a pooled connection
         
         Args:
             sql: SQL query string
-            params: Query parameters (for parameterized queries)
+            params: Query parameters (asyncpg style: $1, $2, ...)
             
         Returns:
-            List of dictionaries with column names as keys
+            List of asyncpg Records; they support row['column'], .get(),
+            .keys() and len() like a read-only dict, so rows are not copied
+            into dicts here (call dict(row) where a real dict is needed)
         """
-        cursor = self.pg_connection.cursor()
-        try:
-            cursor.execute(sql, params)
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
-        finally:
-            cursor.close()
-    
-    def close(self):
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetch(sql, *(params or ()))
+    
+    async def stream_query(self, sql: str, *params,
+                           chunk: int = 500) -> AsyncIterator[Mapping[str, Any]]:
+        """
+        Execute a read-only query and yield rows through a server-side cursor
+        
+        Rows arrive from PostgreSQL `chunk` at a time, so large result sets
+        (e.g. long trend series) never sit in memory all at once. Use
+        execute_query when the full list is needed anyway.
+        
+        Args:
+            sql: SQL query string
+            *params: Query parameters (asyncpg style: $1, $2, ...)
+            chunk: Rows fetched per round-trip
+            
+        Yields:
+            asyncpg Records
+        """
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            # Cursors only exist inside a transaction
+            async with conn.transaction():
+                async for record in conn.cursor(sql, *params, prefetch=chunk):
+                    yield record
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get connection pool usage (empty until the pool is created)"""
+        if self._pg_pool is None:
+            return {}
+        return {
+            'size': self._pg_pool.get_size(),
+            'idle': self._pg_pool.get_idle_size(),
+            'min_size': self._pg_pool.get_min_size(),
+            'max_size': self._pg_pool.get_max_size()
+        }
+    
+    async def close(self):
         """Close database connections"""
-        if self._pg_connection:
-            self._pg_connection.close()
-            self._pg_connection = None
+        if self._pg_pool:
+            await self._pg_pool.close()
+            self._pg_pool = None
 
 
 # =============================================================================
 # CONVENIENCE FUNCTIONS FOR CR360 QUERIES
 # =============================================================================
 
-class CR360Queries:
-    """
-    Pre-built queries for common CR360 analytics
-    """
-    
-    def __init__(self, db: CR360Database):
-        self.db = db
-    
-    def get_portfolio_summary(self, quarter: str = 'Q4-2025') -> Dict:
-        """Get high-level portfolio summary"""
-        sql = """
+# Fixed dashboard statements, built once at import so each is a stable
+# key in asyncpg's per-connection prepared statement cache
+PORTFOLIO_SUMMARY_SQL = """
         SELECT 
             ROUND(SUM(total_outstanding)::numeric / 1e9, 2) AS portfolio_billions,
             SUM(account_count) AS total_accounts,
@@ -168,14 +211,10 @@ class CR360Queries:
             ROUND((SUM(net_charge_off_qtd) * 4 / NULLIF(SUM(total_outstanding), 0) * 100)::numeric, 3) AS annualized_nco_pct
         FROM agg_monthly_summary a
         JOIN dim_date d ON a.as_of_date_skey = d.date_skey
-        WHERE d.quarter_name = %s
+        WHERE d.quarter_name = $1
         """
-        result = self.db.execute_query(sql, (quarter,))
-        return result[0] if result else {}
-    
-    def get_regional_comparison(self, quarter: str = 'Q4-2025') -> List[Dict]:
-        """Get delinquency comparison by region"""
-        sql = """
+
+REGIONAL_COMPARISON_SQL = """
         SELECT 
             r.region_name,
             ROUND(SUM(a.total_outstanding)::numeric / 1e9, 2) AS outstanding_billions,
@@ -184,15 +223,16 @@ class CR360Queries:
         FROM agg_monthly_summary a
         JOIN dim_date d ON a.as_of_date_skey = d.date_skey
         JOIN dim_region r ON a.region_skey = r.region_skey
-        WHERE d.quarter_name = %s
+        WHERE d.quarter_name = $1
         GROUP BY r.region_name
         ORDER BY dpd_30_pct DESC
         """
-        return self.db.execute_query(sql, (quarter,))
-    
-    def get_segment_analysis(self, region: str = None, quarter: str = 'Q4-2025') -> List[Dict]:
-        """Get segment-level analysis, optionally filtered by region"""
-        sql = """
+
+
+def _build_segment_sql(filtered: bool) -> str:
+    """Assemble one get_segment_analysis() statement"""
+    where = "AND r.region_name = $2" if filtered else ""
+    return f"""
         SELECT 
             s.retail_classification AS segment,
             r.region_name,
@@ -203,23 +243,16 @@ class CR360Queries:
         JOIN dim_date d ON a.as_of_date_skey = d.date_skey
         JOIN dim_segment s ON a.segment_skey = s.segment_skey
         JOIN dim_region r ON a.region_skey = r.region_skey
-        WHERE d.quarter_name = %s
-        """
-        params = [quarter]
-        
-        if region:
-            sql += " AND r.region_name = %s"
-            params.append(region)
-        
-        sql += """
+        WHERE d.quarter_name = $1
+        {where}
         GROUP BY s.retail_classification, r.region_name
         ORDER BY dpd_30_pct DESC
         """
-        return self.db.execute_query(sql, tuple(params))
-    
-    def get_product_performance(self, quarter: str = 'Q4-2025') -> List[Dict]:
-        """Get performance by product type"""
-        sql = """
+
+
+SEGMENT_ANALYSIS_SQL = {filtered: _build_segment_sql(filtered) for filtered in (False, True)}
+
+PRODUCT_PERFORMANCE_SQL = """
         SELECT 
             p.product_type,
             ROUND(SUM(a.total_outstanding)::numeric / 1e9, 2) AS outstanding_billions,
@@ -229,15 +262,150 @@ class CR360Queries:
         FROM agg_monthly_summary a
         JOIN dim_date d ON a.as_of_date_skey = d.date_skey
         JOIN dim_product p ON a.product_skey = p.product_skey
-        WHERE d.quarter_name = %s
+        WHERE d.quarter_name = $1
         GROUP BY p.product_type
         ORDER BY outstanding_billions DESC
         """
-        return self.db.execute_query(sql, (quarter,))
+
+TREND_METRIC_SQL = {
+    'dpd_30': "ROUND((SUM(a.dpd_30_balance) / NULLIF(SUM(a.total_outstanding), 0) * 100)::numeric, 2)",
+    'nco': "ROUND((SUM(a.net_charge_off_qtd) * 4 / NULLIF(SUM(a.total_outstanding), 0) * 100)::numeric, 3)",
+    'score': "ROUND((SUM(a.avg_credit_score * a.total_outstanding) / NULLIF(SUM(a.total_outstanding), 0))::numeric, 0)",
+    'originations': "ROUND(SUM(a.origination_volume)::numeric / 1e9, 2)"
+}
+
+TREND_DIMENSIONS = {
+    'region': ('r.region_name', 'dim_region r ON a.region_skey = r.region_skey'),
+    'segment': ('s.retail_classification', 'dim_segment s ON a.segment_skey = s.segment_skey'),
+    'product': ('p.product_type', 'dim_product p ON a.product_skey = p.product_skey')
+}
+
+
+def _build_trend_sql(metric: str, dimension: str, filtered: bool) -> str:
+    """Assemble one get_trend() statement"""
+    dim_col, dim_join = TREND_DIMENSIONS[dimension]
+    where = f"WHERE {dim_col} = $1" if filtered else ""
+    return f"""
+        SELECT 
+            d.quarter_name,
+            {dim_col} AS {dimension},
+            {TREND_METRIC_SQL[metric]} AS {metric}
+        FROM agg_monthly_summary a
+        JOIN dim_date d ON a.as_of_date_skey = d.date_skey
+        JOIN {dim_join}
+        {where}
+        GROUP BY d.quarter_name, d.date_skey, {dim_col}
+        ORDER BY d.date_skey, {dim_col}
+        """
+
+
+# Every get_trend() variant
+TREND_SQL = {
+    (metric, dimension, filtered): _build_trend_sql(metric, dimension, filtered)
+    for metric in TREND_METRIC_SQL
+    for dimension in TREND_DIMENSIONS
+    for filtered in (False, True)
+}
+
+
+def _cached_query(method):
+    """
+    Serve repeated CR360Queries calls from the instance's TTL cache
+    
+    Keys are (method name, args, sorted kwargs). Results are shared
+    between callers and must be treated as read-only.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        result = await method(self, *args, **kwargs)
+        self._cache[key] = result
+        return result
+    return wrapper
+
+
+class CR360Queries:
+    """
+    Pre-built queries for common CR360 analytics
+    
+    Results change at ingestion cadence, so each query result is cached
+    for a short TTL; call invalidate() after refreshing agg_monthly_summary.
+    Raw SQL through CR360Database is never cached.
+    """
+    
+    def __init__(self, db: CR360Database, cache_size: int = 256,
+                 cache_ttl_seconds: float = 120):
+        self.db = db
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl_seconds)
+    
+    def invalidate(self):
+        """Drop all cached query results"""
+        self._cache.clear()
+    
+    async def dashboard(self, quarter: str = 'Q4-2025',
+                        region: str = 'Southeast',
+                        segment: str = 'Subprime') -> Dict[str, Any]:
+        """
+        Run the independent dashboard queries concurrently
+        
+        Each query acquires its own pooled connection, so latency is the
+        slowest query rather than the sum (the pool's min_size covers all four).
+        This already costs about one round trip end to end, which is what a
+        single-connection pipeline (e.g. psycopg 3 pipeline mode) would buy,
+        without a second driver next to asyncpg.
+        
+        Args:
+            quarter: Quarter for the summary, regional and segment queries
+            region: Region for the segment analysis
+            segment: Segment for the delinquency trend
+            
+        Returns:
+            Dict with 'summary', 'regions', 'segments' and 'trend'
+        """
+        summary, regions, segments, trend = await asyncio.gather(
+            self.get_portfolio_summary(quarter),
+            self.get_regional_comparison(quarter),
+            self.get_segment_analysis(region=region, quarter=quarter),
+            self.get_trend(metric='dpd_30', dimension='segment', dimension_value=segment)
+        )
+        return {
+            'summary': summary,
+            'regions': regions,
+            'segments': segments,
+            'trend': trend
+        }
+    
+    @_cached_query
+    async def get_portfolio_summary(self, quarter: str = 'Q4-2025') -> Mapping[str, Any]:
+        """Get high-level portfolio summary"""
+        result = await self.db.execute_query(PORTFOLIO_SUMMARY_SQL, (quarter,))
+        return result[0] if result else {}
+    
+    @_cached_query
+    async def get_regional_comparison(self, quarter: str = 'Q4-2025') -> List[Mapping[str, Any]]:
+        """Get delinquency comparison by region"""
+        return await self.db.execute_query(REGIONAL_COMPARISON_SQL, (quarter,))
+    
+    @_cached_query
+    async def get_segment_analysis(self, region: str = None, quarter: str = 'Q4-2025') -> List[Mapping[str, Any]]:
+        """Get segment-level analysis, optionally filtered by region"""
+        if region:
+            return await self.db.execute_query(SEGMENT_ANALYSIS_SQL[True], (quarter, region))
+        return await self.db.execute_query(SEGMENT_ANALYSIS_SQL[False], (quarter,))
     
-    def get_trend(self, metric: str = 'dpd_30', 
+    @_cached_query
+    async def get_product_performance(self, quarter: str = 'Q4-2025') -> List[Mapping[str, Any]]:
+        """Get performance by product type"""
+        return await self.db.execute_query(PRODUCT_PERFORMANCE_SQL, (quarter,))
+    
+    @_cached_query
+    async def get_trend(self, metric: str = 'dpd_30', 
                   dimension: str = 'segment',
-                  dimension_value: str = None) -> List[Dict]:
+                  dimension_value: str = None) -> List[Mapping[str, Any]]:
         """
         Get trend over time for a metric
         
@@ -246,49 +414,23 @@ class CR360Queries:
             dimension: 'region', 'segment', 'product'
             dimension_value: Filter to specific value (e.g., 'Southeast')
         """
-        metric_sql = {
-            'dpd_30': "ROUND((SUM(a.dpd_30_balance) / NULLIF(SUM(a.total_outstanding), 0) * 100)::numeric, 2)",
-            'nco': "ROUND((SUM(a.net_charge_off_qtd) * 4 / NULLIF(SUM(a.total_outstanding), 0) * 100)::numeric, 3)",
-            'score': "ROUND((SUM(a.avg_credit_score * a.total_outstanding) / NULLIF(SUM(a.total_outstanding), 0))::numeric, 0)",
-            'originations': "ROUND(SUM(a.origination_volume)::numeric / 1e9, 2)"
-        }
+        if metric not in TREND_METRIC_SQL:
+            metric = 'dpd_30'
+        if dimension not in TREND_DIMENSIONS:
+            dimension = 'region'
         
-        dimension_config = {
-            'region': ('r.region_name', 'dim_region r ON a.region_skey = r.region_skey'),
-            'segment': ('s.retail_classification', 'dim_segment s ON a.segment_skey = s.segment_skey'),
-            'product': ('p.product_type', 'dim_product p ON a.product_skey = p.product_skey')
-        }
-        
-        dim_col, dim_join = dimension_config.get(dimension, dimension_config['region'])
-        
-        sql = f"""
-        SELECT 
-            d.quarter_name,
-            {dim_col} AS {dimension},
-            {metric_sql.get(metric, metric_sql['dpd_30'])} AS {metric}
-        FROM agg_monthly_summary a
-        JOIN dim_date d ON a.as_of_date_skey = d.date_skey
-        JOIN {dim_join}
-        """
-        
-        params = []
         if dimension_value:
-            sql += f" WHERE {dim_col} = %s"
-            params.append(dimension_value)
-        
-        sql += f"""
-        GROUP BY d.quarter_name, d.date_skey, {dim_col}
-        ORDER BY d.date_skey, {dim_col}
-        """
-        
-        return self.db.execute_query(sql, tuple(params) if params else None)
+            return await self.db.execute_query(
+                TREND_SQL[(metric, dimension, True)], (dimension_value,)
+            )
+        return await self.db.execute_query(TREND_SQL[(metric, dimension, False)])
 
 
 # =============================================================================
 # EXAMPLE USAGE
 # =============================================================================
 
-def demo():
+async def demo():
     """Demonstrate CR360 database queries"""
     
     print("=" * 60)
@@ -299,9 +441,12 @@ def demo():
     db = CR360Database()
     queries = CR360Queries(db)
     
+    # The four dashboard queries run concurrently on the pool
+    dashboard = await queries.dashboard('Q4-2025', region='Southeast', segment='Subprime')
+    
     # Portfolio summary
     print("\n1. Portfolio Summary (Q4-2025):")
-    summary = queries.get_portfolio_summary('Q4-2025')
+    summary = dashboard['summary']
     print(f"   Total: ${summary.get('portfolio_billions', 'N/A')}B")
     print(f"   Accounts: {summary.get('total_accounts', 'N/A'):,}")
     print(f"   Delinquency: {summary.get('delinquency_rate_pct', 'N/A')}%")
@@ -309,26 +454,23 @@ def demo():
     
     # Regional comparison
     print("\n2. Regional Comparison:")
-    regions = queries.get_regional_comparison('Q4-2025')
-    for r in regions:
+    for r in dashboard['regions']:
         print(f"   {r['region_name']}: ${r['outstanding_billions']}B | DPD: {r['dpd_30_pct']}%")
     
     # Segment stress
     print("\n3. Southeast Segment Analysis:")
-    segments = queries.get_segment_analysis(region='Southeast', quarter='Q4-2025')
-    for s in segments:
+    for s in dashboard['segments']:
         print(f"   {s['segment']}: ${s['outstanding_billions']}B | DPD: {s['dpd_30_pct']}% | Score: {s['avg_score']}")
     
     # Trend
     print("\n4. Subprime Delinquency Trend:")
-    trend = queries.get_trend(metric='dpd_30', dimension='segment', dimension_value='Subprime')
-    for t in trend:
+    for t in dashboard['trend']:
         print(f"   {t['quarter_name']}: {t['dpd_30']}%")
     
     # Cleanup
-    db.close()
+    await db.close()
     print("\n" + "=" * 60)
 
 
 if __name__ == '__main__':
-    demo()
+    asyncio.run(demo())
@@ -390,6 +390,38 @@ COMMENT ON COLUMN accounts.ecl_stage IS 'IFRS 9 ECL staging: 1=Performing, 2=Und
 COMMENT ON COLUMN accounts.twelve_month_pd IS 'Probability of default within next 12 months (0-1)';
 COMMENT ON COLUMN accounts.expected_credit_loss IS '12-month expected credit loss provision under IFRS 9';
 
+-- =============================================================================
+-- SEMANTIC QUERY CACHE (optional, used when SEMANTIC_CACHE_ENABLED=true)
+-- =============================================================================
+-- Requires the pgvector extension. Entries older than SEMANTIC_CACHE_TTL_DAYS
+-- are ignored on lookup and purged at application startup; a pg_cron job
+-- running the same DELETE can be scheduled for long-lived deployments.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS nl_query_cache (
+    id BIGSERIAL PRIMARY KEY,
+    query_text TEXT NOT NULL,
+    query_embedding vector(768) NOT NULL,
+    sql TEXT NOT NULL,
+    explanation TEXT,
+    metrics_used JSONB NOT NULL DEFAULT '[]',
+    visualization_hint VARCHAR(50),
+    results JSONB NOT NULL,
+    check_ambiguity BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Existing deployments: earlier rows may come from requests that skipped the
+-- ambiguity check, so they default to FALSE and are only served to such requests
+ALTER TABLE nl_query_cache ADD COLUMN IF NOT EXISTS check_ambiguity BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_nl_query_cache_embedding
+    ON nl_query_cache USING hnsw (query_embedding vector_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_nl_query_cache_created_at ON nl_query_cache(created_at);
+
+COMMENT ON TABLE nl_query_cache IS 'Text-to-SQL results keyed by query embedding for semantic cache hits';
+
 -- =============================================================================
 -- DATA LOADING NOTES
 -- =============================================================================
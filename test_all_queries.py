@@ -4,14 +4,20 @@ Test all 20 queries from TEST_QUERIES.md
 Handles ambiguous queries with automatic clarification
 """
 
-import requests
+import asyncio
+import httpx
 import json
-from typing import Dict, Any, List, Optional
-import time
+from typing import Dict, Any, List, Optional, Tuple
 
 API_BASE_URL = "http://localhost:8000"
 API_VERSION = "v1"
 
+# Concurrent requests in flight against the API
+MAX_CONCURRENCY = 4
+
+# Per-request timeout in seconds (LLM-backed queries take several seconds)
+REQUEST_TIMEOUT = 120.0
+
 # Test queries organized by category
 QUERIES = {
     "Category 1: Portfolio-Level Aggregates": [
@@ -143,9 +149,20 @@ QUERIES = {
 }
 
 
-def send_query(query: str, clarifications: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+# Flattened (category, query_data) pairs, in display order
+ALL_QUERIES: Tuple[Tuple[str, Dict[str, Any]], ...] = tuple(
+    (category, query_data)
+    for category, queries in QUERIES.items()
+    for query_data in queries
+)
+
+async def send_query(
+    client: httpx.AsyncClient,
+    query: str,
+    clarifications: Optional[List[Dict[str, str]]] = None
+) -> Dict[str, Any]:
     """Send a query to the API"""
-    url = f"{API_BASE_URL}/api/{API_VERSION}/chat"
+    url = f"/api/{API_VERSION}/chat"
 
     payload = {
         "query": query,
@@ -155,7 +172,7 @@ def send_query(query: str, clarifications: Optional[List[Dict[str, str]]] = None
     if clarifications:
         payload["clarifications"] = clarifications
 
-    response = requests.post(url, json=payload)
+    response = await client.post(url, json=payload)
 
     # For chat endpoint, 400 can be valid (ambiguity)
     if response.status_code == 400:
@@ -167,9 +184,15 @@ def send_query(query: str, clarifications: Optional[List[Dict[str, str]]] = None
     return response.json()
 
 
-def handle_ambiguous_query(query: str, questions: List[Dict], predefined_clarifications: Dict[str, str]) -> Dict[str, Any]:
+async def handle_ambiguous_query(
+    client: httpx.AsyncClient,
+    query: str,
+    questions: List[Dict],
+    predefined_clarifications: Dict[str, str],
+    log: List[str]
+) -> Dict[str, Any]:
     """Handle ambiguous query by providing clarifications"""
-    print(f"  ⚠️  Query is ambiguous. Questions received:")
+    log.append(f"  ⚠️  Query is ambiguous. Questions received:")
 
     clarifications = []
 
@@ -178,8 +201,8 @@ def handle_ambiguous_query(query: str, questions: List[Dict], predefined_clarifi
         question_text = question["question_text"]
         options = question["options"]
 
-        print(f"     Q: {question_text}")
-        print(f"     Options: {', '.join(options)}")
+        log.append(f"     Q: {question_text}")
+        log.append(f"     Options: {', '.join(options)}")
 
         # Try to find matching clarification from predefined ones
         selected_option = None
@@ -197,17 +220,17 @@ def handle_ambiguous_query(query: str, questions: List[Dict], predefined_clarifi
         if not selected_option:
             selected_option = options[0]
 
-        print(f"     Selected: {selected_option}")
+        log.append(f"     Selected: {selected_option}")
 
         clarifications.append({
             "question_id": question_id,
             "selected_option": selected_option
         })
 
-    print(f"  🔄 Sending clarified query...")
+    log.append(f"  🔄 Sending clarified query...")
 
     # Send query again with clarifications
-    return send_query(query, clarifications)
+    return await send_query(client, query, clarifications)
 
 
 def format_result(response: Dict[str, Any], query_id: int, query: str) -> str:
@@ -257,77 +280,112 @@ def format_result(response: Dict[str, Any], query_id: int, query: str) -> str:
     return result
 
 
-def run_all_tests():
-    """Run all test queries"""
+async def run_one(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    category: str,
+    query_data: Dict[str, Any]
+) -> Tuple[str, List[str], str]:
+    """
+    Run a single test query
+
+    Progress lines are collected and printed as one block when the query
+    finishes, so concurrent queries do not interleave their output.
+
+    Returns:
+        Tuple of (outcome, progress lines, formatted result), where outcome
+        is one of 'success', 'no_data', 'ambiguous_unresolved' or 'failed'
+        with an 'ambiguous_resolved:' prefix when clarifications were sent
+    """
+    query_id = query_data["id"]
+    query = query_data["query"]
+    predefined_clarifications = query_data.get("clarifications", {})
+
+    log = [
+        f"[{category}]",
+        f"Query {query_id}: {query}",
+        f"Expected: {query_data['expected']}"
+    ]
+    prefix = ""
+
+    async with semaphore:
+        try:
+            # Send initial query
+            response = await send_query(client, query)
+
+            # Handle ambiguous queries
+            if response.get("is_ambiguous"):
+                questions = response.get("questions", [])
+
+                if questions and predefined_clarifications:
+                    # Handle with clarifications
+                    response = await handle_ambiguous_query(
+                        client, query, questions, predefined_clarifications, log
+                    )
+                    prefix = "ambiguous_resolved:"
+                else:
+                    log.append(f"  ⚠️  Ambiguous but no clarifications provided")
+
+            # Check final result
+            if response.get("success"):
+                row_count = response.get("result", {}).get("row_count", 0)
+
+                if row_count == 0:
+                    outcome = "no_data"
+                    log.append(f"  ✅ Success (0 rows - expected for edge cases)")
+                else:
+                    outcome = "success"
+                    log.append(f"  ✅ Success ({row_count} rows)")
+            elif response.get("is_ambiguous"):
+                outcome = "ambiguous_unresolved"
+            else:
+                outcome = "failed"
+                log.append(f"  ❌ Failed: {response.get('error', 'Unknown error')}")
+
+            return prefix + outcome, log, format_result(response, query_id, query)
+
+        except Exception as e:
+            log.append(f"  ❌ Exception: {str(e)}")
+            return "failed", log, f"\nQuery {query_id}: {query}\n❌ EXCEPTION: {str(e)}\n"
+
+
+async def run_all_tests():
+    """Run all test queries, up to MAX_CONCURRENCY at a time"""
     print("\n" + "="*80)
-    print("CR360 Test Suite - Running All 20 Queries")
+    print(f"CR360 Test Suite - Running All {len(ALL_QUERIES)} Queries")
     print("="*80 + "\n")
 
-    total_queries = 0
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def run_and_report(category: str, query_data: Dict[str, Any]) -> Tuple[str, str]:
+        outcome, log, result_text = await run_one(client, semaphore, category, query_data)
+        print("\n".join(log) + "\n")
+        return outcome, result_text
+
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=REQUEST_TIMEOUT) as client:
+        outcomes = await asyncio.gather(*(
+            run_and_report(category, query_data) for category, query_data in ALL_QUERIES
+        ))
+
+    # Tally in display order (gather preserves input order)
+    total_queries = len(outcomes)
     successful_queries = 0
     ambiguous_resolved = 0
     failed_queries = 0
     no_data_queries = 0
-
     all_results = []
 
-    for category, queries in QUERIES.items():
-        print(f"\n{'#'*80}")
-        print(f"# {category}")
-        print(f"{'#'*80}\n")
-
-        for query_data in queries:
-            query_id = query_data["id"]
-            query = query_data["query"]
-            expected = query_data["expected"]
-            predefined_clarifications = query_data.get("clarifications", {})
-
-            total_queries += 1
-
-            print(f"Query {query_id}: {query}")
-            print(f"Expected: {expected}")
-
-            try:
-                # Send initial query
-                response = send_query(query)
-
-                # Handle ambiguous queries
-                if response.get("is_ambiguous"):
-                    questions = response.get("questions", [])
-
-                    if questions and predefined_clarifications:
-                        # Handle with clarifications
-                        response = handle_ambiguous_query(query, questions, predefined_clarifications)
-                        ambiguous_resolved += 1
-                    else:
-                        print(f"  ⚠️  Ambiguous but no clarifications provided")
-
-                # Check final result
-                if response.get("success"):
-                    row_count = response.get("result", {}).get("row_count", 0)
-
-                    if row_count == 0:
-                        no_data_queries += 1
-                        print(f"  ✅ Success (0 rows - expected for edge cases)")
-                    else:
-                        successful_queries += 1
-                        print(f"  ✅ Success ({row_count} rows)")
-                else:
-                    if not response.get("is_ambiguous"):
-                        failed_queries += 1
-                        print(f"  ❌ Failed: {response.get('error', 'Unknown error')}")
-
-                # Format and store result
-                result_text = format_result(response, query_id, query)
-                all_results.append(result_text)
-
-            except Exception as e:
-                failed_queries += 1
-                print(f"  ❌ Exception: {str(e)}")
-                all_results.append(f"\nQuery {query_id}: {query}\n❌ EXCEPTION: {str(e)}\n")
-
-            # Small delay between queries
-            time.sleep(0.5)
+    for outcome, result_text in outcomes:
+        if outcome.startswith("ambiguous_resolved:"):
+            ambiguous_resolved += 1
+            outcome = outcome.split(":", 1)[1]
+        if outcome == "success":
+            successful_queries += 1
+        elif outcome == "no_data":
+            no_data_queries += 1
+        elif outcome == "failed":
+            failed_queries += 1
+        all_results.append(result_text)
 
     # Print summary
     print("\n" + "="*80)
@@ -361,4 +419,4 @@ def run_all_tests():
 
 
 if __name__ == "__main__":
-    run_all_tests()
+    asyncio.run(run_all_tests())
@@ -3,10 +3,16 @@
 Quick test to verify semantic_model_prod.yaml is working correctly
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 API_BASE_URL = "http://localhost:8000"
 
+# Shared session so every query reuses a keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=10))
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=10))
+
 def test_query(query, description):
     print(f"\n{'='*80}")
     print(f"TEST: {description}")
@@ -14,7 +20,7 @@ def test_query(query, description):
     print(f"{'='*80}")
 
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE_URL}/api/v1/chat",
             json={"query": query, "check_ambiguity": True},
             timeout=30
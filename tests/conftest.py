@@ -10,11 +10,16 @@ This module provides centralized test fixtures used across all test files:
 - Sample data fixtures
 """
 
+import asyncio
+import copy
 import pytest
 import os
-from typing import Dict, List, Any, Optional
-from unittest.mock import Mock, AsyncMock, MagicMock, patch
-from datetime import datetime
+import re
+import yaml
+from functools import lru_cache, partial
+from types import SimpleNamespace
+from typing import Callable, Any, Tuple
+from unittest.mock import Mock, AsyncMock, patch
 from fastapi.testclient import TestClient
 
 
@@ -22,6 +27,46 @@ from fastapi.testclient import TestClient
 # Test Isolation - Singleton Reset
 # ============================================================================
 
+@lru_cache(maxsize=1)
+def _singleton_resets() -> Tuple[Callable[[], None], ...]:
+    """
+    Build the singleton reset actions once per session.
+
+    The app modules are imported on first use rather than at conftest
+    import time, and every test afterwards only runs the cached callables.
+    """
+    import app.query.text_to_sql as tts_module
+    import app.llm.context_loader as cl_module
+    import app.database.client as db_module
+    import app.llm.gemini_client as gc_module
+    import app.database.pool as pool_module
+    import app.cache.query_cache as qc_module
+    import app.query.plan_cache as plan_module
+    import app.query.semantic_cache as sc_module
+    import app.llm.embedding_cache as ec_module
+
+    return (
+        # TextToSQLEngine singleton
+        partial(setattr, tts_module, '_text_to_sql_engine', None),
+        # ContextLoader singleton
+        cl_module.get_context_loader.cache_clear,
+        # DatabaseClient singleton
+        partial(setattr, db_module, '_database_client', None),
+        # GeminiClient singleton
+        gc_module.get_gemini_client.cache_clear,
+        # asyncpg pool singleton
+        partial(setattr, pool_module, '_db_pool', None),
+        # Query cache Redis client
+        partial(setattr, qc_module, '_redis_client', None),
+        # Process-local plan cache
+        plan_module.PLAN_CACHE.clear,
+        # SemanticCache singleton
+        sc_module.get_semantic_cache.cache_clear,
+        # Process-local embedding cache
+        ec_module.EMBEDDING_CACHE.clear,
+    )
+
+
 @pytest.fixture(autouse=True)
 def reset_singletons():
     """
@@ -30,29 +75,29 @@ def reset_singletons():
     This fixture runs automatically before every test to prevent singleton
     instances from persisting between tests, which can cause mock contamination.
     """
-    # Reset TextToSQLEngine singleton
-    import app.query.text_to_sql as tts_module
-    tts_module._text_to_sql_engine = None
+    resets = _singleton_resets()
+    for reset in resets:
+        reset()
 
-    # Reset ContextLoader singleton
-    import app.llm.context_loader as cl_module
-    cl_module._context_loader = None
+    yield
 
-    # Reset DatabaseClient singleton
-    import app.database.client as db_module
-    db_module._database_client = None
+    # Clean up after test
+    for reset in resets:
+        reset()
 
-    # Reset GeminiClient singleton
-    import app.llm.gemini_client as gc_module
-    gc_module._gemini_client = None
 
-    yield
+@pytest.fixture(autouse=True)
+def disable_query_cache(monkeypatch):
+    """
+    Disable the Redis query cache for every test.
 
-    # Clean up after test
-    tts_module._text_to_sql_engine = None
-    cl_module._context_loader = None
-    db_module._database_client = None
-    gc_module._gemini_client = None
+    A local .env may point REDIS_URL at a real Redis; cache hits from a
+    previous run would otherwise bypass the mocked engine.
+    """
+    import app.cache.query_cache as qc_module
+    monkeypatch.setattr(
+        qc_module, "settings", qc_module.settings.model_copy(update={"REDIS_URL": None})
+    )
 
 
 # ============================================================================
@@ -116,14 +161,30 @@ def test_env_vars(monkeypatch):
     yield env_vars
 
 
+# ============================================================================
+# Shared Read-Only Data
+# ============================================================================
+
+def _shared(value: Any):
+    """
+    Yield read-only test data for a session-scoped fixture.
+
+    The value is built once per run instead of once per test. Teardown
+    fails if a test mutated it, since later tests would see the change.
+    """
+    snapshot = copy.deepcopy(value)
+    yield value
+    assert value == snapshot, "session-scoped fixture data was mutated by a test"
+
+
 # ============================================================================
 # Database Mocks
 # ============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_query_results():
     """Sample database query results (list of dicts)"""
-    return [
+    yield from _shared([
         {
             "product_name": "Mortgage",
             "total_exposure": 1500000000.00,
@@ -142,33 +203,37 @@ def sample_query_results():
             "delinquency_rate": 4.1,
             "charge_off_rate": 2.1
         }
-    ]
+    ])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_empty_results():
     """Empty query results"""
-    return []
+    yield from _shared([])
 
 
 @pytest.fixture
 def mock_db_connection():
-    """Mock psycopg2 connection and cursor"""
-    mock_cursor = Mock()
-    mock_cursor.fetchall.return_value = []
-    mock_cursor.description = [
-        ("product_name",),
-        ("total_exposure",),
-        ("delinquency_rate",),
-        ("charge_off_rate",)
-    ]
-
+    """Mock asyncpg connection"""
     mock_conn = Mock()
-    mock_conn.cursor.return_value = mock_cursor
+    mock_conn.fetch = AsyncMock(return_value=[])
+    mock_conn.execute = AsyncMock(return_value="SELECT 0")
 
     yield mock_conn
 
 
+# Classifies SQL for mock_database_client in one case-insensitive match.
+# Each alternative is a set of lookaheads anchored at the start, so the
+# first alternative that applies wins regardless of where its keywords
+# appear: COUNT(*), then SUM( with product_name, then WHERE with date
+_MOCK_SQL_DISPATCH = re.compile(
+    r"^(?:(?P<count>(?=.*COUNT\(\*\)))"
+    r"|(?P<product_totals>(?=.*SUM\()(?=.*product_name))"
+    r"|(?P<dated>(?=.*WHERE)(?=.*date)))",
+    re.IGNORECASE | re.DOTALL
+)
+
+
 @pytest.fixture
 def mock_database_client(sample_query_results):
     """Mock DatabaseClient with sample responses"""
@@ -179,11 +244,11 @@ def mock_database_client(sample_query_results):
     # Mock execute_query as async
     async def mock_execute_query(sql: str):
         # Simulate different responses based on SQL content
-        if "COUNT(*)" in sql.upper():
+        match = _MOCK_SQL_DISPATCH.match(sql)
+        kind = match.lastgroup if match else None
+        if kind == "count":
             return [{"count": 2109406}]
-        elif "SUM(" in sql.upper() and "product_name" in sql.lower():
-            return sample_query_results
-        elif "WHERE" in sql.upper() and "date" in sql.lower():
+        elif kind == "dated":
             return sample_query_results[:1]
         else:
             return sample_query_results
@@ -203,10 +268,10 @@ def mock_database_client(sample_query_results):
 # LLM (Gemini) Mocks
 # ============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_sql_response():
     """Sample LLM response with SQL, explanation, and metrics"""
-    return """```sql
+    yield from _shared("""```sql
 SELECT
     product_name,
     SUM(account_balance_eop) as total_exposure,
@@ -221,13 +286,13 @@ ORDER BY product_name
 Explanation: This query retrieves the total exposure, delinquency rate, and charge-off rate for each product using the latest available date. It aggregates account balances and calculates rates using NULLIF to avoid division by zero.
 
 Metrics used: total_exposure, delinquency_rate, charge_off_rate
-"""
+""")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ambiguous_response():
     """Sample ambiguity detection response"""
-    return """Ambiguous: Yes
+    yield from _shared("""Ambiguous: Yes
 
 Reasons:
 - Missing time period specification
@@ -236,28 +301,57 @@ Reasons:
 Suggestions:
 - Specify a time period (e.g., "as of latest date", "for Q4 2024")
 - Specify aggregation level (e.g., "by product", "by region")
-"""
+""")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_clear_response():
     """Sample response for clear (non-ambiguous) query"""
-    return """{
+    yield from _shared("""{
   "is_ambiguous": false,
   "reasons": [],
   "suggestions": []
-}"""
+}""")
 
 
 @pytest.fixture
 def mock_gemini_api_response(sample_sql_response):
     """Mock google.generativeai response structure"""
-    mock_response = Mock()
-    mock_response.text = sample_sql_response
-    mock_response.candidates = [Mock()]
-    mock_response.prompt_feedback = Mock()
+    # Plain attribute carrier: nothing asserts on calls to the response
+    yield SimpleNamespace(
+        text=sample_sql_response,
+        candidates=[SimpleNamespace()],
+        prompt_feedback=SimpleNamespace()
+    )
 
-    yield mock_response
+
+# Canned LLM results shared by every mock_gemini_client (never mutated by the engine)
+_MOCK_GENERATED_SQL = {
+    'sql': """SELECT
+    SUM(account_balance_eop) as total_exposure
+FROM account_level_monthly
+WHERE calendar_date = (SELECT MAX(calendar_date) FROM account_level_monthly)""",
+    'explanation': "This query retrieves the total exposure using the latest available date.",
+    'metrics_used': ['total_exposure']
+}
+
+_MOCK_CLEAR_AMBIGUITY = {
+    'is_ambiguous': False,
+    'reasons': [],
+    'suggestions': []
+}
+
+# Same shape as GeminiClient._parse_sql_response: (sql, explanation, metrics)
+_MOCK_PARSED_SQL = (
+    "SELECT SUM(account_balance_eop) FROM account_level_monthly",
+    "Sample explanation",
+    ['total_exposure']
+)
+
+_MOCK_VALID_SQL = {
+    'is_valid': True,
+    'errors': []
+}
 
 
 @pytest.fixture
@@ -273,38 +367,11 @@ def mock_gemini_client(sample_sql_response, sample_clear_response):
     # Mock generate_with_context as async
     mock_client.generate_with_context = AsyncMock(return_value=sample_sql_response)
 
-    # Mock generate_sql as async
-    async def mock_generate_sql(query, context, history=None):
-        return {
-            'sql': """SELECT
-    SUM(account_balance_eop) as total_exposure
-FROM account_level_monthly
-WHERE calendar_date = (SELECT MAX(calendar_date) FROM account_level_monthly)""",
-            'explanation': "This query retrieves the total exposure using the latest available date.",
-            'metrics_used': ['total_exposure']
-        }
-
-    mock_client.generate_sql = AsyncMock(side_effect=mock_generate_sql)
+    # Canned results are returned directly so AsyncMock skips the side_effect call
+    mock_client.generate_sql = AsyncMock(return_value=_MOCK_GENERATED_SQL)
+    mock_client.detect_ambiguity = AsyncMock(return_value=_MOCK_CLEAR_AMBIGUITY)
 
-    # Mock detect_ambiguity as async
-    async def mock_detect_ambiguity(query, context):
-        return {
-            'is_ambiguous': False,
-            'reasons': [],
-            'suggestions': []
-        }
-
-    mock_client.detect_ambiguity = AsyncMock(side_effect=mock_detect_ambiguity)
-
-    # Mock _parse_sql_response
-    def mock_parse_sql_response(response):
-        return (
-            "SELECT SUM(account_balance_eop) FROM account_level_monthly",
-            "Sample explanation",
-            ['total_exposure']
-        )
-
-    mock_client._parse_sql_response = Mock(side_effect=mock_parse_sql_response)
+    mock_client._parse_sql_response = Mock(return_value=_MOCK_PARSED_SQL)
 
     yield mock_client
 
@@ -313,10 +380,9 @@ WHERE calendar_date = (SELECT MAX(calendar_date) FROM account_level_monthly)""",
 # Context Loader Mocks
 # ============================================================================
 
-@pytest.fixture
-def sample_semantic_context():
-    """Minimal valid YAML semantic model for testing"""
-    return """
+# Minimal valid YAML semantic model, parsed once at import (libyaml loader
+# when PyYAML was built with it, as in app.llm.context_loader)
+_SEMANTIC_YAML = """
 version: "2.0"
 metadata:
   name: "CR360 Test Semantic Model"
@@ -355,10 +421,28 @@ metrics:
     calculation:
       formula: "(SUM(total_delinquent_balance) / NULLIF(SUM(account_balance_eop), 0)) * 100"
 """
+# Parsed at import, i.e. once per process (once per worker under pytest-xdist).
+# The parse takes ~0.2 ms, less than a pickle + file lock round trip would, so
+# it is not shared between workers on disk.
+_PARSED_SEMANTIC_CONTEXT = yaml.load(
+    _SEMANTIC_YAML, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+)
+
+
+@pytest.fixture(scope="session")
+def sample_semantic_context():
+    """Minimal valid YAML semantic model for testing"""
+    yield from _shared(_SEMANTIC_YAML)
+
+
+@pytest.fixture(scope="session")
+def parsed_semantic_context():
+    """sample_semantic_context as parsed data (parsed once per run)"""
+    yield from _shared(_PARSED_SEMANTIC_CONTEXT)
 
 
 @pytest.fixture
-def mock_context_loader(sample_semantic_context):
+def mock_context_loader(sample_semantic_context, parsed_semantic_context):
     """Mock ContextLoader with test semantic model"""
     from app.llm.context_loader import ContextLoader
 
@@ -382,26 +466,9 @@ def mock_context_loader(sample_semantic_context):
         'segment_name'
     ])
 
-    # Mock context property
-    mock_loader.context = {
-        'version': '2.0',
-        'metadata': {
-            'name': 'CR360 Test Semantic Model',
-            'description': 'Test semantic model'
-        },
-        'dimensions': {
-            'product': {
-                'column': 'product_name',
-                'values': ['Mortgage', 'Auto Loan', 'Credit Card']
-            }
-        },
-        'metrics': {
-            'exposure': {
-                'description': 'Total account balance',
-                'metrics': ['total_exposure']
-            }
-        }
-    }
+    # Mock context property (the parsed test model, so both stay in sync)
+    mock_loader.context = parsed_semantic_context
+    mock_loader.schema_version = 1
 
     yield mock_loader
 
@@ -410,51 +477,73 @@ def mock_context_loader(sample_semantic_context):
 # HTTP Test Client
 # ============================================================================
 
-@pytest.fixture
-def test_client():
-    """FastAPI TestClient for endpoint testing"""
+@pytest.fixture(scope="session")
+def _session_test_client():
+    """
+    TestClient built once per run.
+
+    Not entered as a context manager, so the app lifespan (database pool,
+    engine warmup) never runs; routes fall back to the singleton accessors
+    that tests patch.
+    """
     from app.main import app
 
-    client = TestClient(app)
-    yield client
+    yield TestClient(app)
+
+
+@pytest.fixture
+def test_client(_session_test_client):
+    """FastAPI TestClient for endpoint testing (per-test state cleared)"""
+    _session_test_client.app.dependency_overrides.clear()
+    _session_test_client.cookies.clear()
+    yield _session_test_client
+    _session_test_client.app.dependency_overrides.clear()
 
 
 @pytest.fixture
+def mock_http_request():
+    """Minimal Starlette request stand-in with no headers and empty application state"""
+    from starlette.datastructures import Headers, State
+
+    return SimpleNamespace(app=SimpleNamespace(state=State()), headers=Headers())
+
+
+@pytest.fixture(scope="session")
 def authorized_headers():
     """Mock authorization headers"""
-    return {
+    yield from _shared({
         "Content-Type": "application/json",
         "Authorization": "Bearer test_token_123"
-    }
+    })
 
 
 # ============================================================================
 # Sample Request/Response Data
 # ============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_chat_request():
     """Valid ChatRequest data"""
-    return {
+    yield from _shared({
         "query": "What is the total exposure for Mortgage products?",
         "conversation_id": "test-conversation-123",
         "check_ambiguity": True,
         "session_id": "test-session-456"
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_chat_request_minimal():
     """Minimal valid ChatRequest data"""
-    return {
+    yield from _shared({
         "query": "What is the total exposure?"
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_conversation_history():
     """Sample conversation history (3 turns)"""
-    return [
+    yield from _shared([
         {
             "role": "user",
             "content": "What is the total exposure?",
@@ -480,41 +569,45 @@ def sample_conversation_history():
             "content": "What about delinquency rates?",
             "timestamp": "2024-12-16T10:00:20Z"
         }
-    ]
+    ])
 
 
-@pytest.fixture
+# Fixed so response fixtures are deterministic across the session
+_FIXED_TIMESTAMP = "2024-12-16T10:00:30"
+
+
+@pytest.fixture(scope="session")
 def sample_query_result():
     """Sample QueryResult data"""
-    return {
+    yield from _shared({
         "sql": "SELECT SUM(account_balance_eop) as total_exposure FROM account_level_monthly WHERE calendar_date = (SELECT MAX(calendar_date) FROM account_level_monthly)",
         "explanation": "This query retrieves the total exposure using the latest available date.",
         "results": [{"total_exposure": 2800000000.00}],
         "metrics_used": ["total_exposure"],
         "visualization_hint": "bar",
         "row_count": 1
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_chat_response(sample_query_result):
     """Sample ChatResponse data"""
-    return {
+    yield from _shared({
         "success": True,
         "query": "What is the total exposure?",
         "conversation_id": "test-conversation-123",
         "result": sample_query_result,
         "error": None,
         "suggestions": None,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _FIXED_TIMESTAMP,
         "processing_time_ms": 523.45
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ambiguity_response():
     """Sample AmbiguityResponse data"""
-    return {
+    yield from _shared({
         "success": False,
         "query": "Show me the metrics",
         "is_ambiguous": True,
@@ -526,22 +619,22 @@ def sample_ambiguity_response():
             "Specify which metrics (e.g., exposure, delinquency rate, charge-off rate)",
             "Specify a time period (e.g., 'as of latest date', 'for Q4 2024')"
         ],
-        "timestamp": datetime.utcnow().isoformat()
-    }
+        "timestamp": _FIXED_TIMESTAMP
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_error_response():
     """Sample ErrorResponse data"""
-    return {
+    yield from _shared({
         "success": False,
         "error": "Failed to generate SQL query",
         "error_type": "SQLGenerationError",
         "details": {
             "original_error": "Invalid metric name in query"
         },
-        "timestamp": datetime.utcnow().isoformat()
-    }
+        "timestamp": _FIXED_TIMESTAMP
+    })
 
 
 # ============================================================================
@@ -555,24 +648,17 @@ def mock_text_to_sql_engine(sample_query_result):
 
     mock_engine = Mock(spec=TextToSQLEngine)
 
-    # Mock process_query as async
-    async def mock_process_query(query, history=None, check_ambiguity=True):
-        return {
-            'sql': sample_query_result['sql'],
-            'explanation': sample_query_result['explanation'],
-            'results': sample_query_result['results'],
-            'metrics_used': sample_query_result['metrics_used'],
-            'visualization_hint': sample_query_result['visualization_hint']
-        }
-
-    mock_engine.process_query = AsyncMock(side_effect=mock_process_query)
+    # Mock process_query as async (result built once per fixture, not per call)
+    mock_engine.process_query = AsyncMock(return_value={
+        'sql': sample_query_result['sql'],
+        'explanation': sample_query_result['explanation'],
+        'results': sample_query_result['results'],
+        'metrics_used': sample_query_result['metrics_used'],
+        'visualization_hint': sample_query_result['visualization_hint']
+    })
 
     # Mock internal methods
-    mock_engine._check_ambiguity = AsyncMock(return_value={
-        'is_ambiguous': False,
-        'reasons': [],
-        'suggestions': []
-    })
+    mock_engine._check_ambiguity = AsyncMock(return_value=_MOCK_CLEAR_AMBIGUITY)
 
     mock_engine._generate_sql = AsyncMock(return_value={
         'sql': sample_query_result['sql'],
@@ -580,10 +666,7 @@ def mock_text_to_sql_engine(sample_query_result):
         'metrics_used': sample_query_result['metrics_used']
     })
 
-    mock_engine._validate_sql = Mock(return_value={
-        'is_valid': True,
-        'errors': []
-    })
+    mock_engine._validate_sql = Mock(return_value=_MOCK_VALID_SQL)
 
     mock_engine._execute_sql = AsyncMock(return_value=sample_query_result['results'])
 
@@ -597,41 +680,39 @@ def mock_text_to_sql_engine(sample_query_result):
 # ============================================================================
 
 @pytest.fixture
-def patch_get_gemini_client(mock_gemini_client):
-    """Patch get_gemini_client() to return mock"""
-    with patch('app.llm.gemini_client.get_gemini_client', return_value=mock_gemini_client):
-        yield mock_gemini_client
-
-
-@pytest.fixture
-def patch_get_database_client(mock_database_client):
-    """Patch get_database_client() to return mock"""
-    with patch('app.database.client.get_database_client', return_value=mock_database_client):
-        yield mock_database_client
-
-
-@pytest.fixture
-def patch_get_context_loader(mock_context_loader):
-    """Patch get_context_loader() to return mock"""
-    with patch('app.llm.context_loader.get_context_loader', return_value=mock_context_loader):
-        yield mock_context_loader
-
+def patch_all_clients(mock_gemini_client, mock_database_client, mock_context_loader):
+    """
+    Route the engine's client accessors to the shared mocks
 
-@pytest.fixture
-def patch_get_text_to_sql_engine(mock_text_to_sql_engine):
-    """Patch get_text_to_sql_engine() to return mock"""
-    with patch('app.query.text_to_sql.get_text_to_sql_engine', return_value=mock_text_to_sql_engine):
-        yield mock_text_to_sql_engine
+    Patches the accessors where app.query.text_to_sql imported them, which
+    is where TextToSQLEngine resolves its clients. Yields the mocks by
+    short name so tests can adjust their return values.
+    """
+    with patch.multiple(
+        'app.query.text_to_sql',
+        get_gemini_client=Mock(return_value=mock_gemini_client),
+        get_database_client=Mock(return_value=mock_database_client),
+        get_context_loader=Mock(return_value=mock_context_loader)
+    ):
+        yield SimpleNamespace(
+            gemini=mock_gemini_client,
+            db=mock_database_client,
+            ctx=mock_context_loader
+        )
 
 
 # ============================================================================
 # Async Test Helpers
 # ============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def event_loop():
-    """Create an instance of the default event loop for each test case"""
-    import asyncio
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """
+    One event loop for the whole test session
+
+    pytest-asyncio 0.21 (the pinned version) has no loop-scope setting, so
+    the loop scope is widened by overriding this fixture.
+    """
+    loop = asyncio.new_event_loop()
     yield loop
     loop.close()
@@ -138,7 +138,7 @@ class TestSingletonPattern:
 
         # Reset singleton
         import app.llm.context_loader as cl_module
-        cl_module._context_loader = None
+        cl_module.get_context_loader.cache_clear()
 
         loader1 = get_context_loader()
         loader2 = get_context_loader()
@@ -146,7 +146,7 @@ class TestSingletonPattern:
         assert loader1 is loader2
 
         # Clean up
-        cl_module._context_loader = None
+        cl_module.get_context_loader.cache_clear()
 
     @pytest.mark.asyncio
     async def test_database_client_singleton(self):
@@ -172,7 +172,7 @@ class TestSingletonPattern:
 
         # Reset singleton
         import app.llm.gemini_client as gc_module
-        gc_module._gemini_client = None
+        gc_module.get_gemini_client.cache_clear()
 
         with patch('app.llm.gemini_client.genai'):
             client1 = get_gemini_client()
@@ -181,7 +181,7 @@ class TestSingletonPattern:
             assert client1 is client2
 
         # Clean up
-        gc_module._gemini_client = None
+        gc_module.get_gemini_client.cache_clear()
 
     @pytest.mark.asyncio
     async def test_text_to_sql_engine_singleton(self):
@@ -5,7 +5,7 @@ Tests the complete chat API flow with real HTTP requests and mocked external ser
 """
 
 import pytest
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import AsyncMock
 from fastapi import status
 
 
@@ -13,40 +13,14 @@ class TestChatEndpointIntegration:
     """Integration tests for /api/v1/chat endpoint"""
 
     @pytest.mark.asyncio
-    @patch('app.query.text_to_sql.get_database_client')
-    @patch('app.query.text_to_sql.get_gemini_client')
-    @patch('app.query.text_to_sql.get_context_loader')
-    async def test_chat_simple_query_success(
-        self,
-        mock_get_context,
-        mock_get_llm,
-        mock_get_db,
-        test_client
-    ):
+    async def test_chat_simple_query_success(self, patch_all_clients, test_client):
         """Test simple successful query through API"""
-        # Mock context
-        mock_context_loader = Mock()
-        mock_context_loader.get_context_for_llm.return_value = "YAML context"
-        mock_get_context.return_value = mock_context_loader
-
-        # Mock LLM
-        mock_llm = Mock()
-        mock_llm.detect_ambiguity = AsyncMock(return_value={
-            'is_ambiguous': False,
-            'reasons': [],
-            'suggestions': []
-        })
-        mock_llm.generate_sql = AsyncMock(return_value={
+        patch_all_clients.gemini.generate_sql.return_value = {
             'sql': 'SELECT SUM(balance) as total FROM table',
             'explanation': 'Calculates total balance',
             'metrics_used': ['total_exposure']
-        })
-        mock_get_llm.return_value = mock_llm
-
-        # Mock database
-        mock_db = Mock()
-        mock_db.execute_query = AsyncMock(return_value=[{'total': 2800000000}])
-        mock_get_db.return_value = mock_db
+        }
+        patch_all_clients.db.execute_query = AsyncMock(return_value=[{'total': 2800000000}])
 
         # Make request
         response = test_client.post(
@@ -62,37 +36,14 @@ class TestChatEndpointIntegration:
         assert len(data['result']['results']) > 0
 
     @pytest.mark.asyncio
-    @patch('app.query.text_to_sql.get_database_client')
-    @patch('app.query.text_to_sql.get_gemini_client')
-    @patch('app.query.text_to_sql.get_context_loader')
-    async def test_chat_with_conversation_history(
-        self,
-        mock_get_context,
-        mock_get_llm,
-        mock_get_db,
-        test_client
-    ):
+    async def test_chat_with_conversation_history(self, patch_all_clients, test_client):
         """Test chat with conversation history"""
-        mock_context_loader = Mock()
-        mock_context_loader.get_context_for_llm.return_value = "context"
-        mock_get_context.return_value = mock_context_loader
-
-        mock_llm = Mock()
-        mock_llm.detect_ambiguity = AsyncMock(return_value={
-            'is_ambiguous': False,
-            'reasons': [],
-            'suggestions': []
-        })
-        mock_llm.generate_sql = AsyncMock(return_value={
+        patch_all_clients.gemini.generate_sql.return_value = {
             'sql': 'SELECT 1',
             'explanation': 'Test',
             'metrics_used': []
-        })
-        mock_get_llm.return_value = mock_llm
-
-        mock_db = Mock()
-        mock_db.execute_query = AsyncMock(return_value=[])
-        mock_get_db.return_value = mock_db
+        }
+        patch_all_clients.db.execute_query = AsyncMock(return_value=[])
 
         response = test_client.post(
             "/api/v1/chat",
@@ -110,28 +61,13 @@ class TestChatEndpointIntegration:
         assert data['success'] is True
 
     @pytest.mark.asyncio
-    @patch('app.query.text_to_sql.get_database_client')
-    @patch('app.query.text_to_sql.get_gemini_client')
-    @patch('app.query.text_to_sql.get_context_loader')
-    async def test_chat_ambiguous_query_returns_400(
-        self,
-        mock_get_context,
-        mock_get_llm,
-        mock_get_db,
-        test_client
-    ):
+    async def test_chat_ambiguous_query_returns_400(self, patch_all_clients, test_client):
         """Test that ambiguous query returns 400 with suggestions"""
-        mock_context_loader = Mock()
-        mock_context_loader.get_context_for_llm.return_value = "context"
-        mock_get_context.return_value = mock_context_loader
-
-        mock_llm = Mock()
-        mock_llm.detect_ambiguity = AsyncMock(return_value={
+        patch_all_clients.gemini.detect_ambiguity.return_value = {
             'is_ambiguous': True,
             'reasons': ['Missing time period'],
             'suggestions': ['Specify a time period']
-        })
-        mock_get_llm.return_value = mock_llm
+        }
 
         response = test_client.post(
             "/api/v1/chat",
@@ -169,37 +105,14 @@ class TestChatEndpointIntegration:
         assert response.status_code == 422
 
     @pytest.mark.asyncio
-    @patch('app.query.text_to_sql.get_database_client')
-    @patch('app.query.text_to_sql.get_gemini_client')
-    @patch('app.query.text_to_sql.get_context_loader')
-    async def test_chat_response_has_all_fields(
-        self,
-        mock_get_context,
-        mock_get_llm,
-        mock_get_db,
-        test_client
-    ):
+    async def test_chat_response_has_all_fields(self, patch_all_clients, test_client):
         """Test that response includes all required fields"""
-        mock_context_loader = Mock()
-        mock_context_loader.get_context_for_llm.return_value = "context"
-        mock_get_context.return_value = mock_context_loader
-
-        mock_llm = Mock()
-        mock_llm.detect_ambiguity = AsyncMock(return_value={
-            'is_ambiguous': False,
-            'reasons': [],
-            'suggestions': []
-        })
-        mock_llm.generate_sql = AsyncMock(return_value={
+        patch_all_clients.gemini.generate_sql.return_value = {
             'sql': 'SELECT 1',
             'explanation': 'Test',
             'metrics_used': []
-        })
-        mock_get_llm.return_value = mock_llm
-
-        mock_db = Mock()
-        mock_db.execute_query = AsyncMock(return_value=[])
-        mock_get_db.return_value = mock_db
+        }
+        patch_all_clients.db.execute_query = AsyncMock(return_value=[])
 
         response = test_client.post(
             "/api/v1/chat",
@@ -214,7 +127,7 @@ class TestChatEndpointIntegration:
         assert 'query' in data
         assert 'conversation_id' in data
         assert 'result' in data
-        assert 'timestamp' in data
+        assert 'timestamp_ms' in data
         assert 'processing_time_ms' in data
 
         # Check result fields
@@ -227,37 +140,14 @@ class TestChatEndpointIntegration:
         assert 'row_count' in result
 
     @pytest.mark.asyncio
-    @patch('app.query.text_to_sql.get_database_client')
-    @patch('app.query.text_to_sql.get_gemini_client')
-    @patch('app.query.text_to_sql.get_context_loader')
-    async def test_chat_response_conversation_id(
-        self,
-        mock_get_context,
-        mock_get_llm,
-        mock_get_db,
-        test_client
-    ):
+    async def test_chat_response_conversation_id(self, patch_all_clients, test_client):
         """Test that conversation ID is preserved"""
-        mock_context_loader = Mock()
-        mock_context_loader.get_context_for_llm.return_value = "context"
-        mock_get_context.return_value = mock_context_loader
-
-        mock_llm = Mock()
-        mock_llm.detect_ambiguity = AsyncMock(return_value={
-            'is_ambiguous': False,
-            'reasons': [],
-            'suggestions': []
-        })
-        mock_llm.generate_sql = AsyncMock(return_value={
+        patch_all_clients.gemini.generate_sql.return_value = {
             'sql': 'SELECT 1',
             'explanation': 'Test',
             'metrics_used': []
-        })
-        mock_get_llm.return_value = mock_llm
-
-        mock_db = Mock()
-        mock_db.execute_query = AsyncMock(return_value=[])
-        mock_get_db.return_value = mock_db
+        }
+        patch_all_clients.db.execute_query = AsyncMock(return_value=[])
 
         response = test_client.post(
             "/api/v1/chat",
@@ -284,34 +174,14 @@ class TestChatEndpointIntegration:
         assert 'access-control-allow-origin' in [h.lower() for h in response.headers.keys()]
 
     @pytest.mark.asyncio
-    @patch('app.query.text_to_sql.get_database_client')
-    @patch('app.query.text_to_sql.get_gemini_client')
-    @patch('app.query.text_to_sql.get_context_loader')
-    async def test_chat_check_ambiguity_false_skips_check(
-        self,
-        mock_get_context,
-        mock_get_llm,
-        mock_get_db,
-        test_client
-    ):
+    async def test_chat_check_ambiguity_false_skips_check(self, patch_all_clients, test_client):
         """Test that check_ambiguity=false skips ambiguity check"""
-        mock_context_loader = Mock()
-        mock_context_loader.get_context_for_llm.return_value = "context"
-        mock_get_context.return_value = mock_context_loader
-
-        mock_llm = Mock()
-        # Ambiguity check should NOT be called
-        mock_llm.detect_ambiguity = AsyncMock()
-        mock_llm.generate_sql = AsyncMock(return_value={
+        patch_all_clients.gemini.generate_sql.return_value = {
             'sql': 'SELECT 1',
             'explanation': 'Test',
             'metrics_used': []
-        })
-        mock_get_llm.return_value = mock_llm
-
-        mock_db = Mock()
-        mock_db.execute_query = AsyncMock(return_value=[])
-        mock_get_db.return_value = mock_db
+        }
+        patch_all_clients.db.execute_query = AsyncMock(return_value=[])
 
         response = test_client.post(
             "/api/v1/chat",
@@ -323,4 +193,4 @@ class TestChatEndpointIntegration:
 
         assert response.status_code == 200
         # Verify detect_ambiguity was not called
-        mock_llm.detect_ambiguity.assert_not_called()
+        patch_all_clients.gemini.detect_ambiguity.assert_not_called()
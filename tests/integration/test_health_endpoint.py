@@ -15,10 +15,10 @@ class TestHealthEndpointIntegration:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_endpoint_returns_200(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -33,9 +33,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/health")
 
         assert response.status_code == 200
@@ -43,10 +40,10 @@ class TestHealthEndpointIntegration:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_response_format(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -60,9 +57,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/health")
 
         data = response.json()
@@ -70,15 +64,15 @@ class TestHealthEndpointIntegration:
         assert 'status' in data
         assert 'version' in data
         assert 'components' in data
-        assert 'timestamp' in data
+        assert 'timestamp_ms' in data
 
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0-test")
     async def test_health_includes_version(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -92,9 +86,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0-test"
-
         response = test_client.get("/health")
 
         data = response.json()
@@ -103,10 +94,10 @@ class TestHealthEndpointIntegration:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_checks_database(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -120,9 +111,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/health")
 
         data = response.json()
@@ -132,10 +120,10 @@ class TestHealthEndpointIntegration:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_checks_context_loader(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -149,9 +137,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/health")
 
         data = response.json()
@@ -161,10 +146,10 @@ class TestHealthEndpointIntegration:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_checks_llm(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -178,9 +163,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/health")
 
         data = response.json()
@@ -190,10 +172,10 @@ class TestHealthEndpointIntegration:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_unhealthy_component(
         self,
-        mock_settings,
         mock_get_context,
         mock_get_db,
         test_client
@@ -208,9 +190,6 @@ class TestHealthEndpointIntegration:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/health")
 
         data = response.json()
@@ -222,23 +201,19 @@ class TestRootEndpointIntegration:
     """Integration tests for / (root) endpoint"""
 
     @pytest.mark.asyncio
-    @patch('app.api.routes.health.settings')
-    async def test_root_endpoint_accessible(self, mock_settings, test_client):
+    @patch('app.api.routes.health.APP_NAME', "CR360")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
+    async def test_root_endpoint_accessible(self, test_client):
         """Test that root endpoint is accessible"""
-        mock_settings.APP_NAME = "CR360"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/")
 
         assert response.status_code == 200
 
     @pytest.mark.asyncio
-    @patch('app.api.routes.health.settings')
-    async def test_root_endpoint_returns_welcome_message(self, mock_settings, test_client):
+    @patch('app.api.routes.health.APP_NAME', "CR360")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
+    async def test_root_endpoint_returns_welcome_message(self, test_client):
         """Test that root endpoint returns welcome message"""
-        mock_settings.APP_NAME = "CR360"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = test_client.get("/")
 
         data = response.json()
@@ -4,24 +4,31 @@ Unit Tests for Chat Route (app/api/routes/chat.py)
 Tests chat endpoints with mocked dependencies
 """
 
+import json
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from fastapi import HTTPException, status
-from app.api.routes.chat import chat, router
+from app.api.routes.chat import chat, router, _lookup_error
 from app.utils.exceptions import (
     AmbiguousQueryError,
     SQLGenerationError,
     SQLValidationError,
-    SQLExecutionError
+    SQLExecutionError,
+    DatabaseError
 )
 
 
+def parse_response(response):
+    """Decode the JSON body of a response returned directly by the route"""
+    return json.loads(response.body)
+
+
 class TestChatEndpoint:
     """Test chat endpoint"""
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_success(self, mock_get_engine, sample_chat_request):
+    async def test_chat_endpoint_success(self, mock_get_engine, sample_chat_request, mock_http_request):
         """Test successful chat request"""
         # Mock engine
         mock_engine = Mock()
@@ -38,7 +45,7 @@ class TestChatEndpoint:
         from app.api.schemas import ChatRequest
         request = ChatRequest(**sample_chat_request)
 
-        response = await chat(request)
+        response = parse_response(await chat(request, mock_http_request))
 
         assert response['success'] is True
         assert response['query'] == sample_chat_request['query']
@@ -48,7 +55,7 @@ class TestChatEndpoint:
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_generates_conversation_id(self, mock_get_engine):
+    async def test_chat_endpoint_generates_conversation_id(self, mock_get_engine, mock_http_request):
         """Test that conversation ID is generated if not provided"""
         mock_engine = Mock()
         mock_engine.process_query = AsyncMock(return_value={
@@ -63,7 +70,7 @@ class TestChatEndpoint:
         from app.api.schemas import ChatRequest
         request = ChatRequest(query="Test query")  # No conversation_id
 
-        response = await chat(request)
+        response = parse_response(await chat(request, mock_http_request))
 
         assert 'conversation_id' in response
         assert response['conversation_id'] is not None
@@ -71,7 +78,7 @@ class TestChatEndpoint:
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_ambiguous_query(self, mock_get_engine, sample_chat_request):
+    async def test_chat_endpoint_ambiguous_query(self, mock_get_engine, sample_chat_request, mock_http_request):
         """Test handling of ambiguous queries (returns 400)"""
         mock_engine = Mock()
         mock_engine.process_query = AsyncMock(
@@ -86,14 +93,14 @@ class TestChatEndpoint:
         request = ChatRequest(**sample_chat_request)
 
         with pytest.raises(HTTPException) as exc_info:
-            await chat(request)
+            await chat(request, mock_http_request)
 
         assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
         assert 'suggestions' in exc_info.value.detail or 'reasons' in exc_info.value.detail
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_sql_generation_error(self, mock_get_engine, sample_chat_request):
+    async def test_chat_endpoint_sql_generation_error(self, mock_get_engine, sample_chat_request, mock_http_request):
         """Test handling of SQL generation errors (returns 500)"""
         mock_engine = Mock()
         mock_engine.process_query = AsyncMock(
@@ -105,13 +112,13 @@ class TestChatEndpoint:
         request = ChatRequest(**sample_chat_request)
 
         with pytest.raises(HTTPException) as exc_info:
-            await chat(request)
+            await chat(request, mock_http_request)
 
         assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_sql_validation_error(self, mock_get_engine, sample_chat_request):
+    async def test_chat_endpoint_sql_validation_error(self, mock_get_engine, sample_chat_request, mock_http_request):
         """Test handling of SQL validation errors (returns 500)"""
         mock_engine = Mock()
         mock_engine.process_query = AsyncMock(
@@ -123,13 +130,13 @@ class TestChatEndpoint:
         request = ChatRequest(**sample_chat_request)
 
         with pytest.raises(HTTPException) as exc_info:
-            await chat(request)
+            await chat(request, mock_http_request)
 
         assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_sql_execution_error(self, mock_get_engine, sample_chat_request):
+    async def test_chat_endpoint_sql_execution_error(self, mock_get_engine, sample_chat_request, mock_http_request):
         """Test handling of SQL execution errors (returns 500)"""
         mock_engine = Mock()
         mock_engine.process_query = AsyncMock(
@@ -141,14 +148,14 @@ class TestChatEndpoint:
         request = ChatRequest(**sample_chat_request)
 
         with pytest.raises(HTTPException) as exc_info:
-            await chat(request)
+            await chat(request, mock_http_request)
 
         assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
         assert 'details' in exc_info.value.detail or 'error' in exc_info.value.detail
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
-    async def test_chat_endpoint_unexpected_error(self, mock_get_engine, sample_chat_request):
+    async def test_chat_endpoint_unexpected_error(self, mock_get_engine, sample_chat_request, mock_http_request):
         """Test handling of unexpected errors (returns 500)"""
         mock_engine = Mock()
         mock_engine.process_query = AsyncMock(
@@ -160,16 +167,39 @@ class TestChatEndpoint:
         request = ChatRequest(**sample_chat_request)
 
         with pytest.raises(HTTPException) as exc_info:
-            await chat(request)
+            await chat(request, mock_http_request)
+
+        assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_unmapped_cr360_error(self, mock_get_engine, sample_chat_request, mock_http_request):
+        """Test that unmapped CR360 errors (e.g. DatabaseError) return the InternalError body"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(
+            side_effect=DatabaseError("Failed to connect to PostgreSQL")
+        )
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(**sample_chat_request)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await chat(request, mock_http_request)
 
         assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        detail = exc_info.value.detail
+        assert detail['error'] == "An unexpected error occurred. Please try again."
+        assert detail['error_type'] == "InternalError"
+        assert detail['details'] == {"error": "Failed to connect to PostgreSQL"}
 
     @pytest.mark.asyncio
     @patch('app.api.routes.chat.get_text_to_sql_engine')
     async def test_chat_endpoint_with_conversation_history(
         self,
         mock_get_engine,
-        sample_conversation_history
+        sample_conversation_history,
+        mock_http_request
     ):
         """Test chat with conversation history"""
         mock_engine = Mock()
@@ -188,11 +218,404 @@ class TestChatEndpoint:
             conversation_history=[Message(**msg) for msg in sample_conversation_history]
         )
 
-        response = await chat(request)
+        response = parse_response(await chat(request, mock_http_request))
 
         assert response['success'] is True
-        # Verify engine was called with conversation history
+        # Verify engine was called with single-key {role: content} turns
+        mock_engine.process_query.assert_called_once()
+        history = mock_engine.process_query.call_args.kwargs['conversation_history']
+        assert history == [
+            {msg['role']: msg['content']} for msg in sample_conversation_history
+        ]
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_drops_unknown_roles(self, mock_get_engine, mock_http_request):
+        """Test that messages with unsupported roles are not forwarded"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest, Message
+        request = ChatRequest(
+            query="Test query",
+            conversation_history=[
+                Message(role="system", content="ignored"),
+                Message(role="user", content="What is total exposure?")
+            ]
+        )
+
+        await chat(request, mock_http_request)
+
+        history = mock_engine.process_query.call_args.kwargs['conversation_history']
+        assert history == [{'user': 'What is total exposure?'}]
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_uses_app_state_engine(self, mock_get_engine, mock_http_request):
+        """Test that the engine built in the lifespan is preferred over the accessor"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_http_request.app.state.engine = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        response = parse_response(await chat(request, mock_http_request))
+
+        assert response['success'] is True
+        mock_engine.process_query.assert_called_once()
+        mock_get_engine.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.query_cache.get', new_callable=AsyncMock)
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_cache_hit(self, mock_get_engine, mock_cache_get, mock_http_request):
+        """Test that a cached result skips the engine entirely"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock()
+        mock_get_engine.return_value = mock_engine
+        mock_cache_get.return_value = {
+            'sql': 'SELECT 1',
+            'explanation': 'Cached',
+            'results': [{'total': 1}],
+            'metrics_used': [],
+            'visualization_hint': 'table',
+            'row_count': 1
+        }
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        response = parse_response(await chat(request, mock_http_request))
+
+        assert response['success'] is True
+        assert response['result']['explanation'] == 'Cached'
+        mock_engine.process_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.query_cache.delete', new_callable=AsyncMock)
+    @patch('app.api.routes.chat.query_cache.get', new_callable=AsyncMock)
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_invalid_cache_entry_is_a_miss(
+        self,
+        mock_get_engine,
+        mock_cache_get,
+        mock_cache_delete,
+        mock_http_request
+    ):
+        """Test that a cached entry that no longer validates is dropped and recomputed"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Fresh',
+            'results': [],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+        mock_cache_get.return_value = {'sql': 'SELECT 1', 'legacy_field': True}
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        response = parse_response(await chat(request, mock_http_request))
+
+        assert response['result']['explanation'] == 'Fresh'
+        mock_engine.process_query.assert_awaited_once()
+        mock_cache_delete.assert_awaited_once_with(mock_cache_get.call_args.args[0])
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.query_cache.set', new_callable=AsyncMock)
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_caches_result(self, mock_get_engine, mock_cache_set, mock_http_request):
+        """Test that successful results are written to the cache"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        await chat(request, mock_http_request)
+
+        mock_cache_set.assert_awaited_once()
+        assert mock_cache_set.call_args.args[1]['sql'] == 'SELECT 1'
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_streams_ndjson_on_request(self, mock_get_engine, mock_http_request):
+        """Test that results are streamed as NDJSON when the client accepts it"""
+        import json
+        from fastapi.responses import StreamingResponse
+        from starlette.datastructures import Headers
+
+        rows = [{'id': 1}, {'id': 2}, {'id': 3}]
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT id FROM t',
+            'explanation': 'Test',
+            'results': rows,
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+        mock_http_request.headers = Headers({'accept': 'application/x-ndjson'})
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        response = await chat(request, mock_http_request)
+
+        assert isinstance(response, StreamingResponse)
+        assert response.media_type == "application/x-ndjson"
+
+        lines = [json.loads(chunk) async for chunk in response.body_iterator]
+        assert lines[0]['success'] is True
+        assert lines[0]['result']['row_count'] == 3
+        assert lines[0]['result']['results'] == []
+        assert lines[1:] == rows
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_large_results_stay_json_by_default(self, mock_get_engine, mock_http_request):
+        """Test that large result sets are one JSON body unless NDJSON is requested"""
+        rows = [{'id': i} for i in range(6000)]
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT id FROM t',
+            'explanation': 'Test',
+            'results': rows,
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        response = parse_response(await chat(request, mock_http_request))
+
+        assert response['result']['row_count'] == 6000
+        assert response['result']['results'] == rows
+        assert response['result']['truncated'] is False
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_flags_capped_results(self, mock_get_engine, mock_http_request):
+        """Test that the engine's truncated flag reaches the response"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT id FROM t',
+            'explanation': 'Test',
+            'results': [{'id': 1}, {'id': 2}],
+            'metrics_used': [],
+            'visualization_hint': 'table',
+            'truncated': True
+        })
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        response = parse_response(await chat(request, mock_http_request))
+
+        assert response['result']['row_count'] == 2
+        assert response['result']['truncated'] is True
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_plan_cache_hit(self, mock_get_engine, mock_http_request):
+        """Test that a repeated query re-executes the cached plan without the LLM"""
+        mock_engine = Mock()
+        mock_engine.context_loader.schema_version = 1
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [{'value': 1}],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_engine.execute_plan = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [{'value': 2}],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(query="Test query")
+
+        first = parse_response(await chat(request, mock_http_request))
+        second = parse_response(await chat(request, mock_http_request))
+
         mock_engine.process_query.assert_called_once()
+        mock_engine.execute_plan.assert_awaited_once_with({
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'metrics_used': []
+        })
+        assert first['result']['results'] == [{'value': 1}]
+        assert second['result']['results'] == [{'value': 2}]
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_gemini_client')
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_with_clarifications(
+        self,
+        mock_get_engine,
+        mock_get_llm,
+        mock_http_request
+    ):
+        """Test that clarifications augment the query and skip the ambiguity check"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+
+        mock_llm_client = Mock()
+        mock_llm_client.augment_query_with_clarifications.return_value = "Augmented query"
+        mock_get_llm.return_value = mock_llm_client
+
+        from app.api.schemas import ChatRequest, Clarification
+        request = ChatRequest(
+            query="What is the charge-off rate?",
+            clarifications=[
+                Clarification(question_id="charge_off_type", selected_option="Net charge-off")
+            ]
+        )
+
+        response = parse_response(await chat(request, mock_http_request))
+
+        assert response['query'] == "What is the charge-off rate?"
+        mock_llm_client.augment_query_with_clarifications.assert_called_once_with(
+            "What is the charge-off rate?",
+            [{'question_id': 'charge_off_type', 'selected_option': 'Net charge-off'}]
+        )
+        call_kwargs = mock_engine.process_query.call_args.kwargs
+        assert call_kwargs['natural_language_query'] == "Augmented query"
+        assert call_kwargs['check_ambiguity'] is False
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.get_gemini_client')
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_uses_app_state_llm(
+        self,
+        mock_get_engine,
+        mock_get_llm,
+        mock_http_request
+    ):
+        """Test that the Gemini client built in the lifespan is preferred over the accessor"""
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(return_value={
+            'sql': 'SELECT 1',
+            'explanation': 'Test',
+            'results': [],
+            'metrics_used': [],
+            'visualization_hint': 'table'
+        })
+        mock_get_engine.return_value = mock_engine
+
+        mock_llm_client = Mock()
+        mock_llm_client.augment_query_with_clarifications.return_value = "Augmented query"
+        mock_http_request.app.state.llm = mock_llm_client
+
+        from app.api.schemas import ChatRequest, Clarification
+        request = ChatRequest(
+            query="What is the charge-off rate?",
+            clarifications=[
+                Clarification(question_id="charge_off_type", selected_option="Net charge-off")
+            ]
+        )
+
+        await chat(request, mock_http_request)
+
+        mock_llm_client.augment_query_with_clarifications.assert_called_once()
+        mock_get_llm.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.chat.settings')
+    @patch('app.api.routes.chat.get_text_to_sql_engine')
+    async def test_chat_endpoint_llm_timeout(
+        self,
+        mock_get_engine,
+        mock_settings,
+        sample_chat_request,
+        mock_http_request
+    ):
+        """Test that a slow engine call surfaces as 504 Gateway Timeout"""
+        import asyncio
+
+        mock_settings.LLM_REQUEST_TIMEOUT = 0.01
+
+        async def slow_process_query(**kwargs):
+            await asyncio.sleep(10)
+
+        mock_engine = Mock()
+        mock_engine.process_query = AsyncMock(side_effect=slow_process_query)
+        mock_get_engine.return_value = mock_engine
+
+        from app.api.schemas import ChatRequest
+        request = ChatRequest(**sample_chat_request)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await chat(request, mock_http_request)
+
+        assert exc_info.value.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert exc_info.value.detail['error_type'] == 'Timeout'
+
+
+class TestErrorDispatch:
+    """Test exception -> HTTP error mapping"""
+
+    def test_mapped_exception(self):
+        """Test that a mapped exception resolves to its entry"""
+        event, status_code, message = _lookup_error(SQLValidationError("bad"))
+
+        assert event == 'sql_error'
+        assert status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+        assert message is None
+
+    def test_subclass_uses_parent_entry(self):
+        """Test that subclasses of a mapped exception resolve via the MRO"""
+        class CustomExecutionError(SQLExecutionError):
+            pass
+
+        event, _, _ = _lookup_error(CustomExecutionError("boom"))
+
+        assert event == 'sql_execution_error'
+
+    def test_unmapped_exception(self):
+        """Test that unmapped exceptions fall back to unexpected_error"""
+        event, status_code, _ = _lookup_error(ValueError("oops"))
+
+        assert event == 'unexpected_error'
+        assert status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
 class TestRouterConfiguration:
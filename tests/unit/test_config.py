@@ -180,6 +180,35 @@ class TestSettingsEdgeCases:
         assert settings.APP_NAME == "CorrectName"
 
 
+class TestSettingsImmutability:
+    """Test frozen settings and module-level constants"""
+
+    def test_settings_are_frozen(self, test_env_vars):
+        """Test that settings cannot be mutated after load"""
+        settings = Settings()
+
+        with pytest.raises(ValidationError):
+            settings.APP_NAME = "Changed"
+
+    def test_module_constants_match_settings(self):
+        """Test that hoisted constants mirror the global settings"""
+        from app import config
+
+        assert config.APP_NAME == config.settings.APP_NAME
+        assert config.APP_VERSION == config.settings.APP_VERSION
+        assert config.GOOGLE_API_KEY == config.settings.GOOGLE_API_KEY
+        assert config.LOG_LEVEL == config.settings.LOG_LEVEL
+        assert config.CORS_ORIGINS == config.split_origins(config.settings.CORS_ORIGINS)
+
+    def test_split_origins_strips_blanks(self):
+        """Test that CORS origins are trimmed and empty entries dropped"""
+        from app.config import split_origins
+
+        assert split_origins("http://a.test, http://b.test ,,") == (
+            "http://a.test",
+            "http://b.test",
+        )
+
 class TestSettingsMultipleInstances:
     """Test behavior with multiple Settings instances"""
 
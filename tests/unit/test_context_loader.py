@@ -9,10 +9,43 @@ import yaml
 import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch, mock_open
-from app.llm.context_loader import ContextLoader, get_context_loader
+from app.llm.context_loader import ContextLoader, MetricView, get_context_loader
 from app.utils.exceptions import ContextLoadError
 
 
+class TestMetricView:
+    """Test the read-only merged metric view"""
+
+    def test_behaves_like_merged_dict(self):
+        """Test that the view matches {**definition, 'name', 'category'}"""
+        definition = {'description': 'Total balance', 'formula': 'SUM(balance)'}
+        view = MetricView('total_exposure', 'exposure', definition)
+
+        assert view['name'] == 'total_exposure'
+        assert view['category'] == 'exposure'
+        assert view.get('formula') == 'SUM(balance)'
+        assert view.get('synonyms', []) == []
+        assert dict(view) == view.as_dict() == {
+            **definition, 'name': 'total_exposure', 'category': 'exposure'
+        }
+        assert len(view) == 4
+
+    def test_overlay_keys_take_precedence(self):
+        """Test that name/category override same-named definition keys"""
+        view = MetricView('total_exposure', 'exposure', {'name': 'Total Exposure'})
+
+        assert view['name'] == 'total_exposure'
+        assert len(view) == 2
+        assert sorted(view) == ['category', 'name']
+
+    def test_does_not_copy_definition(self):
+        """Test that the view shares the underlying definition"""
+        definition = {'description': 'Total balance'}
+        view = MetricView('total_exposure', 'exposure', definition)
+
+        assert view.definition is definition
+
+
 class TestContextLoaderInitialization:
     """Test ContextLoader initialization"""
 
@@ -72,6 +105,38 @@ class TestContextLoaderLoad:
         assert 'dimensions' in context
         assert loader._loaded is True
 
+    def test_load_increments_schema_version(self, tmp_path):
+        """Test that every successful (re)load bumps the schema version"""
+        yaml_file = tmp_path / "test_model.yaml"
+        with open(yaml_file, 'w') as f:
+            yaml.dump({'metrics': {}}, f)
+
+        loader = ContextLoader(context_file_path=str(yaml_file))
+        assert loader.schema_version == 0
+
+        loader.load()
+        assert loader.schema_version == 1
+
+        loader.reload()
+        assert loader.schema_version == 2
+
+    def test_load_large_yaml_via_mmap(self, tmp_path, monkeypatch):
+        """Test that files above the threshold are parsed from a memory map"""
+        import mmap
+        import app.llm.context_loader as cl_module
+        monkeypatch.setattr(cl_module, '_MMAP_THRESHOLD_BYTES', 1)
+
+        yaml_file = tmp_path / "large.yaml"
+        with open(yaml_file, 'w') as f:
+            yaml.dump({'metrics': {'exposure': {'total_exposure': {'description': 'Total'}}}}, f)
+
+        loader = ContextLoader(context_file_path=str(yaml_file))
+        with patch('app.llm.context_loader.mmap.mmap', wraps=mmap.mmap) as mock_mmap:
+            context = loader.load()
+
+        mock_mmap.assert_called_once()
+        assert context['metrics']['exposure']['total_exposure']['description'] == 'Total'
+
     def test_load_yaml_file_not_found(self):
         """Test that ContextLoadError is raised if file doesn't exist"""
         loader = ContextLoader(context_file_path="nonexistent/file.yaml")
@@ -365,6 +430,37 @@ class TestMetricSearch:
 
         assert results == []
 
+    def test_match_metrics_in_text(self, search_context_loader):
+        """Test matching known metric terms inside free text"""
+        results = search_context_loader.match_metrics_in_text(
+            "Show me the OVERDUE balance by region"
+        )
+
+        assert sorted(m['name'] for m in results) == ['past_due_exposure', 'total_exposure']
+
+    def test_match_metrics_in_text_no_matches(self, search_context_loader):
+        """Test that text without known terms matches nothing"""
+        assert search_context_loader.match_metrics_in_text("hello world") == []
+
+    def test_lookups_ignore_non_dict_entries(self, tmp_path):
+        """Test that scalar fields in flat metric definitions are not indexed"""
+        yaml_content = {
+            'metrics': {
+                'total_exposure': {
+                    'description': 'Total outstanding balance',
+                    'formula': 'SUM(balance)'
+                }
+            }
+        }
+        yaml_file = tmp_path / "flat.yaml"
+        with open(yaml_file, 'w') as f:
+            yaml.dump(yaml_content, f)
+
+        loader = ContextLoader(context_file_path=str(yaml_file))
+
+        assert loader.get_metric_by_name('description') is None
+        assert loader.search_metrics_by_synonym('balance') == []
+
 
 class TestContextFormatting:
     """Test context formatting for LLM"""
@@ -406,6 +502,41 @@ class TestContextFormatting:
             Path(temp_path).unlink()
 
 
+class TestRenderedContextCache:
+    """Test memoization of rendered prompt strings"""
+
+    def test_context_for_llm_rendered_once(self, tmp_path):
+        """Test that the YAML dump is reused until reload"""
+        yaml_file = tmp_path / "render.yaml"
+        with open(yaml_file, 'w') as f:
+            yaml.dump({'metrics': {'exposure': {}}}, f)
+
+        loader = ContextLoader(context_file_path=str(yaml_file))
+        first = loader.get_context_for_llm()
+
+        with patch('app.llm.context_loader.yaml.dump') as mock_dump:
+            second = loader.get_context_for_llm()
+
+        mock_dump.assert_not_called()
+        assert second is first
+
+    def test_reload_rerenders(self, tmp_path):
+        """Test that reload discards the rendered strings"""
+        yaml_file = tmp_path / "render.yaml"
+        with open(yaml_file, 'w') as f:
+            yaml.dump({'metrics': {'exposure': {}}}, f)
+
+        loader = ContextLoader(context_file_path=str(yaml_file))
+        assert 'delinquency' not in loader.get_compact_context()
+
+        with open(yaml_file, 'w') as f:
+            yaml.dump({'metrics': {'exposure': {}, 'delinquency': {}}}, f)
+        loader.reload()
+
+        assert 'delinquency' in loader.get_compact_context()
+        assert 'delinquency' in loader.get_context_for_llm()
+
+
 class TestLazyLoading:
     """Test lazy loading behavior"""
 
@@ -493,6 +624,73 @@ class TestReload:
         assert loader._loaded is True
 
 
+class TestYamlSidecarCache:
+    """Test the pickled sidecar cache for the YAML semantic model"""
+
+    def _write_model(self, yaml_file, content):
+        with open(yaml_file, 'w') as f:
+            yaml.dump(content, f)
+
+    def test_load_writes_sidecar(self, tmp_path):
+        """Test that a cold load writes model.yaml.pkl next to the YAML"""
+        yaml_file = tmp_path / "model.yaml"
+        self._write_model(yaml_file, {'metrics': {'exposure': {}}})
+
+        ContextLoader(context_file_path=str(yaml_file)).load()
+
+        assert (tmp_path / "model.yaml.pkl").exists()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["model.yaml", "model.yaml.pkl"]
+
+    def test_warm_load_skips_yaml_parse(self, tmp_path):
+        """Test that a fresh sidecar is used instead of parsing YAML"""
+        yaml_file = tmp_path / "model.yaml"
+        self._write_model(yaml_file, {'metrics': {'exposure': {}}})
+        ContextLoader(context_file_path=str(yaml_file)).load()
+
+        with patch('app.llm.context_loader.yaml.load') as mock_yaml_load:
+            context = ContextLoader(context_file_path=str(yaml_file)).load()
+
+        mock_yaml_load.assert_not_called()
+        assert 'exposure' in context['metrics']
+
+    def test_stale_sidecar_is_ignored(self, tmp_path):
+        """Test that editing the YAML invalidates the sidecar"""
+        yaml_file = tmp_path / "model.yaml"
+        self._write_model(yaml_file, {'metrics': {'exposure': {}}})
+        ContextLoader(context_file_path=str(yaml_file)).load()
+
+        self._write_model(yaml_file, {'metrics': {'exposure': {}, 'delinquency': {}}})
+        context = ContextLoader(context_file_path=str(yaml_file)).load()
+
+        assert 'delinquency' in context['metrics']
+
+    def test_cache_can_be_disabled(self, tmp_path, monkeypatch):
+        """Test that DISABLE_YAML_CACHE bypasses the sidecar"""
+        import app.llm.context_loader as cl_module
+        monkeypatch.setattr(
+            cl_module, 'settings',
+            cl_module.settings.model_copy(update={'DISABLE_YAML_CACHE': True})
+        )
+        yaml_file = tmp_path / "model.yaml"
+        self._write_model(yaml_file, {'metrics': {}})
+
+        ContextLoader(context_file_path=str(yaml_file)).load()
+
+        assert not (tmp_path / "model.yaml.pkl").exists()
+
+    def test_reload_discards_sidecar(self, tmp_path):
+        """Test that reload re-parses the YAML rather than trusting the sidecar"""
+        yaml_file = tmp_path / "model.yaml"
+        self._write_model(yaml_file, {'metrics': {}})
+        loader = ContextLoader(context_file_path=str(yaml_file))
+        loader.load()
+
+        with patch('app.llm.context_loader.yaml.load', return_value={'metrics': {}}) as mock_yaml_load:
+            loader.reload()
+
+        mock_yaml_load.assert_called_once()
+
+
 class TestSingletonPattern:
     """Test get_context_loader singleton pattern"""
 
@@ -513,7 +711,7 @@ class TestSingletonPattern:
         """Test that singleton preserves state across calls"""
         # Reset the global singleton
         import app.llm.context_loader as cl_module
-        cl_module._context_loader = None
+        cl_module.get_context_loader.cache_clear()
 
         loader1 = get_context_loader()
         loader1.context = {'test': 'data'}
@@ -522,4 +720,4 @@ class TestSingletonPattern:
         assert loader2.context == {'test': 'data'}
 
         # Clean up
-        cl_module._context_loader = None
+        cl_module.get_context_loader.cache_clear()
@@ -0,0 +1,75 @@
+"""
+Unit Tests for Embedding Cache (app/llm/embedding_cache.py)
+
+Tests LRU reuse, eviction and failure handling
+"""
+
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+import app.llm.embedding_cache as ec_module
+from app.llm.embedding_cache import embed_query_cached, clear_embedding_cache, EMBEDDING_CACHE
+from app.utils.exceptions import LLMError
+
+
+def _make_client():
+    """Build a client whose embed returns a vector derived from the text"""
+    client = Mock()
+    client.embed = AsyncMock(side_effect=lambda text: [float(len(text))])
+    return client
+
+
+class TestEmbedQueryCached:
+    """Test embed_query_cached function"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_text_embedded_once(self):
+        """Test that the same text only reaches the client once"""
+        client = _make_client()
+
+        first = await embed_query_cached("total exposure", client)
+        second = await embed_query_cached("total exposure", client)
+
+        assert first == second == [14.0]
+        client.embed.assert_awaited_once_with("total exposure")
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, monkeypatch):
+        """Test that the oldest unused entry is evicted past the size bound"""
+        monkeypatch.setattr(ec_module, "EMBEDDING_CACHE_MAXSIZE", 2)
+        client = _make_client()
+
+        await embed_query_cached("a", client)
+        await embed_query_cached("bb", client)
+        await embed_query_cached("a", client)  # refresh "a"
+        await embed_query_cached("ccc", client)  # evicts "bb"
+        await embed_query_cached("bb", client)
+
+        assert len(EMBEDDING_CACHE) == 2
+        assert [c.args[0] for c in client.embed.await_args_list] == ["a", "bb", "ccc", "bb"]
+
+    @pytest.mark.asyncio
+    async def test_failures_not_cached(self):
+        """Test that a failed embed is retried on the next call"""
+        client = Mock()
+        client.embed = AsyncMock(side_effect=[LLMError("quota"), [0.5]])
+
+        with pytest.raises(LLMError):
+            await embed_query_cached("total exposure", client)
+        assert await embed_query_cached("total exposure", client) == [0.5]
+
+    @pytest.mark.asyncio
+    @patch('app.llm.embedding_cache.get_gemini_client')
+    async def test_defaults_to_shared_client(self, mock_get_llm):
+        """Test that the shared Gemini client is used when none is given"""
+        mock_get_llm.return_value = _make_client()
+
+        assert await embed_query_cached("abc") == [3.0]
+
+    @pytest.mark.asyncio
+    async def test_clear(self):
+        """Test that clearing drops every entry"""
+        await embed_query_cached("abc", _make_client())
+
+        clear_embedding_cache()
+
+        assert len(EMBEDDING_CACHE) == 0
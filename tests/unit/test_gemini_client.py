@@ -175,6 +175,48 @@ SELECT * FROM table
         assert explanation == ""
         assert metrics == []
 
+    def test_parse_sql_response_sections_without_code_block(self):
+        """Test that explanation and metrics are parsed even without SQL"""
+        response = """Explanation: Nothing to query
+
+Metrics used: total_exposure"""
+
+        client = GeminiClient(api_key="test")
+        sql, explanation, metrics = client._parse_sql_response(response)
+
+        assert sql == ""
+        assert explanation == "Nothing to query"
+        assert metrics == ["total_exposure"]
+
+
+    def test_parse_sql_response_metrics_before_explanation(self):
+        """Test that sections are found regardless of their order"""
+        response = """```sql
+SELECT 1
+```
+
+Metrics used: total_exposure, delinquency_rate
+
+Explanation: Returns one"""
+
+        client = GeminiClient(api_key="test")
+        sql, explanation, metrics = client._parse_sql_response(response)
+
+        assert sql == "SELECT 1"
+        assert explanation == "Returns one"
+        assert metrics == ["total_exposure", "delinquency_rate"]
+
+    def test_parse_sql_response_unterminated_fence(self):
+        """Test that a truncated reply keeps the SQL after an unclosed fence"""
+        response = """```sql
+SELECT SUM(account_balance_eop) FROM account_level_monthly"""
+
+        client = GeminiClient(api_key="test")
+        sql, explanation, metrics = client._parse_sql_response(response)
+
+        assert sql == "SELECT SUM(account_balance_eop) FROM account_level_monthly"
+        assert explanation == ""
+        assert metrics == []
 
 class TestGenerate:
     """Test generate method"""
@@ -198,6 +240,26 @@ class TestGenerate:
         assert result == "Generated response text"
         mock_model.generate_content.assert_called_once_with("Test prompt")
 
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_generate_prefers_native_async(self, mock_genai):
+        """Test that generate_content_async is awaited when the model provides it"""
+        mock_response = Mock()
+        mock_response.text = "Async response"
+
+        mock_model = Mock()
+        mock_model.generate_content_async = AsyncMock(return_value=mock_response)
+        mock_model.generate_content = Mock()
+
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client = GeminiClient(api_key="test")
+        result = await client.generate(prompt="Test prompt")
+
+        assert result == "Async response"
+        mock_model.generate_content_async.assert_awaited_once_with("Test prompt")
+        mock_model.generate_content.assert_not_called()
+
     @pytest.mark.asyncio
     @patch('app.llm.gemini_client.genai')
     async def test_generate_with_system_instruction(self, mock_genai):
@@ -277,6 +339,62 @@ class TestGenerate:
         assert result == "Response"
 
 
+class TestWarmup:
+    """Test warmup method"""
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_warmup_counts_tokens(self, mock_genai):
+        """Test that warmup issues a count_tokens call"""
+        mock_model = Mock()
+        mock_model.count_tokens_async = AsyncMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client = GeminiClient(api_key="test")
+        await client.warmup()
+
+        mock_model.count_tokens_async.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_warmup_tolerates_failure(self, mock_genai):
+        """Test that warmup does not raise when the API is unreachable"""
+        mock_model = Mock()
+        mock_model.count_tokens_async = AsyncMock(side_effect=Exception("unavailable"))
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client = GeminiClient(api_key="test")
+        await client.warmup()
+
+
+class TestEmbed:
+    """Test embed method"""
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_embed_returns_vector(self, mock_genai):
+        """Test that embed returns the embedding values"""
+        mock_genai.embed_content = Mock(return_value={'embedding': [0.1, 0.2]})
+
+        client = GeminiClient(api_key="test")
+        result = await client.embed("total exposure")
+
+        assert result == [0.1, 0.2]
+        kwargs = mock_genai.embed_content.call_args.kwargs
+        assert kwargs['content'] == "total exposure"
+        assert kwargs['task_type'] == "retrieval_query"
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_embed_failure(self, mock_genai):
+        """Test that embedding failures raise LLMError"""
+        mock_genai.embed_content = Mock(side_effect=Exception("quota exceeded"))
+
+        client = GeminiClient(api_key="test")
+        with pytest.raises(LLMError):
+            await client.embed("total exposure")
+
+
 class TestGenerateWithContext:
     """Test generate_with_context method"""
 
@@ -367,6 +485,33 @@ class TestGenerateSQL:
         # Verify the model was called (conversation history was included)
         mock_model.generate_content.assert_called_once()
 
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_generate_sql_with_single_role_turns(self, mock_genai, sample_sql_response):
+        """Test that single-key {role: content} turns are rendered into the prompt"""
+        mock_response = Mock()
+        mock_response.text = sample_sql_response
+
+        mock_model = Mock()
+        mock_model.generate_content = Mock(return_value=mock_response)
+
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        conversation_history = [
+            {'user': 'What is total exposure?'},
+            {'assistant': 'Total is $2.8B'}
+        ]
+
+        client = GeminiClient(api_key="test")
+        await client.generate_sql(
+            natural_language_query="What about regions?",
+            semantic_context="YAML context",
+            conversation_history=conversation_history
+        )
+
+        prompt = mock_model.generate_content.call_args.args[0]
+        assert "User: What is total exposure?\nAssistant: Total is $2.8B" in prompt
+
     @pytest.mark.asyncio
     @patch('app.llm.gemini_client.genai')
     async def test_generate_sql_parsing_error(self, mock_genai):
@@ -410,6 +555,72 @@ class TestGenerateSQL:
         assert "Failed to generate SQL" in str(exc_info.value)
 
 
+class TestAnalyzeAndGenerate:
+    """Test analyze_and_generate method"""
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_analyze_clear_query(self, mock_genai):
+        """Test that a fenced JSON answer yields SQL and no ambiguity"""
+        mock_response = Mock()
+        mock_response.text = """```json
+{"is_ambiguous": false, "reasons": [], "suggestions": [], "questions": [],
+ "sql": " SELECT 1 ", "explanation": "Total", "metrics_used": ["total_exposure"]}
+```"""
+        mock_model = Mock()
+        mock_model.generate_content = Mock(return_value=mock_response)
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client = GeminiClient(api_key="test")
+        result = await client.analyze_and_generate("Total exposure?", "context")
+
+        assert result == {
+            'is_ambiguous': False,
+            'reasons': [],
+            'suggestions': [],
+            'questions': [],
+            'sql': 'SELECT 1',
+            'explanation': 'Total',
+            'metrics_used': ['total_exposure']
+        }
+        assert mock_model.generate_content.call_count == 1
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_analyze_ambiguous_query(self, mock_genai):
+        """Test that an ambiguous answer carries validated questions"""
+        mock_response = Mock()
+        mock_response.text = """{"is_ambiguous": true, "reasons": ["Unclear metric"],
+ "suggestions": ["Net charge-off"], "sql": "",
+ "questions": [{"question_id": "charge_off_type", "question_text": "Which?",
+                "options": ["Gross charge-off", "Net charge-off"]}]}"""
+        mock_model = Mock()
+        mock_model.generate_content = Mock(return_value=mock_response)
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client = GeminiClient(api_key="test")
+        result = await client.analyze_and_generate("Charge-off rate?", "context")
+
+        assert result['is_ambiguous'] is True
+        assert result['sql'] == ''
+        assert result['questions'][0]['question_id'] == 'charge_off_type'
+        assert result['metrics_used'] == []
+
+    @pytest.mark.asyncio
+    @patch('app.llm.gemini_client.genai')
+    async def test_analyze_unparseable_response(self, mock_genai):
+        """Test that a non-JSON answer raises LLMError"""
+        mock_response = Mock()
+        mock_response.text = "Ambiguous: No"
+        mock_model = Mock()
+        mock_model.generate_content = Mock(return_value=mock_response)
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        client = GeminiClient(api_key="test")
+        with pytest.raises(LLMError):
+            await client.analyze_and_generate("Total exposure?", "context")
+
+
 class TestDetectAmbiguity:
     """Test detect_ambiguity method"""
 
@@ -483,6 +694,167 @@ class TestDetectAmbiguity:
         assert result['is_ambiguous'] is False  # Default when "Ambiguous: Yes" not found
 
 
+class TestResponseMemoization:
+    """Test memoized parsing and query augmentation"""
+
+    def test_parse_sql_response_is_memoized(self):
+        """Test that identical responses are parsed once"""
+        from app.llm.gemini_client import _parse_sql_text
+        response = "```sql\nSELECT 42\n```\n\nExplanation: memo\n\nMetrics used: m1"
+        client = GeminiClient(api_key="test")
+
+        first = client._parse_sql_response(response)
+        hits = _parse_sql_text.cache_info().hits
+        second = client._parse_sql_response(response)
+
+        assert first == second
+        assert _parse_sql_text.cache_info().hits == hits + 1
+
+    def test_parse_sql_response_returns_fresh_metrics_list(self):
+        """Test that callers can't mutate the cached metrics"""
+        response = "```sql\nSELECT 7\n```\n\nMetrics used: m1, m2"
+        client = GeminiClient(api_key="test")
+
+        _, _, metrics = client._parse_sql_response(response)
+        metrics.append("mutated")
+        _, _, metrics_again = client._parse_sql_response(response)
+
+        assert metrics_again == ["m1", "m2"]
+
+    def test_augment_query_with_clarifications(self):
+        """Test augmentation text and reuse of the cached result"""
+        client = GeminiClient(api_key="test")
+        clarifications = [
+            {"question_id": "time_period", "selected_option": "Q4 2024"}
+        ]
+
+        first = client.augment_query_with_clarifications("What is the NCO rate?", clarifications)
+        second = client.augment_query_with_clarifications("What is the NCO rate?", list(clarifications))
+
+        assert "For 'time_period': User selected 'Q4 2024'" in first
+        assert second is first
+        assert len(client._augment_cache) == 1
+
+    def test_augment_without_clarifications_returns_query(self):
+        """Test that an empty clarification list leaves the query untouched"""
+        client = GeminiClient(api_key="test")
+
+        assert client.augment_query_with_clarifications("Query", []) == "Query"
+        assert len(client._augment_cache) == 0
+
+
+class TestLazyImport:
+    """Test deferred import of google.generativeai"""
+
+    def test_import_genai_on_first_use(self, monkeypatch):
+        """Test that the SDK module is imported and remembered on demand"""
+        import app.llm.gemini_client as gc_module
+        monkeypatch.setattr(gc_module, 'genai', None)
+
+        module = gc_module._import_genai()
+
+        assert module.__name__ == 'google.generativeai'
+        assert gc_module.genai is module
+
+
+class TestModelCache:
+    """Test GenerativeModel reuse across generate calls"""
+
+    @patch('app.llm.gemini_client.genai')
+    def test_default_config_uses_init_model(self, mock_genai):
+        """Test that the default configuration reuses the model from __init__"""
+        client = GeminiClient(api_key="test", temperature=0.1, max_tokens=100)
+
+        model = client._get_model(None, {'temperature': 0.1, 'max_output_tokens': 100})
+
+        assert model is client.model
+        assert mock_genai.GenerativeModel.call_count == 1
+
+    @patch('app.llm.gemini_client.genai')
+    def test_system_instruction_model_is_cached(self, mock_genai):
+        """Test that a model per system instruction is built only once"""
+        mock_genai.GenerativeModel.side_effect = lambda **kwargs: Mock()
+        client = GeminiClient(api_key="test")
+        config = {'temperature': 0.1, 'max_output_tokens': 100}
+
+        model1 = client._get_model("You are an SQL expert", config)
+        model2 = client._get_model("You are an SQL expert", dict(config))
+
+        assert model1 is model2
+        assert mock_genai.GenerativeModel.call_count == 2  # __init__ + first lookup
+
+    @patch('app.llm.gemini_client.genai')
+    def test_cache_is_bounded(self, mock_genai):
+        """Test that the least recently used model is evicted"""
+        import app.llm.gemini_client as gc_module
+        mock_genai.GenerativeModel.side_effect = lambda **kwargs: Mock()
+        client = GeminiClient(api_key="test")
+        config = {'temperature': 0.1, 'max_output_tokens': 100}
+
+        for i in range(gc_module._MODEL_CACHE_MAXSIZE + 1):
+            client._get_model(f"instruction {i}", config)
+
+        assert len(client._model_cache) == gc_module._MODEL_CACHE_MAXSIZE
+        assert all("instruction 0" != key[0] for key in client._model_cache)
+
+
+class TestParseAmbiguityResponse:
+    """Test _parse_ambiguity_response method"""
+
+    def test_parse_all_sections(self):
+        """Test that reasons, suggestions and questions are sliced correctly"""
+        response = """Ambiguous: Yes
+Reasons:
+- Missing time period
+Suggestions:
+- Last month
+- Last quarter
+Questions:
+```json
+[{"question_id": "time_period", "question_text": "Which period?", "options": ["Last month", "Last quarter"]}]
+```"""
+
+        client = GeminiClient(api_key="test")
+        result = client._parse_ambiguity_response(response)
+
+        assert result['is_ambiguous'] is True
+        assert result['reasons'] == ["Missing time period"]
+        assert result['suggestions'] == ["Last month", "Last quarter"]
+        assert result['questions'][0]['question_id'] == "time_period"
+
+    def test_reasons_end_at_questions_without_suggestions(self):
+        """Test that reasons stop at Questions: when there are no suggestions"""
+        response = """Ambiguous: Yes
+Reasons:
+- Unclear metric
+Questions:
+not json"""
+
+        client = GeminiClient(api_key="test")
+        result = client._parse_ambiguity_response(response)
+
+        assert result['reasons'] == ["Unclear metric"]
+        assert result['suggestions'] == []
+        assert result['questions'] == []
+
+    def test_sections_out_of_order(self):
+        """Test that every section is found when Suggestions precede Reasons"""
+        response = """Ambiguous: Yes
+Questions:
+[{"question_id": "time_period", "question_text": "Which period?", "options": ["Last month", "Last quarter"]}]
+Suggestions:
+- Last month
+Reasons:
+- Missing time period"""
+
+        client = GeminiClient(api_key="test")
+        result = client._parse_ambiguity_response(response)
+
+        assert result['reasons'] == ["Missing time period"]
+        assert result['suggestions'] == ["Last month"]
+        assert result['questions'][0]['question_id'] == "time_period"
+
+
 class TestSingletonPattern:
     """Test get_gemini_client singleton pattern"""
 
@@ -490,20 +862,20 @@ class TestSingletonPattern:
         """Test that get_gemini_client returns a GeminiClient instance"""
         # Reset singleton
         import app.llm.gemini_client as gc_module
-        gc_module._gemini_client = None
+        gc_module.get_gemini_client.cache_clear()
 
         with patch('app.llm.gemini_client.genai'):
             client = get_gemini_client()
             assert isinstance(client, GeminiClient)
 
         # Clean up
-        gc_module._gemini_client = None
+        gc_module.get_gemini_client.cache_clear()
 
     def test_get_gemini_client_returns_same_instance(self):
         """Test that get_gemini_client returns the same instance (singleton)"""
         # Reset singleton
         import app.llm.gemini_client as gc_module
-        gc_module._gemini_client = None
+        gc_module.get_gemini_client.cache_clear()
 
         with patch('app.llm.gemini_client.genai'):
             client1 = get_gemini_client()
@@ -512,7 +884,7 @@ class TestSingletonPattern:
             assert client1 is client2
 
         # Clean up
-        gc_module._gemini_client = None
+        gc_module.get_gemini_client.cache_clear()
 
 
 class TestEdgeCases:
@@ -6,8 +6,9 @@ Tests health check endpoints with mocked dependencies
 
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
-from fastapi import status
-from app.api.routes.health import health_check, root, router
+from fastapi import HTTPException, status
+import app.api.routes.health as health_module
+from app.api.routes.health import health_check, pool_stats, root, router
 
 
 class TestHealthCheckEndpoint:
@@ -16,12 +17,13 @@ class TestHealthCheckEndpoint:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_check_all_healthy(
         self,
-        mock_settings,
         mock_get_context,
-        mock_get_db
+        mock_get_db,
+        mock_http_request
     ):
         """Test health check when all components are healthy"""
         # Mock database
@@ -34,11 +36,7 @@ class TestHealthCheckEndpoint:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        # Mock settings
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
-        response = await health_check()
+        response = await health_check(mock_http_request)
 
         assert response.status == "healthy"
         assert response.version == "1.0.0"
@@ -49,12 +47,13 @@ class TestHealthCheckEndpoint:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_check_database_unhealthy(
         self,
-        mock_settings,
         mock_get_context,
-        mock_get_db
+        mock_get_db,
+        mock_http_request
     ):
         """Test health check when database is unhealthy"""
         # Mock database failure
@@ -67,11 +66,7 @@ class TestHealthCheckEndpoint:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        # Mock settings
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
-        response = await health_check()
+        response = await health_check(mock_http_request)
 
         assert response.status == "unhealthy"
         assert response.components['database'] == 'unhealthy'
@@ -79,12 +74,13 @@ class TestHealthCheckEndpoint:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_check_context_loader_unhealthy(
         self,
-        mock_settings,
         mock_get_context,
-        mock_get_db
+        mock_get_db,
+        mock_http_request
     ):
         """Test health check when context loader is unhealthy"""
         # Mock database (healthy)
@@ -95,11 +91,7 @@ class TestHealthCheckEndpoint:
         # Mock context loader failure
         mock_get_context.side_effect = Exception("Failed to load context")
 
-        # Mock settings
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
-
-        response = await health_check()
+        response = await health_check(mock_http_request)
 
         assert response.status == "unhealthy"
         assert response.components['context_loader'] == 'unhealthy'
@@ -107,12 +99,13 @@ class TestHealthCheckEndpoint:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', None)
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
     async def test_health_check_llm_not_configured(
         self,
-        mock_settings,
         mock_get_context,
-        mock_get_db
+        mock_get_db,
+        mock_http_request
     ):
         """Test health check when LLM is not configured"""
         # Mock database (healthy)
@@ -125,11 +118,7 @@ class TestHealthCheckEndpoint:
         mock_context_loader._loaded = True
         mock_get_context.return_value = mock_context_loader
 
-        # Mock settings without API key
-        mock_settings.GOOGLE_API_KEY = None
-        mock_settings.APP_VERSION = "1.0.0"
-
-        response = await health_check()
+        response = await health_check(mock_http_request)
 
         assert response.status == "unhealthy"
         assert response.components['llm'] == 'not_configured'
@@ -137,14 +126,15 @@ class TestHealthCheckEndpoint:
     @pytest.mark.asyncio
     @patch('app.api.routes.health.get_database_client')
     @patch('app.api.routes.health.get_context_loader')
-    @patch('app.api.routes.health.settings')
-    async def test_health_check_context_loader_loads_if_not_loaded(
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
+    async def test_health_check_context_loader_not_loaded(
         self,
-        mock_settings,
         mock_get_context,
-        mock_get_db
+        mock_get_db,
+        mock_http_request
     ):
-        """Test that health check loads context if not already loaded"""
+        """Test that an unloaded context is reported without triggering a load"""
         # Mock database
         mock_db_client = Mock()
         mock_db_client.test_connection = AsyncMock(return_value=True)
@@ -156,27 +146,57 @@ class TestHealthCheckEndpoint:
         mock_context_loader.load = Mock()
         mock_get_context.return_value = mock_context_loader
 
-        # Mock settings
-        mock_settings.GOOGLE_API_KEY = "test_key"
-        mock_settings.APP_VERSION = "1.0.0"
+        response = await health_check(mock_http_request)
+
+        # Probes never load the YAML themselves
+        mock_context_loader.load.assert_not_called()
+        assert response.components['context_loader'] == 'unhealthy'
+        assert response.status == 'unhealthy'
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.health.DB_CHECK_TIMEOUT_SECONDS', 0.01)
+    @patch('app.api.routes.health.get_database_client')
+    @patch('app.api.routes.health.get_context_loader')
+    @patch('app.api.routes.health.GOOGLE_API_KEY', "test_key")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
+    async def test_health_check_database_timeout(
+        self,
+        mock_get_context,
+        mock_get_db,
+        mock_http_request
+    ):
+        """Test that a hung database is reported unhealthy instead of stalling"""
+        import asyncio
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        # Mock database that never answers
+        mock_db_client = Mock()
+        mock_db_client.test_connection = AsyncMock(side_effect=hang)
+        mock_get_db.return_value = mock_db_client
+
+        # Mock context loader (healthy)
+        mock_context_loader = Mock()
+        mock_context_loader._loaded = True
+        mock_get_context.return_value = mock_context_loader
 
-        response = await health_check()
+        response = await health_check(mock_http_request)
 
-        # Verify load was called
-        mock_context_loader.load.assert_called_once()
+        assert response.status == "unhealthy"
+        assert response.components['database'] == 'unhealthy'
         assert response.components['context_loader'] == 'healthy'
+        assert response.components['llm'] == 'configured'
 
 
 class TestRootEndpoint:
     """Test root endpoint"""
 
     @pytest.mark.asyncio
-    @patch('app.api.routes.health.settings')
-    async def test_root_endpoint(self, mock_settings):
+    @patch('app.api.routes.health.APP_NAME', "CR360")
+    @patch('app.api.routes.health.APP_VERSION', "1.0.0")
+    async def test_root_endpoint(self):
         """Test root endpoint returns correct response"""
-        mock_settings.APP_NAME = "CR360"
-        mock_settings.APP_VERSION = "1.0.0"
-
         response = await root()
 
         assert 'message' in response
@@ -195,6 +215,33 @@ class TestRootEndpoint:
         assert 'status' in response
 
 
+class TestPoolStatsEndpoint:
+    """Test pool_stats endpoint"""
+
+    @pytest.mark.asyncio
+    @patch('app.api.routes.health.get_pool_stats', return_value={'created': True, 'size': 10})
+    async def test_pool_stats_when_enabled(self, mock_stats, monkeypatch):
+        """Test that pool stats are reported when debug endpoints are enabled"""
+        monkeypatch.setattr(
+            health_module, "settings",
+            health_module.settings.model_copy(update={"ENABLE_DEBUG_ENDPOINTS": True})
+        )
+
+        assert await pool_stats() == {'created': True, 'size': 10}
+
+    @pytest.mark.asyncio
+    async def test_pool_stats_hidden_by_default(self, monkeypatch):
+        """Test that the endpoint 404s by default, even with DEBUG on"""
+        monkeypatch.setattr(
+            health_module, "settings", health_module.settings.model_copy(update={"DEBUG": True})
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool_stats()
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+
 class TestRouterConfiguration:
     """Test router configuration"""
 
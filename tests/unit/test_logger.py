@@ -6,8 +6,12 @@ Tests logger initialization and configuration
 
 import pytest
 import logging
+from decimal import Decimal
+import orjson
+import structlog
 from unittest.mock import patch, Mock
-from app.utils.logger import get_logger, configure_logging
+import app.utils.logger as logger_module
+from app.utils.logger import get_logger, configure_logging, is_enabled_for
 
 
 class TestGetLogger:
@@ -95,6 +99,22 @@ class TestConfigureLogging:
         assert 'context_class' in call_args
         assert 'logger_factory' in call_args
 
+    @patch('app.utils.logger.sys.stdout')
+    @patch('app.utils.logger.structlog.configure')
+    @patch('app.utils.logger.logging.basicConfig')
+    def test_configure_logging_renders_json_bytes(self, mock_basic_config, mock_structlog_configure, mock_stdout):
+        """Test that non-terminal output is rendered to bytes with orjson"""
+        mock_stdout.isatty.return_value = False
+        configure_logging(log_level="INFO")
+
+        call_args = mock_structlog_configure.call_args[1]
+        renderer = call_args['processors'][-1]
+        rendered = renderer(None, "info", {'event': "query_processed", 'amount': Decimal("1.5")})
+
+        assert isinstance(call_args['logger_factory'], structlog.BytesLoggerFactory)
+        assert isinstance(rendered, bytes)
+        assert orjson.loads(rendered) == {'event': "query_processed", 'amount': "Decimal('1.5')"}
+
     @patch('app.utils.logger.structlog.configure')
     @patch('app.utils.logger.logging.basicConfig')
     def test_configure_logging_case_insensitive(self, mock_basic_config, mock_structlog_configure):
@@ -107,3 +127,19 @@ class TestConfigureLogging:
         configure_logging(log_level="DeBuG")
         call_args = mock_basic_config.call_args[1]
         assert call_args['level'] == logging.DEBUG
+
+
+class TestIsEnabledFor:
+    """Test is_enabled_for function"""
+
+    @patch('app.utils.logger.structlog.configure')
+    @patch('app.utils.logger.logging.basicConfig')
+    def test_follows_configured_level(self, mock_basic_config, mock_structlog_configure, monkeypatch):
+        """Test that levels below the configured one are disabled"""
+        monkeypatch.setattr(logger_module, "_log_level", logger_module._log_level)
+
+        configure_logging(log_level="WARNING")
+
+        assert is_enabled_for(logging.INFO) is False
+        assert is_enabled_for(logging.WARNING) is True
+        assert is_enabled_for(logging.ERROR) is True
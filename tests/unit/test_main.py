@@ -5,9 +5,11 @@ Tests FastAPI app initialization, middleware, and router configuration
 """
 
 import pytest
+from contextlib import ExitStack
+from unittest.mock import Mock, AsyncMock, patch
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.main import app
+from app.main import app, lifespan
 
 
 class TestAppInitialization:
@@ -32,6 +34,11 @@ class TestAppInitialization:
         assert "Credit Risk" in app.description or "CR360" in app.description
 
 
+    def test_app_default_response_class(self):
+        """Test that responses are encoded with orjson by default"""
+        from fastapi.responses import ORJSONResponse
+        assert app.router.default_response_class is ORJSONResponse
+
 class TestCORSMiddleware:
     """Test CORS middleware configuration"""
 
@@ -112,6 +119,65 @@ class TestLifespan:
         """Test that app has lifespan configured"""
         assert app.router.lifespan_context is not None, "Lifespan not configured"
 
+    @staticmethod
+    def _patch_startup(stack, context_loader, get_db_pool):
+        """Patch everything the lifespan builds; returns the mock engine"""
+        engine = Mock()
+        engine.warmup = AsyncMock()
+        stack.enter_context(patch('app.llm.context_loader.get_context_loader', return_value=context_loader))
+        stack.enter_context(patch('app.database.pool.get_db_pool', get_db_pool))
+        stack.enter_context(patch('app.database.pool.close_db_pool', AsyncMock()))
+        stack.enter_context(patch('app.cache.query_cache.close_query_cache', AsyncMock()))
+        stack.enter_context(patch('app.database.client.get_database_client', return_value=Mock()))
+        stack.enter_context(patch('app.llm.gemini_client.get_gemini_client', return_value=Mock()))
+        stack.enter_context(patch('app.query.text_to_sql.get_text_to_sql_engine', return_value=engine))
+        return engine
+
+    @pytest.mark.asyncio
+    async def test_lifespan_preloads_context_and_pool(self):
+        """Test that startup loads the context and creates the pool"""
+        context_loader = Mock()
+        context_loader.get_metrics = Mock(return_value={'m': {}})
+        context_loader.get_dimensions = Mock(return_value={'d': {}})
+        get_db_pool = AsyncMock()
+
+        with ExitStack() as stack:
+            engine = self._patch_startup(stack, context_loader, get_db_pool)
+            test_app = FastAPI()
+            async with lifespan(test_app):
+                assert test_app.state.engine is engine
+
+        context_loader.load.assert_called_once()
+        get_db_pool.assert_awaited_once()
+        engine.warmup.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lifespan_tolerates_pool_failure(self):
+        """Test that a database outage does not abort startup"""
+        context_loader = Mock()
+        context_loader.get_metrics = Mock(return_value={})
+        context_loader.get_dimensions = Mock(return_value={})
+        get_db_pool = AsyncMock(side_effect=OSError("Connection refused"))
+
+        with ExitStack() as stack:
+            self._patch_startup(stack, context_loader, get_db_pool)
+            async with lifespan(FastAPI()):
+                pass
+
+        context_loader.load.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_lifespan_context_failure_is_fatal(self):
+        """Test that a semantic model load failure aborts startup"""
+        context_loader = Mock()
+        context_loader.load = Mock(side_effect=RuntimeError("bad yaml"))
+
+        with ExitStack() as stack:
+            self._patch_startup(stack, context_loader, AsyncMock())
+            with pytest.raises(RuntimeError, match="bad yaml"):
+                async with lifespan(FastAPI()):
+                    pass
+
 
 class TestAppMetadata:
     """Test application metadata"""
@@ -0,0 +1,75 @@
+"""
+Unit Tests for Plan Cache (app/query/plan_cache.py)
+
+Tests plan key construction, storage, and invalidation
+"""
+
+import pytest
+from app.query import plan_cache
+from app.query.plan_cache import PLAN_CACHE, make_plan_key, get_plan, store_plan, clear_plan_cache
+
+
+@pytest.fixture
+def engine_result():
+    """Result dict as returned by TextToSQLEngine.process_query"""
+    return {
+        'sql': 'SELECT SUM(balance) FROM table',
+        'explanation': 'Total balance',
+        'results': [{'total': 100}],
+        'metrics_used': ['total_exposure'],
+        'visualization_hint': 'bar'
+    }
+
+
+class TestMakePlanKey:
+    """Test make_plan_key function"""
+
+    def test_key_is_deterministic(self):
+        """Test that identical inputs produce the same key"""
+        assert make_plan_key("Show exposure", None, True, 1) == make_plan_key("Show exposure", None, True, 1)
+
+    def test_key_depends_on_schema_version(self):
+        """Test that reloading the semantic model changes the key"""
+        assert make_plan_key("Show exposure", None, True, 1) != make_plan_key("Show exposure", None, True, 2)
+
+    def test_key_depends_on_history(self):
+        """Test that conversation history changes the key"""
+        history = [{'user': 'Show exposure', 'assistant': 'Done'}]
+
+        assert make_plan_key("By product", None, True, 1) != make_plan_key("By product", history, True, 1)
+
+    def test_key_depends_on_ambiguity_flag(self):
+        """Test that the ambiguity flag changes the key"""
+        assert make_plan_key("Show exposure", None, True, 1) != make_plan_key("Show exposure", None, False, 1)
+
+
+class TestStoreAndGet:
+    """Test store_plan and get_plan functions"""
+
+    def test_get_miss(self):
+        """Test that unknown keys return None"""
+        assert get_plan("missing") is None
+
+    def test_store_keeps_only_plan_fields(self, engine_result):
+        """Test that results and visualization hints are not cached"""
+        store_plan("key", engine_result)
+
+        assert get_plan("key") == {
+            'sql': 'SELECT SUM(balance) FROM table',
+            'explanation': 'Total balance',
+            'metrics_used': ['total_exposure']
+        }
+
+    def test_clear_plan_cache(self, engine_result):
+        """Test that clearing drops all plans"""
+        store_plan("key", engine_result)
+
+        clear_plan_cache()
+
+        assert get_plan("key") is None
+        assert len(PLAN_CACHE) == 0
+
+    def test_cache_limits(self):
+        """Test that the cache is bounded and expiring"""
+        assert PLAN_CACHE.maxsize == plan_cache.PLAN_CACHE_MAXSIZE
+        assert PLAN_CACHE.ttl == plan_cache.PLAN_CACHE_TTL_SECONDS
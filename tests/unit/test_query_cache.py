@@ -0,0 +1,159 @@
+"""
+Unit Tests for Query Cache (app/cache/query_cache.py)
+
+Tests cache key construction and Redis get/set with a mocked client
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+import app.cache.query_cache as qc_module
+from app.cache import query_cache
+from app.config import settings
+
+
+@pytest.fixture
+def mock_redis(monkeypatch):
+    """Enable the cache with a mocked Redis client"""
+    monkeypatch.setattr(
+        qc_module, "settings", settings.model_copy(update={"REDIS_URL": "redis://localhost:6379/0"})
+    )
+    client = Mock()
+    client.get = AsyncMock(return_value=None)
+    client.set = AsyncMock()
+    client.delete = AsyncMock()
+    client.aclose = AsyncMock()
+    qc_module._redis_client = client
+    yield client
+
+
+class TestMakeCacheKey:
+    """Test make_cache_key function"""
+
+    def test_key_is_namespaced_sha256(self):
+        """Test that keys are prefixed SHA-256 hex digests"""
+        key = query_cache.make_cache_key("What is total exposure?", None, True)
+
+        assert key.startswith(qc_module.KEY_PREFIX)
+        assert len(key) == len(qc_module.KEY_PREFIX) + 64
+
+    def test_key_ignores_case_and_whitespace(self):
+        """Test that trivially different phrasings share a key"""
+        key1 = query_cache.make_cache_key("What is total exposure?", None, True)
+        key2 = query_cache.make_cache_key("  what is   TOTAL exposure ", None, True)
+
+        assert key1 == key2
+
+    def test_key_depends_on_history(self):
+        """Test that conversation history changes the key"""
+        history = [{'user': 'Show exposure', 'assistant': 'Done'}]
+
+        key1 = query_cache.make_cache_key("By product", None, True)
+        key2 = query_cache.make_cache_key("By product", history, True)
+
+        assert key1 != key2
+
+    def test_key_depends_on_ambiguity_flag(self):
+        """Test that the ambiguity flag changes the key"""
+        key1 = query_cache.make_cache_key("Show exposure", None, True)
+        key2 = query_cache.make_cache_key("Show exposure", None, False)
+
+        assert key1 != key2
+
+
+class TestCacheDisabled:
+    """Test behavior when REDIS_URL is not configured"""
+
+    def test_no_client_without_redis_url(self):
+        """Test that no client is created when caching is disabled"""
+        assert query_cache.get_redis_client() is None
+
+    @pytest.mark.asyncio
+    async def test_get_returns_none(self):
+        """Test that lookups miss when caching is disabled"""
+        assert await query_cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_set_is_noop(self):
+        """Test that stores are ignored when caching is disabled"""
+        await query_cache.set("key", {"sql": "SELECT 1"})
+
+
+class TestGetAndSet:
+    """Test get and set with a Redis client"""
+
+    @pytest.mark.asyncio
+    async def test_get_hit(self, mock_redis):
+        """Test that cached JSON is decoded"""
+        mock_redis.get.return_value = json.dumps({"sql": "SELECT 1"}).encode()
+
+        result = await query_cache.get("key")
+
+        assert result == {"sql": "SELECT 1"}
+        mock_redis.get.assert_awaited_once_with("key")
+
+    @pytest.mark.asyncio
+    async def test_get_miss(self, mock_redis):
+        """Test that a missing key returns None"""
+        assert await query_cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_get_error_returns_none(self, mock_redis):
+        """Test that Redis errors are treated as a miss"""
+        mock_redis.get.side_effect = ConnectionError("Redis down")
+
+        assert await query_cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_get_corrupt_value_returns_none(self, mock_redis):
+        """Test that a value that is not valid JSON is treated as a miss"""
+        mock_redis.get.return_value = b"not json"
+
+        assert await query_cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_set_with_ttl(self, mock_redis):
+        """Test that values are stored as JSON with an expiry"""
+        await query_cache.set("key", {"sql": "SELECT 1"}, ttl=60)
+
+        mock_redis.set.assert_awaited_once_with("key", b'{"sql":"SELECT 1"}', ex=60)
+
+    @pytest.mark.asyncio
+    async def test_set_error_is_swallowed(self, mock_redis):
+        """Test that Redis errors on write do not raise"""
+        mock_redis.set.side_effect = ConnectionError("Redis down")
+
+        await query_cache.set("key", {"sql": "SELECT 1"})
+
+    @pytest.mark.asyncio
+    async def test_delete(self, mock_redis):
+        """Test that delete removes the key"""
+        await query_cache.delete("key")
+
+        mock_redis.delete.assert_awaited_once_with("key")
+
+    @pytest.mark.asyncio
+    async def test_delete_error_is_swallowed(self, mock_redis):
+        """Test that Redis errors on delete do not raise"""
+        mock_redis.delete.side_effect = ConnectionError("Redis down")
+
+        await query_cache.delete("key")
+
+
+class TestCloseQueryCache:
+    """Test close_query_cache function"""
+
+    @pytest.mark.asyncio
+    async def test_close_client(self, mock_redis):
+        """Test that closing releases the global client"""
+        await query_cache.close_query_cache()
+
+        mock_redis.aclose.assert_awaited_once()
+        assert qc_module._redis_client is None
+
+    @pytest.mark.asyncio
+    async def test_close_when_not_created(self):
+        """Test that closing without a client is a no-op"""
+        await query_cache.close_query_cache()
+
+        assert qc_module._redis_client is None
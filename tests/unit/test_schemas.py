@@ -4,6 +4,7 @@ Unit Tests for API Schemas (app/api/schemas/chat.py)
 Tests Pydantic model validation, serialization, and edge cases
 """
 
+import time
 import pytest
 from datetime import datetime
 from pydantic import ValidationError
@@ -14,7 +15,10 @@ from app.api.schemas import (
     ChatResponse,
     AmbiguityResponse,
     ErrorResponse,
-    HealthResponse
+    HealthResponse,
+    Clarification,
+    ClarificationQuestion,
+    CHAT_RESPONSE_ADAPTER
 )
 
 
@@ -210,7 +214,7 @@ class TestChatResponse:
         assert response.error is None
         assert response.suggestions is None
         assert response.processing_time_ms == 523.45
-        assert isinstance(response.timestamp, datetime)
+        assert isinstance(response.timestamp_ms, int)
 
     def test_chat_response_with_timestamp(self):
         """Test that ChatResponse includes timestamp"""
@@ -221,10 +225,10 @@ class TestChatResponse:
             result=None
         )
 
-        assert isinstance(response.timestamp, datetime)
+        assert isinstance(response.timestamp_ms, int)
         # Timestamp should be recent (within last minute)
-        time_diff = (datetime.utcnow() - response.timestamp).total_seconds()
-        assert time_diff < 60
+        time_diff_ms = time.time() * 1000 - response.timestamp_ms
+        assert 0 <= time_diff_ms < 60_000
 
     def test_chat_response_json_serialization(self, sample_query_result):
         """Test that ChatResponse can be serialized to JSON"""
@@ -241,13 +245,28 @@ class TestChatResponse:
         assert isinstance(data, dict)
         assert data['success'] is True
         assert data['query'] == "Test query"
-        assert 'timestamp' in data
+        assert 'timestamp_ms' in data
 
         # Test model_dump_json
         json_str = response.model_dump_json()
         assert isinstance(json_str, str)
         assert "Test query" in json_str
 
+    def test_chat_response_adapter_serialization(self, sample_query_result):
+        """Test that the prebuilt adapter emits JSON-safe data"""
+        response = ChatResponse(
+            success=True,
+            query="Test query",
+            conversation_id="test-123",
+            result=QueryResult(**sample_query_result),
+            timestamp_ms=1734343200000
+        )
+
+        data = CHAT_RESPONSE_ADAPTER.dump_python(response, mode='json')
+
+        assert data['timestamp_ms'] == 1734343200000
+        assert data['result']['sql'] == sample_query_result['sql']
+
     def test_chat_response_missing_required_fields(self):
         """Test that ValidationError is raised when required fields are missing"""
         with pytest.raises(ValidationError) as exc_info:
@@ -282,7 +301,7 @@ class TestAmbiguityResponse:
         assert response.query == "Show me the metrics"
         assert len(response.reasons) == 2
         assert len(response.suggestions) == 2
-        assert isinstance(response.timestamp, datetime)
+        assert isinstance(response.timestamp_ms, int)
 
     def test_ambiguity_response_always_false_success(self):
         """Test that success field is always False for AmbiguityResponse"""
@@ -317,7 +336,7 @@ class TestAmbiguityResponse:
         data = response.model_dump()
         assert data['success'] is False
         assert data['is_ambiguous'] is True
-        assert 'timestamp' in data
+        assert 'timestamp_ms' in data
 
     def test_ambiguity_response_missing_required_fields(self):
         """Test that ValidationError is raised when required fields are missing"""
@@ -350,7 +369,7 @@ class TestErrorResponse:
         assert response.error_type == "SQLGenerationError"
         assert response.details is not None
         assert response.details['original_error'] == "Invalid metric name"
-        assert isinstance(response.timestamp, datetime)
+        assert isinstance(response.timestamp_ms, int)
 
     def test_error_response_without_details(self):
         """Test ErrorResponse without optional details"""
@@ -384,7 +403,7 @@ class TestErrorResponse:
         assert data['success'] is False
         assert data['error'] == "Test error"
         assert data['error_type'] == "TestError"
-        assert 'timestamp' in data
+        assert 'timestamp_ms' in data
 
     def test_error_response_missing_required_fields(self):
         """Test that ValidationError is raised when required fields are missing"""
@@ -417,7 +436,7 @@ class TestHealthResponse:
         assert response.version == "1.0.0"
         assert len(response.components) == 3
         assert response.components['database'] == "healthy"
-        assert isinstance(response.timestamp, datetime)
+        assert isinstance(response.timestamp_ms, int)
 
     def test_health_response_unhealthy_status(self):
         """Test HealthResponse with unhealthy status"""
@@ -443,7 +462,7 @@ class TestHealthResponse:
 
         data = response.model_dump()
         assert data['status'] == "healthy"
-        assert 'timestamp' in data
+        assert 'timestamp_ms' in data
 
     def test_health_response_missing_required_fields(self):
         """Test that ValidationError is raised when required fields are missing"""
@@ -457,6 +476,35 @@ class TestHealthResponse:
         assert "version" in error_str or "components" in error_str
 
 
+class TestClarificationSchemas:
+    """Test question_id validation on clarification models"""
+
+    def test_valid_question_id(self):
+        """Test that snake_case question IDs are accepted"""
+        question = ClarificationQuestion(
+            question_id="charge_off_type",
+            question_text="Which charge-off type?",
+            options=["Gross", "Net"]
+        )
+        answer = Clarification(question_id="charge_off_type", selected_option="Net")
+
+        assert question.question_id == "charge_off_type"
+        assert answer.question_id == "charge_off_type"
+
+    @pytest.mark.parametrize("question_id", ["ChargeOff", "charge-off", "period2", "", "type\n"])
+    def test_invalid_question_id(self, question_id):
+        """Test that IDs outside [a-z_] are rejected by both models"""
+        with pytest.raises(ValidationError):
+            Clarification(question_id=question_id, selected_option="Net")
+
+        with pytest.raises(ValidationError):
+            ClarificationQuestion(
+                question_id=question_id,
+                question_text="Which charge-off type?",
+                options=["Gross", "Net"]
+            )
+
+
 class TestSchemaEdgeCases:
     """Test edge cases and boundary conditions"""
 
@@ -0,0 +1,218 @@
+"""
+Unit Tests for Semantic Cache (app/query/semantic_cache.py)
+
+Tests embedding lookup, distance threshold, storage and error tolerance
+"""
+
+import pytest
+from decimal import Decimal
+from unittest.mock import Mock, AsyncMock, MagicMock, patch
+from app.query.semantic_cache import (
+    SemanticCache, get_semantic_cache, _vector_literal, _dumps, _query_literals
+)
+
+
+def _make_pool(conn):
+    """Build a mock pool whose acquire() yields the given connection"""
+    pool = Mock()
+    acquire = MagicMock()
+    acquire.__aenter__ = AsyncMock(return_value=conn)
+    acquire.__aexit__ = AsyncMock(return_value=False)
+    pool.acquire.return_value = acquire
+    return pool
+
+
+def _make_cache(**kwargs):
+    """Build a cache with a mocked embedding client"""
+    llm_client = Mock()
+    llm_client.embed = AsyncMock(return_value=[0.1, 0.2, 0.3])
+    return SemanticCache(llm_client=llm_client, max_distance=0.1, ttl_days=7, **kwargs)
+
+
+ROW = {
+    'query_text': 'What is the total exposure?',
+    'sql': 'SELECT 1',
+    'explanation': 'cached',
+    'metrics_used': '["total_exposure"]',
+    'visualization_hint': 'table',
+    'results': '[{"total": 1}]',
+    'distance': 0.05
+}
+
+
+class TestHelpers:
+    """Test serialization helpers"""
+
+    def test_vector_literal(self):
+        """Test pgvector literal formatting"""
+        assert _vector_literal([0.5, -1.0]) == '[0.5,-1.0]'
+
+    def test_dumps_handles_decimal(self):
+        """Test that NUMERIC values serialize as floats"""
+        assert _dumps([{'total': Decimal('1.5')}]) == '[{"total":1.5}]'
+
+    def test_query_literals(self):
+        """Test that periods, dates and codes are extracted case-insensitively"""
+        assert _query_literals("Exposure for HELOC in Q3 2024 as of 2024-09-30") == (
+            '2024', '2024-09-30', 'heloc', 'q3'
+        )
+        assert _query_literals("total balance q3 2024") == _query_literals("Total balance Q3 2024?")
+
+
+class TestLookup:
+    """Test SemanticCache.lookup"""
+
+    @pytest.mark.asyncio
+    async def test_hit_within_threshold(self):
+        """Test that a close match returns the cached result"""
+        conn = Mock()
+        conn.fetchrow = AsyncMock(return_value=ROW)
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            result = await cache.lookup("total exposure?")
+
+        assert result == {
+            'sql': 'SELECT 1',
+            'explanation': 'cached',
+            'results': [{'total': 1}],
+            'metrics_used': ['total_exposure'],
+            'visualization_hint': 'table',
+            'truncated': False
+        }
+        assert conn.fetchrow.call_args.args[1:] == ('[0.1,0.2,0.3]', 7, True)
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_miss_over_threshold(self):
+        """Test that a distant match counts as a miss"""
+        conn = Mock()
+        conn.fetchrow = AsyncMock(return_value={**ROW, 'distance': 0.3})
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            result = await cache.lookup("total exposure?")
+
+        assert result is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_miss_on_different_period(self):
+        """Test that a near-paraphrase asking about another period misses"""
+        conn = Mock()
+        conn.fetchrow = AsyncMock(return_value={
+            **ROW, 'query_text': 'What is the total balance for Q3 2024?', 'distance': 0.001
+        })
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            result = await cache.lookup("What was the total balance for Q4 2024?")
+
+        assert result is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_lookup_filters_on_ambiguity_setting(self):
+        """Test that the check_ambiguity setting is part of the lookup"""
+        conn = Mock()
+        conn.fetchrow = AsyncMock(return_value=None)
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            await cache.lookup("total exposure?", check_ambiguity=False)
+
+        assert conn.fetchrow.call_args.args[3] is False
+
+    @pytest.mark.asyncio
+    async def test_miss_on_empty_table(self):
+        """Test that no rows counts as a miss"""
+        conn = Mock()
+        conn.fetchrow = AsyncMock(return_value=None)
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            assert await cache.lookup("total exposure?") is None
+
+        assert cache.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_error_returns_none(self):
+        """Test that embedding or database failures never raise"""
+        cache = _make_cache()
+        cache.llm_client.embed = AsyncMock(side_effect=Exception("quota exceeded"))
+
+        assert await cache.lookup("total exposure?") is None
+        assert (cache.hits, cache.misses) == (0, 0)
+
+
+class TestStore:
+    """Test SemanticCache.store and purge_expired"""
+
+    @pytest.mark.asyncio
+    async def test_store_inserts_row(self):
+        """Test that a result is written with its embedding"""
+        conn = Mock()
+        conn.execute = AsyncMock()
+        cache = _make_cache()
+        result = {
+            'sql': 'SELECT 1',
+            'explanation': 'cached',
+            'results': [{'total': Decimal('2.5')}],
+            'metrics_used': ['total_exposure'],
+            'visualization_hint': 'bar'
+        }
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            await cache.store("total exposure?", result)
+
+        args = conn.execute.call_args.args
+        assert args[1:] == (
+            "total exposure?", '[0.1,0.2,0.3]', 'SELECT 1', 'cached',
+            '["total_exposure"]', 'bar', '[{"total":2.5}]', True
+        )
+
+    @pytest.mark.asyncio
+    async def test_store_error_is_swallowed(self):
+        """Test that a storage failure does not raise"""
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(side_effect=Exception("down"))):
+            await cache.store("total exposure?", {})
+
+    @pytest.mark.asyncio
+    async def test_lookup_then_store_embeds_once(self):
+        """Test that store reuses the embedding computed by lookup"""
+        conn = Mock()
+        conn.fetchrow = AsyncMock(return_value=None)
+        conn.execute = AsyncMock()
+        cache = _make_cache()
+        result = {'sql': 'SELECT 1', 'explanation': '', 'results': [],
+                  'metrics_used': [], 'visualization_hint': 'table'}
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            await cache.lookup("total exposure?")
+            await cache.store("total exposure?", result)
+
+        cache.llm_client.embed.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_purge_expired_uses_ttl(self):
+        """Test that purging deletes entries past the TTL"""
+        conn = Mock()
+        conn.execute = AsyncMock(return_value="DELETE 3")
+        cache = _make_cache()
+
+        with patch('app.query.semantic_cache.get_db_pool', AsyncMock(return_value=_make_pool(conn))):
+            await cache.purge_expired()
+
+        assert conn.execute.call_args.args[1] == 7
+
+
+class TestSingletonPattern:
+    """Test get_semantic_cache function"""
+
+    @patch('app.query.semantic_cache.get_gemini_client')
+    def test_returns_same_instance(self, mock_get_llm):
+        """Test that the cache is a process-wide singleton"""
+        assert get_semantic_cache() is get_semantic_cache()
+        mock_get_llm.assert_called_once()
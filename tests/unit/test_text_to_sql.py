@@ -4,9 +4,11 @@ Unit Tests for Text-to-SQL Engine (app/query/text_to_sql.py)
 Tests the complete Text-to-SQL pipeline with mocked dependencies
 """
 
+import asyncio
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from app.query.text_to_sql import TextToSQLEngine, get_text_to_sql_engine
+from app.database.client import RowList
 from app.utils.exceptions import (
     AmbiguousQueryError,
     SQLGenerationError,
@@ -45,6 +47,20 @@ class TestTextToSQLEngineInitialization:
         assert engine.db_client is mock_db_client
         assert engine.semantic_context == "YAML context"
 
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    def test_semantic_context_follows_loader(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that the engine reads the context from the shared loader"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "v1"
+        mock_get_context.return_value = mock_context_loader
+
+        engine = TextToSQLEngine()
+        mock_context_loader.get_context_for_llm.return_value = "v2"  # e.g. after reload()
+
+        assert engine.semantic_context == "v2"
+
 
 class TestSQLValidation:
     """Test _validate_sql method"""
@@ -185,6 +201,58 @@ class TestSQLValidation:
         assert result['is_valid'] is False
         assert any('must be a SELECT statement' in error for error in result['errors'])
 
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    def test_validate_sql_accepts_cte(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test validation passes for WITH ... SELECT queries"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        engine = TextToSQLEngine()
+
+        sql = "WITH t AS (SELECT 1 AS x) SELECT x FROM t"
+        result = engine._validate_sql(sql)
+
+        assert result['is_valid'] is True
+
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    def test_validate_sql_ignores_keywords_inside_identifiers(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that keywords only match as whole words"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        engine = TextToSQLEngine()
+
+        sql = "SELECT last_updated, created_by FROM accounts"
+        result = engine._validate_sql(sql)
+
+        assert result['is_valid'] is True
+        assert result['errors'] == []
+
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    def test_validate_sql_reports_each_keyword_once(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that keywords are case-insensitive and reported once each"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        engine = TextToSQLEngine()
+
+        sql = "SELECT 1; drop table a; DROP table b; grant all on c to d"
+        result = engine._validate_sql(sql)
+
+        assert result['errors'] == [
+            "Dangerous keyword detected: DROP",
+            "Dangerous keyword detected: GRANT"
+        ]
+
     @patch('app.query.text_to_sql.get_context_loader')
     @patch('app.query.text_to_sql.get_gemini_client')
     @patch('app.query.text_to_sql.get_database_client')
@@ -224,7 +292,7 @@ class TestVisualizationSuggestion:
             {'calendar_date': '2024-03-01', 'balance': 1200}
         ]
 
-        viz = engine._suggest_visualization(sql, results)
+        viz = engine._suggest_visualization(len(results), results[0].keys() if results else ())
 
         assert viz == 'line'
 
@@ -246,7 +314,28 @@ class TestVisualizationSuggestion:
             {'region': 'Midwest', 'balance': 900}
         ]
 
-        viz = engine._suggest_visualization(sql, results)
+        viz = engine._suggest_visualization(len(results), results[0].keys() if results else ())
+
+        assert viz == 'bar'
+
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    def test_suggest_visualization_ignores_date_filter(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a latest-date filter does not make a breakdown a time series"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        engine = TextToSQLEngine()
+
+        # e.g. ... WHERE as_of_date = (SELECT MAX(as_of_date) FROM accounts) GROUP BY product_code
+        results = [
+            {'product_code': 'AUTO', 'delinquency_rate': 2.1},
+            {'product_code': 'CARD', 'delinquency_rate': 3.4}
+        ]
+
+        viz = engine._suggest_visualization(len(results), results[0].keys())
 
         assert viz == 'bar'
 
@@ -264,7 +353,7 @@ class TestVisualizationSuggestion:
         sql = "SELECT * FROM large_table"
         results = [{'id': i} for i in range(100)]  # 100 rows
 
-        viz = engine._suggest_visualization(sql, results)
+        viz = engine._suggest_visualization(len(results), results[0].keys() if results else ())
 
         assert viz == 'table'
 
@@ -282,7 +371,7 @@ class TestVisualizationSuggestion:
         sql = "SELECT SUM(balance) FROM table"
         results = [{'sum': 10000}]
 
-        viz = engine._suggest_visualization(sql, results)
+        viz = engine._suggest_visualization(len(results), results[0].keys() if results else ())
 
         assert viz == 'bar'
 
@@ -300,7 +389,7 @@ class TestVisualizationSuggestion:
         sql = "SELECT * FROM table WHERE 1=0"
         results = []
 
-        viz = engine._suggest_visualization(sql, results)
+        viz = engine._suggest_visualization(len(results), results[0].keys() if results else ())
 
         assert viz == 'table'
 
@@ -560,6 +649,476 @@ class TestProcessQuery:
             assert conversation_history in call_args.args
 
 
+class TestSingleCallAnalysis:
+    """Test process_query with LLM_SINGLE_CALL_ANALYSIS enabled"""
+
+    @pytest.fixture(autouse=True)
+    def enable_single_call(self, monkeypatch):
+        """Turn on the single-call path for this class"""
+        import app.query.text_to_sql as tts_module
+        monkeypatch.setattr(
+            tts_module, "settings",
+            tts_module.settings.model_copy(update={"LLM_SINGLE_CALL_ANALYSIS": True})
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_single_llm_call(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a clear query makes one LLM call"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_llm_client = Mock()
+        mock_llm_client.detect_ambiguity = AsyncMock()
+        mock_llm_client.generate_sql = AsyncMock()
+        mock_llm_client.analyze_and_generate = AsyncMock(return_value={
+            'is_ambiguous': False, 'reasons': [], 'suggestions': [], 'questions': [],
+            'sql': 'SELECT SUM(balance) as total FROM table',
+            'explanation': 'Total balance',
+            'metrics_used': ['total_exposure']
+        })
+        mock_get_llm.return_value = mock_llm_client
+
+        mock_db_client = Mock()
+        mock_db_client.execute_query = AsyncMock(return_value=[{'total': 2800000000}])
+        mock_get_db.return_value = mock_db_client
+
+        engine = TextToSQLEngine()
+        result = await engine.process_query("What is the total exposure?")
+
+        assert result['sql'] == 'SELECT SUM(balance) as total FROM table'
+        assert result['metrics_used'] == ['total_exposure']
+        mock_llm_client.analyze_and_generate.assert_awaited_once()
+        mock_llm_client.detect_ambiguity.assert_not_called()
+        mock_llm_client.generate_sql.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_single_call_ambiguous(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that an ambiguous verdict raises without running SQL"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_llm_client = Mock()
+        mock_llm_client.analyze_and_generate = AsyncMock(return_value={
+            'is_ambiguous': True, 'reasons': ['Unclear metric'],
+            'suggestions': ['Net charge-off'], 'questions': [],
+            'sql': '', 'explanation': '', 'metrics_used': []
+        })
+        mock_get_llm.return_value = mock_llm_client
+
+        mock_db_client = Mock()
+        mock_db_client.execute_query = AsyncMock()
+        mock_get_db.return_value = mock_db_client
+
+        engine = TextToSQLEngine()
+        with pytest.raises(AmbiguousQueryError) as exc_info:
+            await engine.process_query("What is the charge-off rate?")
+
+        assert exc_info.value.options == ['Net charge-off']
+        mock_db_client.execute_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_skip_ambiguity_uses_generate_sql(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that check_ambiguity=False still uses plain SQL generation"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_llm_client = Mock()
+        mock_llm_client.analyze_and_generate = AsyncMock()
+        mock_llm_client.generate_sql = AsyncMock(return_value={
+            'sql': 'SELECT 1', 'explanation': '', 'metrics_used': []
+        })
+        mock_get_llm.return_value = mock_llm_client
+
+        mock_db_client = Mock()
+        mock_db_client.execute_query = AsyncMock(return_value=[])
+        mock_get_db.return_value = mock_db_client
+
+        engine = TextToSQLEngine()
+        await engine.process_query("SELECT 1", check_ambiguity=False)
+
+        mock_llm_client.analyze_and_generate.assert_not_called()
+        mock_llm_client.generate_sql.assert_awaited_once()
+
+
+class TestExecutePlan:
+    """Test execute_plan method"""
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_execute_plan_skips_llm(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a cached plan is executed without calling the LLM"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_llm_client = Mock()
+        mock_llm_client.detect_ambiguity = AsyncMock()
+        mock_llm_client.generate_sql = AsyncMock()
+        mock_get_llm.return_value = mock_llm_client
+
+        mock_db_client = Mock()
+        mock_db_client.execute_query = AsyncMock(return_value=[{'total': 2800000000}])
+        mock_get_db.return_value = mock_db_client
+
+        engine = TextToSQLEngine()
+        result = await engine.execute_plan({
+            'sql': 'SELECT SUM(balance) as total FROM table',
+            'explanation': 'Total balance',
+            'metrics_used': ['total_exposure']
+        })
+
+        assert result['sql'] == 'SELECT SUM(balance) as total FROM table'
+        assert result['results'] == [{'total': 2800000000}]
+        assert result['metrics_used'] == ['total_exposure']
+        assert result['visualization_hint'] == 'bar'
+        mock_llm_client.detect_ambiguity.assert_not_called()
+        mock_llm_client.generate_sql.assert_not_called()
+
+
+class TestSemanticCache:
+    """Test semantic cache integration in process_query"""
+
+    @staticmethod
+    def _make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache):
+        """Build an engine with a mocked semantic cache attached"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_llm_client = Mock()
+        mock_llm_client.detect_ambiguity = AsyncMock(return_value={
+            'is_ambiguous': False, 'reasons': [], 'suggestions': []
+        })
+        mock_llm_client.generate_sql = AsyncMock(return_value={
+            'sql': 'SELECT SUM(balance) as total FROM table',
+            'explanation': 'Total balance',
+            'metrics_used': ['total_exposure']
+        })
+        mock_get_llm.return_value = mock_llm_client
+
+        mock_db_client = Mock()
+        mock_db_client.execute_query = AsyncMock(return_value=[{'total': 2800000000}])
+        mock_get_db.return_value = mock_db_client
+
+        engine = TextToSQLEngine()
+        engine.semantic_cache = semantic_cache
+        return engine
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cache_hit_skips_pipeline(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a hit cancels SQL generation and skips the database"""
+        cached = {'sql': 'SELECT 1', 'explanation': 'cached', 'results': [],
+                  'metrics_used': [], 'visualization_hint': 'table'}
+
+        async def slow_lookup(query, check_ambiguity=True):
+            await asyncio.sleep(0)  # let the speculative LLM tasks start
+            return cached
+
+        generation_cancelled = asyncio.Event()
+
+        async def hanging_generate_sql(query, context, history):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                generation_cancelled.set()
+                raise
+
+        semantic_cache = Mock()
+        semantic_cache.lookup = slow_lookup
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+        engine.llm_client.generate_sql = hanging_generate_sql
+
+        result = await engine.process_query("What is the total exposure?")
+
+        assert result is cached
+        assert generation_cancelled.is_set()
+        engine.llm_client.detect_ambiguity.assert_awaited_once()
+        engine.db_client.execute_query.assert_not_called()
+        semantic_cache.store.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cache_hit_still_checks_ambiguity(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a hit cannot skip a requested ambiguity check"""
+        semantic_cache = Mock()
+        semantic_cache.lookup = AsyncMock(return_value={
+            'sql': 'SELECT 1', 'explanation': 'cached', 'results': [],
+            'metrics_used': [], 'visualization_hint': 'table'
+        })
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+        engine.llm_client.detect_ambiguity = AsyncMock(return_value={
+            'is_ambiguous': True, 'reasons': ['Unclear'], 'suggestions': [], 'questions': []
+        })
+
+        with pytest.raises(AmbiguousQueryError):
+            await engine.process_query("What is the rate?")
+
+        engine.db_client.execute_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cache_miss_stores_result(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a miss runs the pipeline and stores the result"""
+        semantic_cache = Mock()
+        semantic_cache.lookup = AsyncMock(return_value=None)
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+
+        result = await engine.process_query("What is the total exposure?")
+
+        assert result['sql'] == 'SELECT SUM(balance) as total FROM table'
+        engine.llm_client.generate_sql.assert_awaited_once()
+        semantic_cache.store.assert_awaited_once_with("What is the total exposure?", result, True)
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_truncated_result_not_stored(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a result cut short by the row cap is flagged and not cached"""
+        semantic_cache = Mock()
+        semantic_cache.lookup = AsyncMock(return_value=None)
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+        engine.db_client.execute_query = AsyncMock(
+            return_value=RowList([{'total': 1}], truncated=True)
+        )
+
+        result = await engine.process_query("What is the total exposure?")
+
+        assert result['truncated'] is True
+        semantic_cache.store.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cache_miss_surfaces_ambiguity(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that the speculative LLM task's errors propagate on a miss"""
+        semantic_cache = Mock()
+        semantic_cache.lookup = AsyncMock(return_value=None)
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+        engine.llm_client.detect_ambiguity = AsyncMock(return_value={
+            'is_ambiguous': True, 'reasons': ['Unclear'], 'suggestions': [], 'questions': []
+        })
+
+        with pytest.raises(AmbiguousQueryError):
+            await engine.process_query("What is the rate?")
+
+        semantic_cache.store.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cache_hit_single_call_still_checks_ambiguity(
+        self,
+        mock_get_db,
+        mock_get_llm,
+        mock_get_context,
+        monkeypatch
+    ):
+        """Test that with single-call analysis a hit still waits for the ambiguity verdict"""
+        import app.query.text_to_sql as tts_module
+        monkeypatch.setattr(
+            tts_module, "settings",
+            tts_module.settings.model_copy(update={"LLM_SINGLE_CALL_ANALYSIS": True})
+        )
+        semantic_cache = Mock()
+        semantic_cache.lookup = AsyncMock(return_value={
+            'sql': 'SELECT 1', 'explanation': 'cached', 'results': [],
+            'metrics_used': [], 'visualization_hint': 'table'
+        })
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+        engine.llm_client.analyze_and_generate = AsyncMock(return_value={
+            'is_ambiguous': True, 'reasons': ['Unclear'], 'suggestions': [], 'questions': [],
+            'sql': '', 'explanation': '', 'metrics_used': []
+        })
+
+        with pytest.raises(AmbiguousQueryError):
+            await engine.process_query("What is the rate?")
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cache_bypassed_with_history(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that follow-up turns neither read nor write the cache"""
+        semantic_cache = Mock()
+        semantic_cache.lookup = AsyncMock()
+        semantic_cache.store = AsyncMock()
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, semantic_cache)
+
+        await engine.process_query(
+            "And by region?",
+            conversation_history=[{'role': 'user', 'content': 'Total exposure'}]
+        )
+
+        semantic_cache.lookup.assert_not_called()
+        semantic_cache.store.assert_not_called()
+
+
+class TestInFlightDedup:
+    """Test coalescing of identical concurrent queries in process_query"""
+
+    @staticmethod
+    def _make_engine(mock_get_db, mock_get_llm, mock_get_context, generate_sql):
+        """Build an engine whose SQL generation is supplied by the test"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_llm_client = Mock()
+        mock_llm_client.generate_sql = generate_sql
+        mock_get_llm.return_value = mock_llm_client
+
+        mock_db_client = Mock()
+        mock_db_client.execute_query = AsyncMock(return_value=[{'total': 2800000000}])
+        mock_get_db.return_value = mock_db_client
+
+        return TextToSQLEngine()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_identical_queries_share_one_run(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that concurrent identical queries run the pipeline once"""
+        release = asyncio.Event()
+
+        async def slow_generate_sql(query, context, history):
+            await release.wait()
+            return {'sql': 'SELECT SUM(balance) as total FROM table',
+                    'explanation': 'Total balance', 'metrics_used': ['total_exposure']}
+
+        generate_sql = AsyncMock(side_effect=slow_generate_sql)
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, generate_sql)
+
+        first = asyncio.create_task(engine.process_query("Total exposure", check_ambiguity=False))
+        second = asyncio.create_task(engine.process_query("Total exposure", check_ambiguity=False))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(first, second)
+
+        assert results[0] == results[1]
+        assert generate_sql.await_count == 1
+        assert engine._in_flight == {}
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_shared_error_reaches_every_caller(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that a failed run raises in every coalesced caller"""
+        generate_sql = AsyncMock(side_effect=SQLGenerationError("LLM failed"))
+        engine = self._make_engine(mock_get_db, mock_get_llm, mock_get_context, generate_sql)
+
+        results = await asyncio.gather(
+            engine.process_query("Total exposure", check_ambiguity=False),
+            engine.process_query("Total exposure", check_ambiguity=False),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, SQLGenerationError) for r in results)
+        assert generate_sql.await_count == 1
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_cancelled_caller_does_not_cancel_others(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that one caller timing out leaves the shared run going"""
+        release = asyncio.Event()
+
+        async def slow_generate_sql(query, context, history):
+            await release.wait()
+            return {'sql': 'SELECT 1', 'explanation': 'One', 'metrics_used': []}
+
+        engine = self._make_engine(
+            mock_get_db, mock_get_llm, mock_get_context, AsyncMock(side_effect=slow_generate_sql)
+        )
+
+        first = asyncio.create_task(engine.process_query("Total exposure", check_ambiguity=False))
+        second = asyncio.create_task(engine.process_query("Total exposure", check_ambiguity=False))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        result = await second
+        assert result['sql'] == 'SELECT 1'
+        assert first.cancelled()
+
+
+class TestWarmup:
+    """Test warmup method"""
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_warmup_tests_connection(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that warmup checks the database connection"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_db_client = Mock()
+        mock_db_client.test_connection = AsyncMock(return_value=True)
+        mock_get_db.return_value = mock_db_client
+        mock_get_llm.return_value.warmup = AsyncMock()
+
+        engine = TextToSQLEngine()
+        await engine.warmup()
+
+        mock_db_client.test_connection.assert_awaited_once()
+        mock_get_llm.return_value.warmup.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch('app.query.text_to_sql.get_context_loader')
+    @patch('app.query.text_to_sql.get_gemini_client')
+    @patch('app.query.text_to_sql.get_database_client')
+    async def test_warmup_tolerates_connection_failure(self, mock_get_db, mock_get_llm, mock_get_context):
+        """Test that warmup does not raise when the database is unreachable"""
+        mock_context_loader = Mock()
+        mock_context_loader.get_context_for_llm.return_value = "context"
+        mock_get_context.return_value = mock_context_loader
+
+        mock_db_client = Mock()
+        mock_db_client.test_connection = AsyncMock(side_effect=Exception("Connection refused"))
+        mock_get_db.return_value = mock_db_client
+        mock_get_llm.return_value.warmup = AsyncMock()
+
+        engine = TextToSQLEngine()
+        await engine.warmup()
+
+        mock_get_llm.return_value.warmup.assert_awaited_once()
+
+
 class TestSingletonPattern:
     """Test get_text_to_sql_engine singleton pattern"""
 